@@ -0,0 +1,222 @@
+"""
+Micro-benchmarks for the functions every request runs through.
+
+    python -m benchmarks.hot_paths [--output results.json] [--filter jwt] [--repeat 7]
+    python -m benchmarks.hot_paths --compare baseline.json [current.json] [--threshold 0.10]
+
+Each case is timed in batches sized to take about 0.1 s, `--repeat` times;
+the fastest batch gives the reported time per call (the least disturbed
+run), with the median alongside. `--output` writes the results as JSON.
+
+`--compare` reads a baseline JSON, runs the suite (or reads a second JSON)
+and prints the change per case. Cases slower by more than `--threshold`
+are flagged and make the exit status 1, so a release can be checked
+against the previous one's results.
+
+The permission cases run `*PermissionDependency.has_permission` through
+the real `get_collection` against a MemoryClient holding one account of
+each kind, the permission groups and the permissions, so they measure the
+dependency's own work and the Python side of its queries, not Mongo.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from bson import ObjectId
+import src.core.database as database
+from src.apps.note.schemas import NoteObjectSchema
+from src.apps.user.schemas import UserObjectSchema
+from src.dependencies.dependencies import (
+    AdminPermissionDependency,
+    OrganizationPermissionDependency,
+    UserPermissionDependency,
+)
+from src.configs.env import DB_NAME
+from src.core.memory import MemoryClient
+from src.scripts.seed import seed_permission_groups, seed_permissions
+from src.enums.base import Action, Module, OrganizationRole
+from src.errors.base import ErrorHandler
+from src.utilities.crypto.jwt import JWTService
+from src.utilities.serializers import serialize_mongo_doc
+
+
+# ---------------- permission fixture ----------------
+
+async def permission_fixture() -> dict:
+    """
+    Installs a MemoryClient as the database client, seeds the permissions
+    and permission groups as `seed` does, and adds one account of each kind;
+    returns their ids.
+    """
+    database.client = MemoryClient()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await seed_permission_groups(await seed_permissions())
+    db = database.get_client()[DB_NAME]
+    groups = await db["PermissionGroups"].find({"name": {"$in": ["UserPermission", "NotePermission"]}}).to_list(None)
+    group_ids = [g["_id"] for g in groups]
+    accounts = {
+        "admin": ("Admins", {"role": "admin", "permission_groups": []}),
+        "owner": ("Organizations", {"role": "owner", "permission_groups": group_ids}),
+        "moderator": ("Organizations", {"role": "moderator", "permission_groups": group_ids}),
+        "user": ("Users", {"permission_groups": group_ids}),
+    }
+    return {
+        kind: str((await db[collection].insert_one(doc)).inserted_id)
+        for kind, (collection, doc) in accounts.items()
+    }
+
+
+# ---------------- cases ----------------
+
+def note_doc() -> dict:
+    return {
+        "_id": ObjectId(), "title": "Quarterly planning", "content": "x" * 500,
+        "user_id": ObjectId(), "created_at": datetime.utcnow(), "updated_at": None,
+    }
+
+
+def user_doc() -> dict:
+    return {
+        "_id": ObjectId(), "first_name": "Ada", "last_name": "Obi", "email": "ada@example.com",
+        "phone_number": "+2348012345678", "role": OrganizationRole.BASE_USER.value,
+        "password": "$argon2id$v=19$m=65536,t=3,p=4$" + "a" * 60,
+        "created_at": datetime.utcnow(), "updated_at": None,
+    }
+
+
+def cases() -> dict:
+    """name -> (callable, is_async)"""
+    accounts = asyncio.run(permission_fixture())
+    admin_id, owner_id, moderator_id, user_id = (
+        accounts[kind] for kind in ("admin", "owner", "moderator", "user")
+    )
+
+    note, user = note_doc(), user_doc()
+    notes = [note_doc() for _ in range(100)]
+    token_payload = {"id": user_id, "user_type": "user", "tenant_id": owner_id}
+    token = JWTService.generate_token(token_payload)["access_token"]
+    error = ErrorHandler("Benchmark")
+
+    return {
+        "serialize_mongo_doc/note": (lambda: serialize_mongo_doc(note), False),
+        "serialize_mongo_doc/100_notes": (lambda: serialize_mongo_doc(notes), False),
+        "jwt/generate_token": (lambda: JWTService.generate_token(token_payload), False),
+        "jwt/decode_token": (lambda: JWTService.decode_token(token), True),
+        "permission/admin": (
+            lambda: AdminPermissionDependency.has_permission(admin_id, Action.READ, Module.NOTE), True),
+        "permission/organization_owner": (
+            lambda: OrganizationPermissionDependency.has_permission(owner_id, Action.READ, Module.NOTE), True),
+        "permission/organization_groups": (
+            lambda: OrganizationPermissionDependency.has_permission(moderator_id, Action.READ, Module.NOTE), True),
+        "permission/user_groups": (
+            lambda: UserPermissionDependency.has_permission(user_id, Action.UPDATE, Module.NOTE), True),
+        "permission/user_denied": (
+            lambda: UserPermissionDependency.has_permission(user_id, Action.READ, Module.ADMIN), True),
+        "error_handler/get": (lambda: error.get(404), False),
+        "error_handler/get_detail": (lambda: error.get(400, "Invalid note ID"), False),
+        "schema/note_from_db": (lambda: NoteObjectSchema.from_db(note), False),
+        "schema/note_validate": (lambda: NoteObjectSchema(**note), False),
+        "schema/user_from_db": (lambda: UserObjectSchema.from_db(user), False),
+        "schema/user_validate": (lambda: UserObjectSchema(**user), False),
+    }
+
+
+# ---------------- timing ----------------
+
+async def _batch(function, is_async: bool, loops: int) -> float:
+    started = time.perf_counter()
+    if is_async:
+        for _ in range(loops):
+            await function()
+    else:
+        for _ in range(loops):
+            function()
+    return time.perf_counter() - started
+
+
+async def measure(function, is_async: bool, repeat: int) -> dict:
+    loops = 1
+    while (elapsed := await _batch(function, is_async, loops)) < 0.1:
+        loops = loops * 10 if elapsed < 0.01 else int(loops * 0.1 / elapsed) + 1
+    per_call = [await _batch(function, is_async, loops) / loops for _ in range(repeat)]
+    return {
+        "ns_per_call": round(min(per_call) * 1e9, 1),
+        "median_ns": round(statistics.median(per_call) * 1e9, 1),
+        "loops": loops,
+    }
+
+
+async def run(selected: dict, repeat: int) -> dict:
+    results = {}
+    for name, (function, is_async) in selected.items():
+        results[name] = await measure(function, is_async, repeat)
+        print(f"{name:<34}{results[name]['ns_per_call'] / 1000:>10.2f} µs", file=sys.stderr)
+    return results
+
+
+def suite(args) -> dict:
+    selected = {name: case for name, case in cases().items() if not args.filter or args.filter in name}
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "results": asyncio.run(run(selected, args.repeat)),
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """Prints the change per case; True when a case regressed past `threshold`."""
+    regressed = False
+    print(f"{'case':<34}{'baseline µs':>12}{'current µs':>12}{'change':>9}")
+    for name in sorted(baseline["results"].keys() | current["results"].keys()):
+        before = baseline["results"].get(name, {}).get("ns_per_call")
+        after = current["results"].get(name, {}).get("ns_per_call")
+        if before is None or after is None:
+            cells = ("-" if ns is None else f"{ns / 1000:.2f}" for ns in (before, after))
+            print(f"{name:<34}" + "".join(f"{cell:>12}" for cell in cells))
+            continue
+        change = after / before - 1
+        flag = ""
+        if change > threshold:
+            flag, regressed = "  REGRESSION", True
+        print(f"{name:<34}{before / 1000:>12.2f}{after / 1000:>12.2f}{change:>+9.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--compare", nargs="+", metavar="JSON", help="baseline results [current results]")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown flagged as a regression")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline and optionally a second results file")
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+    else:
+        current = suite(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(baseline, current, args.threshold) else 0)
+    if not args.output:
+        print(json.dumps(current, indent=2))
+
+
+if __name__ == "__main__":
+    main()
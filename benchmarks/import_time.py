@@ -0,0 +1,70 @@
+"""
+Import-time breakdown of the server module, from `python -X importtime`.
+
+    python -m benchmarks.import_time [--module src.scripts.server] [--output import_time.txt] [--top 25]
+
+Imports the module in a fresh interpreter and writes a report with the
+total, time per top-level package, and the slowest modules by self and by
+cumulative time. Startup cost shows up here long before it shows up in
+time to first request, so run it after adding imports to the app.
+"""
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+
+
+def import_times(module: str) -> list:
+    """[(module, self_us, cumulative_us, depth)] in import order."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def report(module: str, rows: list, top: int) -> str:
+    total = sum(row[1] for row in rows)
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+
+    lines = [f"import {module}: {total / 1000:.1f} ms across {len(rows)} modules", ""]
+    lines.append(f"{'package':<40}{'self ms':>10}{'share':>8}")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"{package:<40}{self_us / 1000:>10.1f}{self_us / total:>8.1%}")
+
+    for title, key in (("slowest modules (self)", 1), ("slowest modules (cumulative)", 2)):
+        lines += ["", f"{title:<60}{'self ms':>10}{'cumul. ms':>11}"]
+        for name, self_us, cumulative_us, _ in sorted(rows, key=lambda row: -row[key])[:top]:
+            lines.append(f"{name:<60}{self_us / 1000:>10.1f}{cumulative_us / 1000:>11.1f}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.scripts.server")
+    parser.add_argument("--output", default="import_time.txt")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    text = report(args.module, import_times(args.module), args.top)
+    with open(args.output, "w") as output:
+        output.write(text)
+    print(text)
+    print(f"written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+End-to-end load test: seeded tenants, a realistic request mix, latency per route.
+
+    python -m benchmarks.load_test --seed [--orgs 10] [--users 20] [--notes 50]
+    python -m benchmarks.load_test [--base-url http://127.0.0.1:8080] [--start-server | --memory]
+                                   [--concurrency 50] [--duration 30]
+                                   [--mix login=2,list=40,get=35,create=10,update=13]
+
+`--seed` runs the seed script (permissions and groups) and replaces the
+load-test tenants: `--orgs` organizations with `--users` users each and
+`--notes` notes per user, all with the password `--password`. It talks to
+the database in DB_URI, which can be a local Mongo
+(`docker compose -f docker/docker-compose.db.yml up -d`) or any server
+speaking the Mongo wire protocol.
+
+`--memory` needs neither: it seeds an in-memory database (DB_BACKEND=memory)
+and serves the app from a thread of this process, so the numbers are the
+app's own CPU cost, shared with the load generator.
+
+The run then drives the server at `--base-url` (or one started with
+`--start-server`, which uses the same environment) with `--concurrency`
+virtual users. Each logs in as a random seeded user, then loops over the
+weighted `--mix` of actions for `--duration` seconds:
+
+  login   POST  /v1/users/login
+  list    GET   /v1/notes/user
+  get     GET   /v1/notes/{id}
+  create  POST  /v1/notes
+  update  PATCH /v1/notes/{id}
+
+It reports throughput and p50/p95/p99 latency per route, with the status
+codes seen. Every virtual user comes from the same IP and a handful of
+tenants, so for capacity runs start the server with RATE_LIMIT_ENABLED=false
+unless the limiter is what is being measured.
+
+To see how the app degrades with a slow or flaky database, start the
+server with DB_FAULTS (see src/core/faults.py), e.g.
+DB_FAULTS='{"*": {"latency_ms": {"median": 5, "p99": 250}, "error_rate": 0.01}}'.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+import httpx
+from benchmarks.startup_time import wait_for_first_response
+
+ROUTES = {
+    "login": ("POST", "/v1/users/login"),
+    "list": ("GET", "/v1/notes/user"),
+    "get": ("GET", "/v1/notes/{id}"),
+    "create": ("POST", "/v1/notes"),
+    "update": ("PATCH", "/v1/notes/{id}"),
+}
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, action: str, status, seconds: float):
+        self.latencies[action].append(seconds)
+        self.statuses[action][status] += 1
+
+    def report(self, duration: float) -> list:
+        rows = []
+        for action, latencies in self.latencies.items():
+            method, path = ROUTES[action]
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            rows.append({
+                "route": f"{method} {path}",
+                "requests": len(latencies),
+                "rps": round(len(latencies) / duration, 1),
+                "p50_ms": round(quantiles[49] * 1000, 2),
+                "p95_ms": round(quantiles[94] * 1000, 2),
+                "p99_ms": round(quantiles[98] * 1000, 2),
+                "statuses": dict(self.statuses[action]),
+            })
+        return rows
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, email: str, password: str, stats: Stats):
+        self.client = client
+        self.email = email
+        self.password = password
+        self.stats = stats
+        self.token = None
+        self.note_ids = []
+
+    async def call(self, action: str, path: str, **kwargs) -> httpx.Response:
+        method = ROUTES[action][0]
+        headers = {"cookie": f"access_token={self.token}"} if self.token else {}
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(action, type(e).__name__, time.perf_counter() - started)
+            return None
+        self.stats.record(action, response.status_code, time.perf_counter() - started)
+        return response
+
+    async def login(self):
+        response = await self.call("login", "/v1/users/login", json={"email": self.email, "password": self.password})
+        # The cookie is `Secure`; read it off the response so it is sent over plain HTTP too.
+        if response is not None and response.cookies.get("access_token"):
+            self.token = response.cookies["access_token"]
+
+    async def list(self):
+        response = await self.call("list", "/v1/notes/user")
+        if response is not None and response.status_code == 200:
+            self.note_ids = [note["_id"] for note in response.json()]
+
+    async def get(self):
+        if not self.note_ids:
+            return await self.list()
+        await self.call("get", f"/v1/notes/{random.choice(self.note_ids)}")
+
+    async def create(self):
+        response = await self.call("create", "/v1/notes", json={"title": "Load test", "content": "x" * 200})
+        if response is not None and response.status_code == 201:
+            self.note_ids.append(response.json()["_id"])
+
+    async def update(self):
+        if not self.note_ids:
+            return await self.list()
+        await self.call("update", f"/v1/notes/{random.choice(self.note_ids)}", json={"title": "Updated"})
+
+    async def run(self, mix: dict, deadline: float):
+        await self.login()
+        actions, weights = list(mix), list(mix.values())
+        while time.perf_counter() < deadline:
+            await getattr(self, random.choices(actions, weights)[0])()
+
+
+async def drive(args, mix: dict) -> tuple:
+    from src.scripts.seed import load_test_email
+
+    stats = Stats()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        users = [
+            VirtualUser(
+                client, load_test_email(random.randrange(args.orgs), random.randrange(args.users)),
+                args.password, stats,
+            )
+            for _ in range(args.concurrency)
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(*(user.run(mix, started + args.duration) for user in users))
+        elapsed = time.perf_counter() - started
+    return stats, elapsed
+
+
+async def seed(args):
+    from src.core.database import disconnect
+    from src.scripts.seed import seed_permissions, seed_permission_groups, seed_tenants
+
+    started = time.perf_counter()
+    permissions = await seed_permissions()
+    await seed_permission_groups(permissions)
+    await seed_tenants(args.orgs, args.users, args.notes, args.password)
+    if not args.memory:  # the in-memory data has to outlive seeding
+        await disconnect()
+    print(f"seeded in {time.perf_counter() - started:.1f}s")
+
+
+def serve_in_thread(port: int):
+    import threading
+    import uvicorn
+    from src.scripts.server import app
+
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, name="load-test-server", daemon=True)
+    thread.start()
+    return server, thread
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        action, _, weight = part.partition("=")
+        if action not in ROUTES:
+            raise argparse.ArgumentTypeError(f"unknown action {action!r}, expected one of {', '.join(ROUTES)}")
+        mix[action] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="seed the load-test tenants and exit")
+    parser.add_argument("--orgs", type=int, default=10)
+    parser.add_argument("--users", type=int, default=20, help="users per organization")
+    parser.add_argument("--notes", type=int, default=50, help="notes per user")
+    parser.add_argument("--password", default="LoadTest#2024")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--start-server", action="store_true", help="start src.scripts.server:app on --base-url's port")
+    parser.add_argument("--memory", action="store_true", help="seed an in-memory database and serve the app in-process")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request client timeout in seconds")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("login=2,list=40,get=35,create=10,update=13"))
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.memory:
+        os.environ["DB_BACKEND"] = "memory"
+    if args.seed or args.memory:
+        asyncio.run(seed(args))
+        if args.seed:
+            return
+
+    process = server = None
+    port = httpx.URL(args.base_url).port or 80
+    if args.memory:
+        server, thread = serve_in_thread(port)
+    elif args.start_server:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.scripts.server:app", "--port", str(port),
+             "--log-level", "warning", "--no-access-log"],
+            env=os.environ.copy(),
+        )
+    try:
+        if process or server:
+            wait_for_first_response(f"{args.base_url}/healthz", timeout=60)
+        stats, elapsed = asyncio.run(drive(args, args.mix))
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=60)
+        if server:
+            server.should_exit = True
+            thread.join(timeout=60)
+
+    rows = stats.report(elapsed)
+    total = sum(row["requests"] for row in rows)
+    print(f"{'route':<24}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses")
+    for row in sorted(rows, key=lambda row: row["route"]):
+        statuses = " ".join(f"{status}:{count}" for status, count in sorted(row["statuses"].items(), key=str))
+        print(f"{row['route']:<24}{row['requests']:>9}{row['rps']:>9.1f}{row['p50_ms']:>9.2f}"
+              f"{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}  {statuses}")
+    print(f"{'total':<24}{total:>9}{total / elapsed:>9.1f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"duration": elapsed, "concurrency": args.concurrency, "routes": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Per-request cost of MetricsMiddleware and the cost of a /metrics scrape.
+
+    python -m benchmarks.metrics_overhead [--requests 50000] [--routes 50]
+
+Requests are driven straight through the ASGI interface (no sockets), so the
+difference between the two runs is the middleware alone. The app is a bare
+FastAPI app with `--routes` parametrised routes. Because that difference is
+often within run-to-run noise, the middleware is also timed around a no-op
+ASGI app. The scrape is timed last, when every route has a series for each
+user type.
+"""
+import argparse
+import asyncio
+import time
+from fastapi import FastAPI
+from src.core.metrics import MetricsMiddleware, metrics
+
+USER_TYPES = ("admin", "organization", "user", None)
+
+
+class ROUTE:
+    path = "/v1/things/{item_id}"
+
+
+def build_app(routes: int, instrumented: bool) -> FastAPI:
+    app = FastAPI()
+    for index in range(routes):
+        @app.get(f"/v1/things{index}/{{item_id}}")
+        async def endpoint(item_id: str):
+            return {"id": item_id}
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app, requests: int, routes: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for index in range(requests):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/v1/things{index % routes}/{index}", "raw_path": b"",
+            "query_string": b"", "root_path": "", "headers": [], "server": ("test", 80), "client": ("test", 1),
+            "state": {"user_type": USER_TYPES[index % len(USER_TYPES)]},
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--routes", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {}
+    for label, instrumented in (("plain", False), ("metrics", True)):
+        app = build_app(args.routes, instrumented)
+        asyncio.run(drive(app, 1_000, args.routes))  # warm up the middleware stack and routes
+        results[label] = min(asyncio.run(drive(app, args.requests, args.routes)) for _ in range(3))
+        print(f"{label:<8}{results[label] / args.requests * 1e6:>9.1f} µs/request")
+
+    overhead = (results["metrics"] - results["plain"]) / args.requests * 1e6
+    print(f"overhead{overhead:>9.1f} µs/request ({results['metrics'] / results['plain'] - 1:+.1%})")
+
+    async def noop(scope, receive, send):
+        scope["route"] = ROUTE
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    isolated = min(asyncio.run(drive(MetricsMiddleware(noop), args.requests, args.routes)) for _ in range(3))
+    bare = min(asyncio.run(drive(noop, args.requests, args.routes)) for _ in range(3))
+    print(f"isolated{(isolated - bare) / args.requests * 1e6:>9.1f} µs/request (middleware around a no-op app)")
+
+    started = time.perf_counter()
+    body = metrics.render()
+    print(f"scrape  {(time.perf_counter() - started) * 1000:>9.2f} ms for {body.count(chr(10))} lines")
+
+
+if __name__ == "__main__":
+    main()
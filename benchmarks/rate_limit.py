@@ -0,0 +1,79 @@
+"""
+Per-request cost of the rate limiter.
+
+    python -m benchmarks.rate_limit [--requests 100000] [--keys 10000] [--redis-url redis://localhost:6379/0]
+
+Times `take()` on the in-memory backend for one hot key and for `--keys`
+distinct tenants, then RateLimitMiddleware around a no-op ASGI app, the
+difference against the bare app being the middleware alone. Limits are set
+high enough that nothing is rejected. With `--redis-url` the shared backend
+is timed as well; that number is dominated by the round trip to Redis.
+"""
+import argparse
+import asyncio
+import time
+from src.core.rate_limit import Limit, MemoryBackend, RateLimitMiddleware, RedisBackend
+
+UNLIMITED = Limit(1e9, 1e9)
+
+
+async def take(backend, requests: int, keys: int) -> float:
+    started = time.perf_counter()
+    for index in range(requests):
+        await backend.take(f"read:tenant:{index % keys}", UNLIMITED)
+    return time.perf_counter() - started
+
+
+async def drive(app, requests: int, keys: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for index in range(requests):
+        scope = {
+            "type": "http", "method": "GET", "path": "/v1/notes", "headers": [], "client": ("test", 1),
+            "state": {"tenant_id": str(index % keys)},
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - started
+
+
+def report(label: str, seconds: float, requests: int):
+    print(f"{label:<22}{seconds / requests * 1e6:>9.2f} µs/request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--keys", type=int, default=10_000)
+    parser.add_argument("--redis-url")
+    args = parser.parse_args()
+
+    for label, keys in (("memory, 1 key", 1), (f"memory, {args.keys} keys", args.keys)):
+        report(label, min(asyncio.run(take(MemoryBackend(), args.requests, keys)) for _ in range(3)), args.requests)
+
+    async def noop(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    limits = {"read": UNLIMITED, "write": UNLIMITED, "login": UNLIMITED}
+    limited = RateLimitMiddleware(noop, backend=MemoryBackend(), limits=limits)
+    middleware = min(asyncio.run(drive(limited, args.requests, args.keys)) for _ in range(3))
+    bare = min(asyncio.run(drive(noop, args.requests, args.keys)) for _ in range(3))
+    report("middleware", middleware - bare, args.requests)
+
+    if args.redis_url:
+        requests = min(args.requests, 10_000)
+
+        async def redis_run():
+            backend = RedisBackend(args.redis_url, prefix="ratelimit-bench:")
+            await take(backend, 100, 1)  # load the script
+            return await take(backend, requests, args.keys)
+
+        report("redis", asyncio.run(redis_run()), requests)
+
+
+if __name__ == "__main__":
+    main()
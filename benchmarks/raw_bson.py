@@ -0,0 +1,99 @@
+"""
+Note list response cost: NoteObjectSchema path vs raw BSON pass-through.
+
+    python -m benchmarks.raw_bson [--documents 10000] [--number 5]
+
+Both paths start from the BSON batches a cursor receives, so the database
+itself is not involved:
+
+  models  decode to dicts, build NoteObjectSchema per document, run
+          FastAPI's jsonable_encoder over the list, encode with orjson
+  raw     raw BSON batches of `RAW_LIST_BATCH_SIZE` documents already
+          shaped by the `$project` stage from `json_projection`, each
+          decoded in one C call and encoded once, as `raw_list_response`
+          streams them
+"""
+import argparse
+import timeit
+import tracemalloc
+from datetime import datetime
+import bson
+import orjson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from src.apps.note.schemas import NoteObjectSchema
+from src.utilities.serializers import RAW_LIST_BATCH_SIZE
+
+
+def stored_notes(count: int):
+    now = datetime(2025, 1, 1, 12, 0, 0)
+    user_ids = [ObjectId() for _ in range(50)]
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Note {i}",
+            "content": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4,
+            "user_id": user_ids[i % len(user_ids)],
+            "created_at": now,
+            "updated_at": None,
+        }
+        for i in range(count)
+    ]
+
+
+def projected(note: dict) -> dict:
+    """What the server returns for `NoteService.list_projection`."""
+    return {
+        "_id": str(note["_id"]),
+        "title": note["title"],
+        "content": note["content"],
+        "user_id": str(note["user_id"]),
+        "created_at": note["created_at"],
+        "updated_at": note["updated_at"],
+    }
+
+
+def models_path(batch: bytes) -> bytes:
+    docs = bson.decode_all(batch)
+    return orjson.dumps(jsonable_encoder([NoteObjectSchema(**doc) for doc in docs]))
+
+
+def raw_path(batches) -> bytes:
+    chunks = [orjson.dumps(bson.decode_all(batch))[1:-1] for batch in batches]
+    return b"[" + b",".join(chunks) + b"]"
+
+
+def peak_allocation(func, arg) -> int:
+    tracemalloc.start()
+    func(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--number", type=int, default=5)
+    args = parser.parse_args()
+
+    notes = stored_notes(args.documents)
+    batch = b"".join(bson.encode(note) for note in notes)
+    raw_batches = [
+        b"".join(bson.encode(projected(note)) for note in notes[start:start + RAW_LIST_BATCH_SIZE])
+        for start in range(0, len(notes), RAW_LIST_BATCH_SIZE)
+    ]
+
+    print(f"{args.documents} notes")
+    results = {}
+    for label, func, arg in (("models", models_path, batch), ("raw", raw_path, raw_batches)):
+        seconds = min(timeit.repeat(lambda: func(arg), number=args.number, repeat=3)) / args.number
+        peak = peak_allocation(func, arg)
+        results[label] = seconds
+        print(f"  {label:<6} {seconds * 1000:9.2f} ms/response  peak allocated {peak / 1024 / 1024:7.1f} MiB  "
+              f"body {len(func(arg)) / 1024:7.0f} KiB")
+    print(f"  speedup x{results['models'] / results['raw']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
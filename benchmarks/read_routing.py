@@ -0,0 +1,87 @@
+"""
+Checks read routing against a replica set (see docker/docker-compose.replica.yml).
+
+    DB_URI="mongodb://localhost:27017,localhost:27018,localhost:27019/?replicaSet=rs0" \
+        python -m benchmarks.read_routing
+
+List reads outside a session must be served by a secondary; the same reads
+inside a causally consistent session must go to the primary and see a
+write made just before them. Exits non-zero on any mismatch.
+"""
+import asyncio
+import os
+import sys
+
+# The database is dropped at the end, so this always runs in its own, never
+# in the DB_NAME the environment or .env configures.
+os.environ["DB_NAME"] = "notesas_read_routing"
+
+import orjson  # noqa: E402
+from pymongo import monitoring  # noqa: E402
+from src.configs.env import DB_NAME  # noqa: E402
+from src.core import database  # noqa: E402
+from src.apps.note.services import NoteService  # noqa: E402
+from src.apps.note.schemas import NoteCreateSchema  # noqa: E402
+
+
+class ReadListener(monitoring.CommandListener):
+    def __init__(self):
+        self.addresses = []
+
+    def started(self, event):
+        if event.command_name in ("find", "aggregate"):
+            self.addresses.append(event.connection_id)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def served_by(listener, call):
+    listener.addresses.clear()
+    result = await call()
+    return listener.addresses[-1], result
+
+
+async def main():
+    listener = ReadListener()
+    database.client = database.create_client(event_listeners=[listener])
+    mongo = await database.connect()
+    failures = 0
+    try:
+        primary = await mongo.primary
+        secondaries = await mongo.secondaries
+        if not secondaries:
+            print("❌ No secondaries found; DB_URI must point at a replica set.")
+            return 1
+
+        address, _ = await served_by(listener, NoteService.get_all)
+        ok = address in secondaries
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} get_all without session served by {address}")
+
+        session = database.start_causal_session()
+        token = database.current_session.set(session)
+        try:
+            created = await NoteService.create(NoteCreateSchema(title="ryw", content="read your writes"))
+            address, response = await served_by(listener, NoteService.get_all)
+        finally:
+            database.current_session.reset(token)
+            await session.end_session()
+
+        ok = address == primary
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} get_all in causal session served by {address}")
+        ok = any(note["_id"] == str(created.id) for note in orjson.loads(response.body))
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} causal read sees the preceding write")
+    finally:
+        await mongo.drop_database(DB_NAME)
+        await database.disconnect()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
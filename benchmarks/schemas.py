@@ -0,0 +1,117 @@
+"""
+Validation cost per document for the *ObjectSchema models.
+
+    python -m benchmarks.schemas [--documents 10000]
+
+"legacy" models reproduce the previous per-app `PyObjectId` (Pydantic v1
+`__get_validators__` hook plus `json_encoders`); "current" are the app
+schemas using the shared core-schema `PyObjectId`. Reported per document:
+construction from a Mongo document, and JSON serialization.
+"""
+import argparse
+import time
+import warnings
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from pydantic import BaseModel, EmailStr, Field
+from src.enums.base import OrganizationRole
+from src.apps.note.schemas import NoteObjectSchema
+from src.apps.user.schemas import UserObjectSchema
+from src.apps.organization.schemas import OrganizationObjectSchema
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+
+class LegacyPyObjectId(ObjectId):
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, v, info=None):
+        if not ObjectId.is_valid(v):
+            raise ValueError("Invalid ObjectId")
+        return ObjectId(v)
+
+
+legacy_config = {"populate_by_name": True, "json_encoders": {ObjectId: str}}
+
+
+class LegacyNote(BaseModel):
+    id: LegacyPyObjectId = Field(default_factory=LegacyPyObjectId, alias="_id")
+    title: str = Field(..., max_length=255)
+    content: str
+    user_id: Optional[LegacyPyObjectId] = None
+    created_at: datetime
+    updated_at: Optional[datetime]
+    model_config = legacy_config
+
+
+class LegacyUser(BaseModel):
+    id: LegacyPyObjectId = Field(default_factory=LegacyPyObjectId, alias="_id")
+    first_name: str = Field(..., max_length=55)
+    last_name: str = Field(..., max_length=55)
+    email: EmailStr
+    phone_number: str = Field(..., max_length=18)
+    role: OrganizationRole
+    password: str = Field(..., max_length=128)
+    created_at: datetime
+    updated_at: Optional[datetime]
+    model_config = legacy_config
+
+
+class LegacyOrganization(BaseModel):
+    id: LegacyPyObjectId = Field(default_factory=LegacyPyObjectId, alias="_id")
+    name: str = Field(..., max_length=55)
+    email: EmailStr
+    phone_number: str = Field(..., max_length=18)
+    password: str = Field(..., max_length=128)
+    created_at: datetime
+    updated_at: Optional[datetime]
+    model_config = legacy_config
+
+
+def documents(kind: str, count: int):
+    now = datetime(2025, 1, 1, 12, 0, 0)
+    common = {"created_at": now, "updated_at": None}
+    if kind == "Notes":
+        return [{"_id": ObjectId(), "title": f"Note {i}", "content": "x" * 200, "user_id": ObjectId(), **common} for i in range(count)]
+    account = {"phone_number": "08012345678", "password": "$argon2id$v=19$m=65536,t=3,p=4$" + "a" * 60, **common}
+    if kind == "Users":
+        return [{"_id": ObjectId(), "first_name": "Ada", "last_name": "Obi", "email": f"user{i}@example.com",
+                 "role": OrganizationRole.BASE_USER.value, **account} for i in range(count)]
+    return [{"_id": ObjectId(), "name": f"Org {i}", "email": f"org{i}@example.com", **account} for i in range(count)]
+
+
+def per_document(func, items) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        func(items)
+        best = min(best, time.perf_counter() - started)
+    return best / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=10_000)
+    args = parser.parse_args()
+
+    cases = (
+        ("Notes", LegacyNote, NoteObjectSchema),
+        ("Users", LegacyUser, UserObjectSchema),
+        ("Organizations", LegacyOrganization, OrganizationObjectSchema),
+    )
+    print(f"{'schema':<14}{'model':<8}{'construct µs/doc':>18}{'dump_json µs/doc':>18}")
+    for kind, legacy, current in cases:
+        docs = documents(kind, args.documents)
+        for label, model in (("legacy", legacy), ("current", current)):
+            construct = per_document(lambda items: [model(**doc) for doc in items], docs)
+            models = [model(**doc) for doc in docs]
+            dump = per_document(lambda items: [m.model_dump_json(by_alias=True) for m in items], models)
+            print(f"{kind:<14}{label:<8}{construct:>18.2f}{dump:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
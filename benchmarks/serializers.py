@@ -0,0 +1,102 @@
+"""
+Compares the recursive Python serializer with the orjson-based one.
+
+    python -m benchmarks.serializers [--number 200]
+
+"before" is what a permissions endpoint used to do per response: rebuild
+the documents in Python, let FastAPI run jsonable_encoder over the result,
+then encode with orjson. "after" is `serialize_mongo_doc`, which goes from
+documents to bytes in one call. Peak allocation is measured with
+tracemalloc over a single call.
+"""
+import argparse
+import timeit
+import tracemalloc
+from datetime import datetime
+import orjson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from src.utilities.serializers import serialize_mongo_doc
+
+
+def legacy_serialize_mongo_doc(doc):
+    if isinstance(doc, list):
+        return [legacy_serialize_mongo_doc(d) for d in doc]
+    elif isinstance(doc, dict):
+        new_doc = {}
+        for k, v in doc.items():
+            if isinstance(v, ObjectId):
+                new_doc[k] = str(v)
+            elif isinstance(v, (dict, list)):
+                new_doc[k] = legacy_serialize_mongo_doc(v)
+            else:
+                new_doc[k] = v
+        return new_doc
+    elif isinstance(doc, ObjectId):
+        return str(doc)
+    else:
+        return doc
+
+
+def before(docs) -> bytes:
+    return orjson.dumps(jsonable_encoder(legacy_serialize_mongo_doc(docs)))
+
+
+def after(docs) -> bytes:
+    return serialize_mongo_doc(docs)
+
+
+def deep_documents(count: int, depth: int):
+    def node(level):
+        if level == depth:
+            return {"_id": ObjectId(), "action": "read", "created_at": datetime.utcnow()}
+        return {"_id": ObjectId(), "name": f"level {level}", "children": [node(level + 1), node(level + 1)]}
+    return [node(0) for _ in range(count)]
+
+
+def wide_documents(count: int, width: int):
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"group {i}",
+            "permissions": [ObjectId() for _ in range(width)],
+            **{f"field_{j}": j for j in range(width)},
+            "created_at": now,
+            "updated_at": None,
+        }
+        for i in range(count)
+    ]
+
+
+def peak_allocation(func, docs) -> int:
+    tracemalloc.start()
+    func(docs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = {
+        "deep (200 docs, depth 6)": deep_documents(200, 6),
+        "wide (500 docs, 50 fields)": wide_documents(500, 50),
+    }
+    for name, docs in cases.items():
+        assert orjson.loads(before(docs)) == orjson.loads(after(docs))
+        print(name)
+        results = {}
+        for label, func in (("before", before), ("after", after)):
+            seconds = min(timeit.repeat(lambda: func(docs), number=args.number, repeat=3)) / args.number
+            peak = peak_allocation(func, docs)
+            results[label] = seconds
+            print(f"  {label:<6} {seconds * 1000:8.3f} ms/call  peak allocated {peak / 1024:9.1f} KiB")
+        print(f"  speedup x{results['before'] / results['after']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Throughput of the app under different uvicorn server profiles.
+
+    python -m benchmarks.server_profiles [--connections 64] [--duration 10] [--path /healthz]
+
+Each profile starts its own uvicorn process, waits for the first response,
+then keeps `--connections` HTTP/1.1 keep-alive connections busy for
+`--duration` seconds. Profiles whose loop or parser is not installed are
+skipped.
+
+  baseline    1 worker, asyncio loop, h11 parser
+  fast        1 worker, uvloop + httptools
+  production  `production_options()`: CPU-sized workers, fastest loop and
+              parser available, tuned keep-alive and backlog
+"""
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+from importlib.util import find_spec
+from benchmarks.startup_time import wait_for_first_response
+from src.scripts.server import production_options
+
+
+def profiles() -> dict:
+    production = production_options()
+    return {
+        "baseline": {"workers": 1, "loop": "asyncio", "http": "h11"},
+        "fast": {"workers": 1, "loop": "uvloop", "http": "httptools"},
+        "production": {
+            key: production[key]
+            for key in ("workers", "loop", "http", "timeout_keep_alive", "backlog")
+        },
+    }
+
+
+def available(profile: dict) -> bool:
+    return all(
+        profile[key] in ("asyncio", "h11") or find_spec(profile[key])
+        for key in ("loop", "http")
+    )
+
+
+def uvicorn_command(profile: dict, app: str, port: int) -> list:
+    command = [sys.executable, "-m", "uvicorn", app, "--port", str(port),
+               "--log-level", "warning", "--no-access-log"]
+    for key, value in profile.items():
+        command += [f"--{key.replace('_', '-')}", str(value)]
+    return command
+
+
+async def worker(port: int, path: str, deadline: float, latencies: list, errors: list):
+    request = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: keep-alive\r\n\r\n".encode()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            sent = time.perf_counter()
+            writer.write(request)
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            if status_line.split()[1:2] != [b"200"]:
+                errors.append(status_line)
+            latencies.append(time.perf_counter() - sent)
+    finally:
+        writer.close()
+
+
+async def load(port: int, path: str, connections: int, duration: float):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(worker(port, path, deadline, latencies, errors) for _ in range(connections)))
+    return latencies, errors
+
+
+def run_profile(name: str, profile: dict, args) -> None:
+    process = subprocess.Popen(uvicorn_command(profile, args.app, args.port))
+    try:
+        wait_for_first_response(f"http://127.0.0.1:{args.port}{args.path}", timeout=60)
+        latencies, errors = asyncio.run(load(args.port, args.path, args.connections, args.duration))
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{name:<12}{profile['workers']:>8}{profile['loop']:>9}{profile['http']:>11}"
+          f"{len(latencies) / args.duration:>11.0f}{quantiles[49] * 1000:>9.2f}{quantiles[98] * 1000:>9.2f}"
+          f"{len(errors):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--app", default="src.scripts.server:app")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--path", default="/healthz")
+    parser.add_argument("--profiles", nargs="+", default=None)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12}{'workers':>8}{'loop':>9}{'http':>11}{'req/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, profile in profiles().items():
+        if args.profiles and name not in args.profiles:
+            continue
+        if not available(profile):
+            print(f"{name:<12}skipped, {profile['loop']}/{profile['http']} not installed")
+            continue
+        run_profile(name, profile, args)
+
+
+if __name__ == "__main__":
+    main()
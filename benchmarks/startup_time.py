@@ -0,0 +1,74 @@
+"""
+Measures time from process launch to the first successful HTTP response.
+
+    python -m benchmarks.startup_time --runs 5 --path /docs
+    python -m benchmarks.startup_time --path /healthz --env LAZY_ROUTERS=false
+
+Each run starts a fresh uvicorn process, so the numbers include imports,
+the lifespan warm-up (pool fill, ping, index checks) and the first request.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def wait_for_first_response(url: str, timeout: float) -> tuple[float, float]:
+    """Returns (seconds until the first 2xx/3xx, latency of that request)."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        sent = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status < 400:
+                    done = time.perf_counter()
+                    return done - started, done - sent
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"no successful response from {url} within {timeout}s")
+
+
+def measure(port: int, path: str, timeout: float, env: dict = None) -> tuple[float, float]:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.scripts.server:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **(env or {})},
+    )
+    try:
+        return wait_for_first_response(f"http://127.0.0.1:{port}{path}", timeout)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--path", default="/docs")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--env", nargs="*", default=[], metavar="NAME=VALUE",
+                        help="extra environment for the server, e.g. LAZY_ROUTERS=false")
+    args = parser.parse_args()
+    env = dict(item.split("=", 1) for item in args.env)
+
+    totals, firsts = [], []
+    for run in range(1, args.runs + 1):
+        total, first = measure(args.port, args.path, args.timeout, env)
+        totals.append(total)
+        firsts.append(first)
+        print(f"run {run}: first success after {total * 1000:.1f} ms (request took {first * 1000:.1f} ms)")
+
+    print(
+        f"time to first request: min {min(totals) * 1000:.1f} ms, "
+        f"median {statistics.median(totals) * 1000:.1f} ms, max {max(totals) * 1000:.1f} ms"
+    )
+    print(f"first request latency: median {statistics.median(firsts) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
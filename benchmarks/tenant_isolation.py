@@ -0,0 +1,128 @@
+"""
+Multi-tenant load benchmark: does a noisy organization slow down a quiet one?
+
+    python -m benchmarks.tenant_isolation --noisy-notes 200000 --duration 20 [--isolated-uri mongodb://other:27017]
+
+Seeds a large "noisy" tenant and a small "quiet" tenant into a throw-away
+database, then measures the quiet tenant's note-listing latency while the
+noisy tenant runs full note scans, twice:
+
+  shared    both tenants in the shared database
+  isolated  noisy tenant placed in its own database (or cluster with --isolated-uri)
+
+Needs a reachable MongoDB at DB_URI. Everything it creates is dropped at the end.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# Everything this creates is dropped at the end, so it always runs in its own
+# database, never in the DB_NAME the environment or .env configures.
+os.environ["DB_NAME"] = "notesas_tenant_bench"
+
+from bson import ObjectId  # noqa: E402
+from src.configs.env import DB_NAME  # noqa: E402
+from src.core.database import get_client, get_collection, tenant_router, disconnect  # noqa: E402
+
+ISOLATED_DB = f"{DB_NAME}_noisy"
+
+
+async def seed_tenant(org_id: ObjectId, users: int, notes_per_user: int):
+    users_col = await get_collection("Users", tenant_id=str(org_id))
+    notes_col = await get_collection("Notes", tenant_id=str(org_id))
+    user_ids = [ObjectId() for _ in range(users)]
+    await users_col.insert_many([
+        {"_id": uid, "email": f"{uid}@bench.local", "organization_id": org_id} for uid in user_ids
+    ])
+    body = "x" * 512
+    for uid in user_ids:
+        docs = [{"user_id": uid, "title": f"note {i}", "content": body} for i in range(notes_per_user)]
+        for start in range(0, len(docs), 5000):
+            await notes_col.insert_many(docs[start:start + 5000])
+    return user_ids
+
+
+async def seed_tenant_copy(source, target, org_id: ObjectId):
+    user_ids = await source["Users"].distinct("_id", {"organization_id": org_id})
+    for name, query in (("Users", {"organization_id": org_id}), ("Notes", {"user_id": {"$in": user_ids}})):
+        batch = []
+        async for doc in source[name].find(query):
+            batch.append(doc)
+            if len(batch) == 5000:
+                await target[name].insert_many(batch)
+                batch = []
+        if batch:
+            await target[name].insert_many(batch)
+        await source[name].delete_many(query)
+    await target["Notes"].create_index("user_id")
+
+
+async def noisy_worker(org_id: ObjectId, stop: asyncio.Event):
+    while not stop.is_set():
+        notes = await get_collection("Notes", tenant_id=str(org_id))
+        # Unindexed scan over the tenant's whole working set.
+        await notes.find({"content": {"$regex": "^y"}}).to_list(length=None)
+
+
+async def quiet_worker(org_id: ObjectId, user_ids, stop: asyncio.Event, samples: list):
+    i = 0
+    while not stop.is_set():
+        notes = await get_collection("Notes", tenant_id=str(org_id))
+        started = time.perf_counter()
+        await notes.find({"user_id": user_ids[i % len(user_ids)]}).to_list(length=None)
+        samples.append(time.perf_counter() - started)
+        i += 1
+
+
+async def run_phase(name, noisy_org, quiet_org, quiet_users, args):
+    stop = asyncio.Event()
+    samples: list = []
+    tasks = [asyncio.create_task(noisy_worker(noisy_org, stop)) for _ in range(args.noisy_concurrency)]
+    tasks += [asyncio.create_task(quiet_worker(quiet_org, quiet_users, stop, samples)) for _ in range(args.quiet_concurrency)]
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    samples.sort()
+    pct = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    print(
+        f"{name:<9} quiet tenant: {len(samples) / args.duration:8.1f} req/s  "
+        f"p50 {pct(0.50):7.2f} ms  p95 {pct(0.95):7.2f} ms  p99 {pct(0.99):7.2f} ms  "
+        f"mean {statistics.fmean(samples) * 1000:7.2f} ms"
+    )
+
+
+async def main(args):
+    noisy_org, quiet_org = ObjectId(), ObjectId()
+    mongo = get_client()
+    try:
+        await seed_tenant(noisy_org, users=args.noisy_users, notes_per_user=args.noisy_notes // args.noisy_users)
+        quiet_users = await seed_tenant(quiet_org, users=10, notes_per_user=20)
+        notes = await get_collection("Notes")
+        await notes.create_index("user_id")
+
+        await run_phase("shared", noisy_org, quiet_org, quiet_users, args)
+
+        placement = {"tenant_id": str(noisy_org), "database": ISOLATED_DB, "uri": args.isolated_uri}
+        isolated = tenant_router.database(placement, mongo)
+        await seed_tenant_copy(mongo[DB_NAME], isolated, noisy_org)
+        tenant_router.place(placement)
+
+        await run_phase("isolated", noisy_org, quiet_org, quiet_users, args)
+    finally:
+        await mongo.drop_database(DB_NAME)
+        await tenant_router.database({"database": ISOLATED_DB, "uri": args.isolated_uri}, mongo).client.drop_database(ISOLATED_DB)
+        await disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--noisy-users", type=int, default=100)
+    parser.add_argument("--noisy-notes", type=int, default=200_000)
+    parser.add_argument("--noisy-concurrency", type=int, default=8)
+    parser.add_argument("--quiet-concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--isolated-uri", default=None)
+    asyncio.run(main(parser.parse_args()))
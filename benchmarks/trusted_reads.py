@@ -0,0 +1,53 @@
+"""
+List endpoint response cost: validated models vs trusted reads.
+
+    python -m benchmarks.trusted_reads [--sizes 1000 100000]
+
+  validated  `Model(**doc)` per document, FastAPI's jsonable_encoder, orjson
+             (what the list endpoints did before)
+  trusted    `Model.dump_list(docs)`: model_construct per document and one
+             list-level TypeAdapter dump_json call
+"""
+import argparse
+import time
+import orjson
+from fastapi.encoders import jsonable_encoder
+from src.apps.note.schemas import NoteObjectSchema
+from src.apps.user.schemas import UserObjectSchema
+from benchmarks.schemas import documents
+
+
+def validated(model, docs) -> bytes:
+    return orjson.dumps(jsonable_encoder([model(**doc) for doc in docs]))
+
+
+def trusted(model, docs) -> bytes:
+    return model.dump_list(docs)
+
+
+def best_of(func, model, docs, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(model, docs)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'schema':<8}{'documents':>10}{'validated ms':>15}{'trusted ms':>13}{'speedup':>10}")
+    for kind, model in (("Notes", NoteObjectSchema), ("Users", UserObjectSchema)):
+        for size in args.sizes:
+            docs = documents(kind, size)
+            before = best_of(validated, model, docs, args.repeat)
+            after = best_of(trusted, model, docs, args.repeat)
+            print(f"{kind:<8}{size:>10}{before * 1000:>15.1f}{after * 1000:>13.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
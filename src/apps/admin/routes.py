@@ -37,13 +37,13 @@ async def get_admin_detail(request: Request):
     """
     Returns the authenticated admin's details.
     """
-    account = getattr(request.state, "account", None)
-    account_type = getattr(request.state, "account_type", None)
+    user_id = getattr(request.state, "user_id", None)
+    user_type = getattr(request.state, "user_type", None)
 
-    if not account or account_type != "admin":
+    if not user_id or user_type != "admin":
         raise HTTPException(status_code=401, detail="Unauthorized or invalid account type")
 
-    return await AdminService.get_by_id(admin_id=str(account["_id"]))
+    return await AdminService.get_by_id(admin_id=user_id)
 
 @admin_router.patch(
     "/{id}",
@@ -3,23 +3,7 @@ from typing import Optional, List, Dict, Union
 from datetime import datetime
 from bson import ObjectId
 from src.enums.base import AdminRole
-from src.utilities.base_schema import AccountBaseModel
-
-
-class PyObjectId(ObjectId):
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
-
-    @classmethod
-    def validate(cls, v, info=None):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return ObjectId(v)
-
-    @classmethod
-    def __get_pydantic_json_schema__(cls, core_schema, handler):
-        return {"type": "string"}
+from src.utilities.base_schema import AccountBaseModel, PyObjectId, DocumentModel
 
 
 class AdminUserCreateSchema(AccountBaseModel):
@@ -43,7 +27,7 @@ class AdminLoginSchema(BaseModel):
     password: str = Field(..., max_length=128)
 
 
-class AdminObjectSchema(BaseModel):
+class AdminObjectSchema(DocumentModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     first_name: str = Field(..., max_length=55)
     last_name: str = Field(..., max_length=55)
@@ -53,11 +37,10 @@ class AdminObjectSchema(BaseModel):
     phone_number: str = Field(..., max_length=18)
     password: str = Field(..., max_length=128)
     created_at: datetime
-    updated_at: Optional[datetime]
+    updated_at: Optional[datetime] = None
 
     model_config = {
         "populate_by_name": True,
-        "json_encoders": {ObjectId: str}
     }
 
     @field_validator("permission_groups", mode="before")
@@ -8,7 +8,9 @@ from src.apps.admin.schemas import (
 )
 from src.errors.base import ErrorHandler
 from fastapi import Response, HTTPException, status
-from src.core.database import get_collection
+from src.utilities.serializers import JSONBytesResponse
+from src.core.database import get_collection, causal_session
+from src.core.write_behind import last_login_buffer
 from src.utilities.crypto.hash import set_password, verify_password
 from src.utilities.crypto.jwt import JWTService
 from datetime import datetime
@@ -42,8 +44,8 @@ class AdminService:
         )
 
     @classmethod
-    async def get_collection(cls):
-        return await get_collection("Admins")
+    async def get_collection(cls, secondary: bool = False):
+        return await get_collection("Admins", secondary=secondary)
 
 
     @classmethod
@@ -56,10 +58,7 @@ class AdminService:
         if not verify_password(plain_password=dto.password, hashed_password=org["password"]):
             raise cls.error.get(400)
         lagos_tz = pytz.timezone("Africa/Lagos")
-        await collection.update_one(
-            {"_id": org["_id"]},
-            {"$set": {"last_login": datetime.now(lagos_tz)}}
-        )
+        last_login_buffer.set("Admins", org["_id"], {"last_login": datetime.now(lagos_tz)})
         data = {"id": str(org["_id"]), "user_type": "admin"}
         tokens = cls.token.generate_token(data)
         return cls._set_auth_cookies(response, tokens)
@@ -86,7 +85,7 @@ class AdminService:
         admin_data["updated_at"] = None
         admin_data["role"] = AdminRole.MODERATOR
         admin_data["permission_groups"] = []
-        result = await collection.insert_one(admin_data)
+        result = await collection.insert_one(admin_data, session=causal_session(collection))
         data = {"id": str(result.inserted_id), "user_type": "admin"}
         tokens = cls.token.generate_token(data)
         return cls._set_auth_cookies(response, tokens)
@@ -101,14 +100,14 @@ class AdminService:
         collection = await cls.get_collection()
         org = await collection.find({"_id": _id}).to_list(length=1)
         if org:
-            return AdminObjectSchema(**org[0])
+            return AdminObjectSchema.from_db(org[0])
         return None
     
     @classmethod
     async def get_all(cls):
-        collection = await cls.get_collection()
-        docs = await collection.find({}).to_list(length=None)
-        return [AdminObjectSchema(**doc) for doc in docs]
+        collection = await cls.get_collection(secondary=True)
+        docs = await collection.find({}, session=causal_session(collection)).to_list(length=None)
+        return JSONBytesResponse(AdminObjectSchema.dump_list(docs))
     
 
     @classmethod
@@ -125,12 +124,13 @@ class AdminService:
 
         result = await collection.update_one(
             {"_id": _id},
-            {"$set": update_data}
+            {"$set": update_data},
+            session=causal_session(collection),
         )
 
         if result.modified_count:
             org = await collection.find({"_id": _id}).to_list(length=1)
-            return AdminObjectSchema(**org[0])
+            return AdminObjectSchema.from_db(org[0])
         return None
 
     # ---------------- DELETE ----------------
@@ -141,5 +141,5 @@ class AdminService:
         except InvalidId:
             return 0
         collection = await cls.get_collection()
-        result = await collection.delete_one({"_id": _id})
+        result = await collection.delete_one({"_id": _id}, session=causal_session(collection))
         return result.deleted_count
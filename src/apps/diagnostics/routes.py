@@ -0,0 +1,72 @@
+from fastapi import Depends
+from src.utilities.route_builder import build_router
+from src.apps.diagnostics.services import DiagnosticsService, MemoryDiagnosticsService
+from src.dependencies.dependencies import PermissionControl
+
+diagnostics_router = build_router(path="diagnostics", tags=["Diagnostics"])
+admin_only = [Depends(PermissionControl.admin_required())]
+
+
+@diagnostics_router.get("/profiles", status_code=200, dependencies=admin_only)
+async def list_profiles():
+    """
+    Recent request profiles of the worker serving this request. Send any
+    request as an admin with `X-Profile: 1` to record one.
+    """
+    return await DiagnosticsService.list_profiles()
+
+
+@diagnostics_router.get("/profiles/{profile_id}", status_code=200, dependencies=admin_only)
+async def get_profile(profile_id: str):
+    return await DiagnosticsService.get_profile(profile_id=profile_id)
+
+
+@diagnostics_router.get("/profiles/{profile_id}/collapsed", status_code=200, dependencies=admin_only)
+async def get_profile_collapsed(profile_id: str):
+    """Collapsed stacks, ready for flamegraph.pl or speedscope."""
+    return await DiagnosticsService.get_collapsed(profile_id=profile_id)
+
+
+@diagnostics_router.get("/memory", status_code=200, dependencies=admin_only)
+async def memory_status(top_types: int = 0):
+    """
+    RSS, GC and tracemalloc status of the worker serving this request. Pass
+    `top_types` to also count live objects by type (walks the whole heap).
+    """
+    return await MemoryDiagnosticsService.status(top_types=top_types)
+
+
+@diagnostics_router.post("/memory/tracemalloc/start", status_code=200, dependencies=admin_only)
+async def start_tracemalloc(frames: int = 1):
+    """Starts tracing allocations, keeping `frames` frames per allocation site."""
+    return await MemoryDiagnosticsService.start(frames=frames)
+
+
+@diagnostics_router.post("/memory/tracemalloc/stop", status_code=200, dependencies=admin_only)
+async def stop_tracemalloc():
+    return await MemoryDiagnosticsService.stop()
+
+
+@diagnostics_router.post("/memory/snapshots", status_code=201, dependencies=admin_only)
+async def take_snapshot(limit: int = 25):
+    return await MemoryDiagnosticsService.take_snapshot(limit=limit)
+
+
+@diagnostics_router.get("/memory/snapshots", status_code=200, dependencies=admin_only)
+async def list_snapshots():
+    return await MemoryDiagnosticsService.list_snapshots()
+
+
+@diagnostics_router.get("/memory/snapshots/{first_id}/diff/{second_id}", status_code=200, dependencies=admin_only)
+async def diff_snapshots(first_id: str, second_id: str, key: str = "lineno", limit: int = 25):
+    """Allocation sites that grew the most between two snapshots."""
+    return await MemoryDiagnosticsService.diff(first_id=first_id, second_id=second_id, key=key, limit=limit)
+
+
+@diagnostics_router.get("/loop", status_code=200, dependencies=admin_only)
+async def loop_status():
+    """
+    Event-loop lag percentiles and the most recent stalls of this worker,
+    each with the route that was running and the blocked stack.
+    """
+    return await DiagnosticsService.loop_status()
@@ -0,0 +1,170 @@
+import asyncio
+import gc
+import os
+import resource
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import Tuple
+from fastapi import Response
+from src.errors.base import ErrorHandler
+from src.core.profiling import profile_store
+from src.core.loop_monitor import loop_monitor, event_loop_lag
+
+
+class DiagnosticsService:
+    error = ErrorHandler("Profile")
+
+    @classmethod
+    async def list_profiles(cls):
+        return [profile.summary() for profile in profile_store.all()]
+
+    @classmethod
+    async def get_profile(cls, profile_id: str):
+        profile = profile_store.get(profile_id)
+        if not profile:
+            raise cls.error.get(404)
+        return profile.summary()
+
+    @classmethod
+    async def loop_status(cls):
+        return {
+            "pid": os.getpid(),
+            "lag_ms": {str(q): round(v * 1000, 3) for q, v in event_loop_lag.percentiles().items()},
+            "threshold_ms": loop_monitor.threshold * 1000,
+            "stalls": loop_monitor.recent_stalls(),
+        }
+
+    @classmethod
+    async def get_collapsed(cls, profile_id: str):
+        profile = profile_store.get(profile_id)
+        if not profile:
+            raise cls.error.get(404)
+        return Response(
+            profile.collapsed(),
+            media_type="text/plain",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+        )
+
+
+class MemoryDiagnosticsService:
+    """
+    tracemalloc snapshots, RSS and GC statistics for the worker that serves
+    the request. Snapshot work runs in a thread so the event loop keeps
+    serving while large heaps are walked.
+    """
+    error = ErrorHandler("Snapshot")
+    max_snapshots = 10
+    _snapshots: "OrderedDict[str, Tuple[float, tracemalloc.Snapshot]]" = OrderedDict()
+    _ignored = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    @staticmethod
+    def _rss() -> dict:
+        usage = {"max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+        try:
+            with open("/proc/self/status") as status:
+                for line in status:
+                    if line.startswith(("VmRSS:", "VmHWM:")):
+                        name, value = line.split(":", 1)
+                        usage["rss_kib" if name == "VmRSS" else "max_rss_kib"] = int(value.split()[0])
+        except OSError:
+            pass
+        return usage
+
+    @staticmethod
+    def _stat(stat) -> dict:
+        frame = stat.traceback[-1]  # the allocating frame; tracebacks run oldest first
+        entry = {
+            "site": f"{frame.filename}:{frame.lineno}",
+            "size_kib": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        if hasattr(stat, "size_diff"):
+            entry["size_diff_kib"] = round(stat.size_diff / 1024, 1)
+            entry["count_diff"] = stat.count_diff
+        if len(stat.traceback) > 1:
+            entry["traceback"] = [f"{f.filename}:{f.lineno}" for f in stat.traceback]
+        return entry
+
+    @classmethod
+    async def status(cls, top_types: int = 0):
+        status = {
+            "pid": os.getpid(),
+            **cls._rss(),
+            "gc": {
+                "counts": gc.get_count(),
+                "thresholds": gc.get_threshold(),
+                "generations": gc.get_stats(),
+                "garbage": len(gc.garbage),
+            },
+            "tracemalloc": {"tracing": tracemalloc.is_tracing(), "snapshots": list(cls._snapshots)},
+        }
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            status["tracemalloc"].update(
+                current_kib=round(current / 1024, 1),
+                peak_kib=round(peak / 1024, 1),
+                overhead_kib=round(tracemalloc.get_tracemalloc_memory() / 1024, 1),
+            )
+        if top_types:
+            counts = await asyncio.to_thread(lambda: Counter(type(o).__name__ for o in gc.get_objects()))
+            status["gc"]["top_types"] = dict(counts.most_common(top_types))
+        return status
+
+    @classmethod
+    async def start(cls, frames: int = 1):
+        if tracemalloc.is_tracing():
+            raise cls.error.get(409, "tracemalloc is already running")
+        tracemalloc.start(frames)
+        return {"pid": os.getpid(), "tracing": True, "frames": frames}
+
+    @classmethod
+    async def stop(cls):
+        tracemalloc.stop()
+        cls._snapshots.clear()
+        return {"pid": os.getpid(), "tracing": False}
+
+    @classmethod
+    async def take_snapshot(cls, limit: int = 25):
+        if not tracemalloc.is_tracing():
+            raise cls.error.get(409, "tracemalloc is not running")
+
+        def take():
+            snapshot = tracemalloc.take_snapshot().filter_traces(cls._ignored)
+            return snapshot, snapshot.statistics("lineno")[:limit]
+
+        snapshot, top = await asyncio.to_thread(take)
+        snapshot_id = uuid.uuid4().hex[:12]
+        cls._snapshots[snapshot_id] = (time.time(), snapshot)
+        while len(cls._snapshots) > cls.max_snapshots:
+            cls._snapshots.popitem(last=False)
+        return {"id": snapshot_id, "pid": os.getpid(), "top": [cls._stat(stat) for stat in top]}
+
+    @classmethod
+    async def list_snapshots(cls):
+        return [
+            {"id": snapshot_id, "taken_at": taken_at, "traces": len(snapshot.traces)}
+            for snapshot_id, (taken_at, snapshot) in cls._snapshots.items()
+        ]
+
+    @classmethod
+    async def diff(cls, first_id: str, second_id: str, key: str = "lineno", limit: int = 25):
+        if first_id not in cls._snapshots or second_id not in cls._snapshots:
+            raise cls.error.get(404)
+        if key not in ("lineno", "filename", "traceback"):
+            raise cls.error.get(400, "key must be lineno, filename or traceback")
+        first, second = cls._snapshots[first_id][1], cls._snapshots[second_id][1]
+        stats = await asyncio.to_thread(second.compare_to, first, key)
+        return {
+            "pid": os.getpid(),
+            "from": first_id,
+            "to": second_id,
+            "size_diff_kib": round(sum(stat.size_diff for stat in stats) / 1024, 1),
+            "top": [cls._stat(stat) for stat in stats[:limit]],
+        }
@@ -21,8 +21,11 @@ note_router = build_router(path="notes", tags=["Notes"])
         )
     ],
 )
-async def get_all_notes():
-    return await NoteService.get_all()
+async def get_all_notes(request: Request):
+    """
+    Fetch the notes of the caller's organization; admins get every organization's.
+    """
+    return await NoteService.get_all(all_tenants=getattr(request.state, "user_type", None) == "admin")
 
 
 @note_router.get(
@@ -41,15 +44,15 @@ async def get_user_notes(request: Request):
     """
     Fetch notes belonging to the currently authenticated user.
     """
-    account = getattr(request.state, "account", None)
-    account_type = getattr(request.state, "account_type", None)
+    user_id = getattr(request.state, "user_id", None)
+    user_type = getattr(request.state, "user_type", None)
 
-    if not account or account_type not in ["user", "organization"]:
+    if not user_id or user_type not in ["user", "organization"]:
     
         from fastapi import HTTPException
         raise HTTPException(status_code=401, detail="Unauthorized or invalid account type")
 
-    return await NoteService.get_user(user_id=str(account["_id"]))
+    return await NoteService.get_user(user_id=user_id)
 
 
 @note_router.get(
@@ -84,14 +87,14 @@ async def create_note(dto: NoteCreateSchema, request: Request):
     """
     Create a note owned by the current user.
     """
-    account = getattr(request.state, "account", None)
-    account_type = getattr(request.state, "account_type", None)
+    user_id = getattr(request.state, "user_id", None)
+    user_type = getattr(request.state, "user_type", None)
 
-    if not account or account_type != "user":
+    if not user_id or user_type != "user":
         from fastapi import HTTPException
         raise HTTPException(status_code=401, detail="Only users can create notes")
 
-    dto.user_id = ObjectId(account["_id"])
+    dto.user_id = ObjectId(user_id)
     return await NoteService.create(dto=dto)
 
 
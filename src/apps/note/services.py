@@ -4,7 +4,8 @@ from src.apps.note.schemas import (
     NoteObjectSchema,
 )
 from src.errors.base import ErrorHandler
-from src.core.database import get_collection
+from src.core.database import get_collection, get_tenant_collections, causal_session
+from src.utilities.serializers import json_projection, raw_list_response
 from datetime import datetime
 from bson import ObjectId
 from bson.errors import InvalidId
@@ -12,10 +13,15 @@ from bson.errors import InvalidId
 
 class NoteService:
     error = ErrorHandler("Note")
+    # Read-only list endpoints stream BSON to JSON without building NoteObjectSchema models.
+    list_projection = json_projection(
+        ["title", "content", "user_id", "created_at", "updated_at"],
+        object_id_fields={"user_id"},
+    )
 
     @classmethod
-    async def get_collection(cls):
-        return await get_collection("Notes")
+    async def get_collection(cls, secondary: bool = False):
+        return await get_collection("Notes", secondary=secondary)
 
     @classmethod
     async def create(cls, dto: NoteCreateSchema):
@@ -25,16 +31,20 @@ class NoteService:
         note_data["updated_at"] = None
         
 
-        result = await collection.insert_one(note_data)
-        created = await collection.find_one({"_id": result.inserted_id})
-        return NoteObjectSchema(**created)
+        session = causal_session(collection)
+        result = await collection.insert_one(note_data, session=session)
+        created = await collection.find_one({"_id": result.inserted_id}, session=session)
+        return NoteObjectSchema.from_db(created)
 
 
     @classmethod
-    async def get_all(cls):
-        collection = await cls.get_collection()
-        notes = await collection.find({}).to_list(length=None)
-        return [NoteObjectSchema(**note) for note in notes]
+    async def get_all(cls, all_tenants: bool = False):
+        """Notes of the caller's tenant, or of every tenant with `all_tenants` (admins)."""
+        if all_tenants:
+            collections = await get_tenant_collections("Notes", secondary=True)
+        else:
+            collections = [await cls.get_collection(secondary=True)]
+        return await raw_list_response(collections, {}, cls.list_projection, session_for=causal_session)
 
 
     @classmethod
@@ -44,9 +54,10 @@ class NoteService:
         except InvalidId:
             raise cls.error.get(400, "Invalid user ID")
 
-        collection = await cls.get_collection()
-        docs = await collection.find({"user_id": _id}).to_list(length=None)
-        return [NoteObjectSchema(**doc) for doc in docs]
+        collection = await cls.get_collection(secondary=True)
+        return await raw_list_response(
+            [collection], {"user_id": _id}, cls.list_projection, session_for=causal_session,
+        )
 
   
     @classmethod
@@ -60,7 +71,7 @@ class NoteService:
         note = await collection.find_one({"_id": _id})
         if not note:
             raise cls.error.get(404, "Note not found")
-        return NoteObjectSchema(**note)
+        return NoteObjectSchema.from_db(note)
 
 
     @classmethod
@@ -74,12 +85,13 @@ class NoteService:
         update_data = dto.dict(exclude_unset=True)
         update_data["updated_at"] = datetime.utcnow()
 
-        result = await collection.update_one({"_id": _id}, {"$set": update_data})
+        session = causal_session(collection)
+        result = await collection.update_one({"_id": _id}, {"$set": update_data}, session=session)
         if result.modified_count == 0:
             raise cls.error.get(404, "Note not found or no changes made")
 
-        note = await collection.find_one({"_id": _id})
-        return NoteObjectSchema(**note)
+        note = await collection.find_one({"_id": _id}, session=session)
+        return NoteObjectSchema.from_db(note)
 
  
     @classmethod
@@ -90,7 +102,7 @@ class NoteService:
             raise cls.error.get(400, "Invalid note ID")
 
         collection = await cls.get_collection()
-        result = await collection.delete_one({"_id": _id})
+        result = await collection.delete_one({"_id": _id}, session=causal_session(collection))
         if result.deleted_count == 0:
             raise cls.error.get(404, "Note not found")
 
@@ -0,0 +1,183 @@
+from datetime import datetime
+import orjson
+import pytest
+from bson import ObjectId
+from starlette.requests import ClientDisconnect
+from src.apps.note.services import NoteService
+from src.configs.env import DB_NAME
+from src.core import database
+from src.core.memory import MemoryCollection, MemoryRawBatchCursor, MemorySession
+from src.core.tenancy import READ_ONLY_RETRY_AFTER
+from src.utilities.serializers import raw_list_response
+
+
+@pytest.fixture
+def user(signup, create_user):
+    return create_user(signup())
+
+
+def create_note(client, user, title: str = "Groceries", content: str = "eggs, milk") -> dict:
+    response = client.post("/v1/notes", headers=user.headers, json={"title": title, "content": content})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_crud(client, user):
+    note = create_note(client, user)
+    assert note["user_id"] == user.id
+
+    response = client.get(f"/v1/notes/{note['_id']}", headers=user.headers)
+    assert response.status_code == 200
+    assert response.json()["title"] == "Groceries"
+
+    response = client.patch(f"/v1/notes/{note['_id']}", headers=user.headers, json={"title": "Shopping"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Shopping"
+    assert response.json()["updated_at"] is not None
+
+    assert client.delete(f"/v1/notes/{note['_id']}", headers=user.headers).status_code == 204
+    assert client.get(f"/v1/notes/{note['_id']}", headers=user.headers).status_code == 404
+    assert client.delete(f"/v1/notes/{note['_id']}", headers=user.headers).status_code == 404
+
+
+def test_invalid_ids(client, user):
+    assert client.get("/v1/notes/not-an-id", headers=user.headers).status_code == 400
+    assert client.get(f"/v1/notes/{ObjectId()}", headers=user.headers).status_code == 404
+
+
+def test_lists_keep_ids(client, signup, create_user):
+    organization = signup()
+    ada = create_user(organization, "ada@example.com", "08000000001")
+    grace = create_user(organization, "grace@example.com", "08000000002")
+    created = [create_note(client, ada, f"Note {i}") for i in range(3)]
+    create_note(client, grace, "Not Ada's")
+
+    response = client.get("/v1/notes/user", headers=ada.headers)
+    assert response.status_code == 200
+    assert [note["_id"] for note in response.json()] == [note["_id"] for note in created]
+    assert {note["user_id"] for note in response.json()} == {ada.id}
+
+    response = client.get("/v1/notes", headers=ada.headers)
+    assert len(response.json()) == 4
+
+
+def test_requires_login(client, user):
+    note = create_note(client, user)
+    assert client.get("/v1/notes").status_code == 401
+    assert client.get(f"/v1/notes/{note['_id']}").status_code == 401
+    assert client.post("/v1/notes", json={"title": "x", "content": "y"}).status_code == 401
+
+
+def test_only_users_create_notes(client, signup):
+    organization = signup()
+    response = client.post("/v1/notes", headers=organization.headers, json={"title": "x", "content": "y"})
+    assert response.status_code == 401
+
+
+def test_requires_note_permission(client, mongo, user):
+    note = create_note(client, user)
+    users = mongo[DB_NAME]["Users"]
+    client.portal.call(users.update_one, {"_id": ObjectId(user.id)}, {"$set": {"permission_groups": []}})
+
+    assert client.get(f"/v1/notes/{note['_id']}", headers=user.headers).status_code == 403
+    assert client.post("/v1/notes", headers=user.headers, json={"title": "x", "content": "y"}).status_code == 403
+    assert client.delete(f"/v1/notes/{note['_id']}", headers=user.headers).status_code == 403
+
+
+def test_notes_of_a_dedicated_tenant_stay_in_its_database(client, mongo, signup, create_user, place_tenant):
+    organization = signup()
+    tenant_db = place_tenant(organization)
+    user = create_user(organization)
+    note = create_note(client, user)
+
+    assert client.portal.call(tenant_db["Notes"].count_documents, {"_id": ObjectId(note["_id"])}) == 1
+    assert client.portal.call(mongo[DB_NAME]["Notes"].count_documents, {}) == 0
+    assert [n["_id"] for n in client.get("/v1/notes/user", headers=user.headers).json()] == [note["_id"]]
+
+
+def test_admins_list_the_notes_of_every_tenant(client, admin, signup, create_user, place_tenant):
+    acme, globex = signup("Acme"), signup("Globex")
+    place_tenant(acme, "acme_db")
+    place_tenant(globex, "acme_db")  # two tenants sharing a database are listed once
+    ada = create_user(acme, "ada@example.com", "08000000001")
+    grace = create_user(globex, "grace@example.com", "08000000002")
+    created = [create_note(client, ada, "Ada's"), create_note(client, grace, "Grace's")]
+    create_note(client, create_user(signup("Initech"), "bob@example.com", "08000000003"), "Bob's")
+
+    response = client.get("/v1/notes", headers=admin.headers)
+    assert response.status_code == 200
+    assert sorted(n["title"] for n in response.json()) == ["Ada's", "Bob's", "Grace's"]
+    assert {n["_id"] for n in response.json()} >= {n["_id"] for n in created}
+    assert [n["title"] for n in client.get("/v1/notes", headers=ada.headers).json()] == ["Ada's", "Grace's"]
+
+
+def test_writes_are_refused_while_the_tenant_is_read_only(client, signup, create_user, place_tenant):
+    organization = signup()
+    place_tenant(organization)
+    user = create_user(organization)
+    note = create_note(client, user)
+    database.tenant_router.place({**database.tenant_router.placement(organization.id), "read_only": True})
+
+    response = client.post("/v1/notes", headers=user.headers, json={"title": "x", "content": "y"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(READ_ONLY_RETRY_AFTER)
+    assert client.patch(f"/v1/notes/{note['_id']}", headers=user.headers, json={"title": "x"}).status_code == 503
+    assert client.get(f"/v1/notes/{note['_id']}", headers=user.headers).status_code == 200
+
+
+def test_writes_run_in_the_request_session(client, user, monkeypatch):
+    sessions = []
+    insert_one = MemoryCollection.insert_one
+
+    async def recording_insert_one(self, document, **kwargs):
+        sessions.append(kwargs.get("session"))
+        return await insert_one(self, document, **kwargs)
+
+    monkeypatch.setattr(MemoryCollection, "insert_one", recording_insert_one)
+    create_note(client, user)
+    assert len(sessions) == 1 and isinstance(sessions[0], MemorySession)
+
+
+def note_doc(user_id: ObjectId, title: str) -> dict:
+    return {"title": title, "content": "x", "user_id": user_id, "created_at": datetime.utcnow(), "updated_at": None}
+
+
+@pytest.mark.anyio
+async def test_note_lists_stream_in_batches_and_keep_ids(mongo):
+    notes = mongo[DB_NAME]["Notes"]
+    user_id = ObjectId()
+    ids = (await notes.insert_many([note_doc(user_id, f"Note {i}") for i in range(5)])).inserted_ids
+    await notes.insert_one(note_doc(ObjectId(), "Someone else's"))
+
+    response = await raw_list_response([notes], {"user_id": user_id}, NoteService.list_projection, batch_size=2)
+    chunks = [chunk async for chunk in response.body_iterator]
+    assert len(chunks) == 5  # "[", three batches, "]"
+    docs = orjson.loads(b"".join(chunks))
+    assert [doc["_id"] for doc in docs] == [str(_id) for _id in ids]
+    assert {doc["user_id"] for doc in docs} == {str(user_id)}
+
+    response = await raw_list_response([notes], {"user_id": ObjectId()}, NoteService.list_projection)
+    assert b"".join([chunk async for chunk in response.body_iterator]) == b"[]"
+
+
+@pytest.mark.anyio
+async def test_note_list_cursors_close_when_the_stream_never_starts(mongo, monkeypatch):
+    closed = []
+
+    async def close(self):
+        closed.append(self)
+
+    monkeypatch.setattr(MemoryRawBatchCursor, "close", close)
+    notes = mongo[DB_NAME]["Notes"]
+    await notes.insert_many([note_doc(ObjectId(), f"Note {i}") for i in range(3)])
+    response = await raw_list_response([notes], {}, NoteService.list_projection, batch_size=1)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("client went away")
+
+    with pytest.raises(ClientDisconnect):
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+    assert len(closed) == 1
@@ -29,8 +29,6 @@ organization_router = build_router(path="organizations", tags=["Organizations"])
     ],
 )
 async def get_all_organization(request: Request):
-    
-    admin = getattr(request.state, "account", None)
     return await OrganizationService.get_all()
 
 
@@ -42,13 +40,13 @@ async def get_organization_profile(request: Request):
     """
     Returns the authenticated organization's profile.
     """
-    account = getattr(request.state, "account", None)
-    account_type = getattr(request.state, "account_type", None)
+    user_id = getattr(request.state, "user_id", None)
+    user_type = getattr(request.state, "user_type", None)
 
-    if not account or account_type != "organization":
+    if not user_id or user_type != "organization":
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    return await OrganizationService.get_by_id(org_id=str(account["_id"]))
+    return await OrganizationService.get_by_id(org_id=user_id)
 
 
 
@@ -8,7 +8,9 @@ from src.apps.organization.schemas import (
 )
 from src.errors.base import ErrorHandler
 from fastapi import Response, HTTPException, status
-from src.core.database import get_collection
+from src.utilities.serializers import JSONBytesResponse
+from src.core.database import get_collection, causal_session
+from src.core.write_behind import last_login_buffer
 from src.utilities.crypto.hash import set_password, verify_password
 from src.utilities.crypto.jwt import JWTService
 from datetime import datetime
@@ -41,8 +43,8 @@ class OrganizationService:
         )
 
     @classmethod
-    async def get_collection(cls):
-        return await get_collection("Organizations")
+    async def get_collection(cls, secondary: bool = False):
+        return await get_collection("Organizations", secondary=secondary)
 
 
     @classmethod
@@ -55,11 +57,8 @@ class OrganizationService:
         if not verify_password(plain_password=dto.password, hashed_password=org["password"]):
             raise cls.error.get(400)
         lagos_tz = pytz.timezone("Africa/Lagos")
-        await collection.update_one(
-            {"_id": org["_id"]},
-            {"$set": {"last_login": datetime.now(lagos_tz)}}
-        )
-        data = {"id": str(org["_id"]), "user_type": "organization"}
+        last_login_buffer.set("Organizations", org["_id"], {"last_login": datetime.now(lagos_tz)})
+        data = {"id": str(org["_id"]), "user_type": "organization", "tenant_id": str(org["_id"])}
         tokens = cls.token.generate_token(data)
         return cls._set_auth_cookies(response, tokens)
 
@@ -103,10 +102,10 @@ class OrganizationService:
         ]
 
         # Insert organization
-        result = await collection.insert_one(org_data)
+        result = await collection.insert_one(org_data, session=causal_session(collection))
 
         # Generate tokens
-        data = {"id": str(result.inserted_id), "user_type": "organization"}
+        data = {"id": str(result.inserted_id), "user_type": "organization", "tenant_id": str(result.inserted_id)}
         tokens = cls.token.generate_token(data)
 
         print(f"✅ Organization '{dto.name}' created with NotePermission and UserPermission")
@@ -123,14 +122,14 @@ class OrganizationService:
         collection = await cls.get_collection()
         org = await collection.find({"_id": _id}).to_list(length=1)
         if org:
-            return OrganizationObjectSchema(**org[0])
+            return OrganizationObjectSchema.from_db(org[0])
         return None
     
     @classmethod
     async def get_all(cls):
-        collection = await cls.get_collection()
-        docs = await collection.find({}).to_list(length=None)
-        return [OrganizationObjectSchema(**doc) for doc in docs]
+        collection = await cls.get_collection(secondary=True)
+        docs = await collection.find({}, session=causal_session(collection)).to_list(length=None)
+        return JSONBytesResponse(OrganizationObjectSchema.dump_list(docs))
 
 
     # ---------------- UPDATE ----------------
@@ -148,12 +147,13 @@ class OrganizationService:
 
         result = await collection.update_one(
             {"_id": _id},
-            {"$set": update_data}
+            {"$set": update_data},
+            session=causal_session(collection),
         )
 
         if result.modified_count:
             org = await collection.find({"_id": _id}).to_list(length=1)
-            return OrganizationObjectSchema(**org[0])
+            return OrganizationObjectSchema.from_db(org[0])
         return None
 
     # ---------------- DELETE ----------------
@@ -164,5 +164,5 @@ class OrganizationService:
         except InvalidId:
             return 0
         collection = await cls.get_collection()
-        result = await collection.delete_one({"_id": _id})
+        result = await collection.delete_one({"_id": _id}, session=causal_session(collection))
         return result.deleted_count
@@ -1 +1,80 @@
-from pytest import P
\ No newline at end of file
+from src.configs.env import ADMIN_EMAIL, ADMIN_PASSWORD
+from src.conftest import PASSWORD, auth
+from src.scripts.seed import seed_admin
+
+
+def admin_headers(client) -> dict:
+    client.portal.call(seed_admin)
+    return auth(client.post("/v1/admin/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}))
+
+
+def test_signup_sets_auth_cookies(client):
+    response = client.post("/v1/organizations", json={
+        "name": "Acme", "email": "acme@example.com", "phone_number": "08000000000", "password": PASSWORD,
+    })
+    assert response.status_code == 201
+    assert {"access_token", "refresh_token"} <= set(response.cookies.keys())
+
+
+def test_signup_rejects_duplicates(client, signup):
+    signup("Acme")
+    response = client.post("/v1/organizations", json={
+        "name": "Acme", "email": "other@example.com", "phone_number": "08000000009", "password": PASSWORD,
+    })
+    assert response.status_code == 409
+
+
+def test_login(client, signup):
+    organization = signup()
+    response = client.post("/v1/organizations/login", json={"email": organization.email, "password": PASSWORD})
+    assert response.status_code == 200
+    assert response.cookies.get("access_token")
+
+
+def test_login_rejects_wrong_password_and_unknown_email(client, signup):
+    organization = signup()
+    assert client.post(
+        "/v1/organizations/login", json={"email": organization.email, "password": "wrong"},
+    ).status_code == 400
+    assert client.post(
+        "/v1/organizations/login", json={"email": "nobody@example.com", "password": PASSWORD},
+    ).status_code == 400
+
+
+def test_whoami(client, signup):
+    organization = signup()
+    response = client.get("/v1/organizations/whoami", headers=organization.headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == organization.email
+    assert client.get("/v1/organizations/whoami").status_code == 401
+
+
+def test_organizations_cannot_manage_organizations(client, signup):
+    organization = signup()
+    assert client.get("/v1/organizations").status_code == 401
+    assert client.get("/v1/organizations", headers=organization.headers).status_code == 403
+    assert client.patch(
+        f"/v1/organizations/{organization.id}", headers=organization.headers, json={"name": "Renamed"},
+    ).status_code == 403
+    assert client.delete(f"/v1/organizations/{organization.id}", headers=organization.headers).status_code == 403
+
+
+def test_admin_crud(client, signup):
+    organization = signup("Acme")
+    signup("Globex")
+    headers = admin_headers(client)
+
+    response = client.get("/v1/organizations", headers=headers)
+    assert response.status_code == 200
+    assert sorted(org["name"] for org in response.json()) == ["Acme", "Globex"]
+
+    response = client.get(f"/v1/organizations/{organization.id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == organization.email
+
+    response = client.patch(f"/v1/organizations/{organization.id}", headers=headers, json={"name": "Acme Ltd"})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Acme Ltd"
+
+    assert client.delete(f"/v1/organizations/{organization.id}", headers=headers).status_code == 204
+    assert client.get(f"/v1/organizations/{organization.id}", headers=headers).json() is None
@@ -4,7 +4,7 @@ from datetime import datetime
 from src.core.database import get_collection
 from src.errors.base import ErrorHandler
 from src.apps.permission.schemas import PermissionObjectSchema, PermissionGroupObjectSchema
-from src.utilities.serializers import serialize_mongo_doc
+from src.utilities.serializers import MongoJSONResponse
 
 
 class PermissionService:
@@ -29,7 +29,7 @@ class PermissionService:
     async def get_all(cls):
         collection = await cls.get_collection()
         permissions = await collection.find({}).to_list(length=None)
-        return serialize_mongo_doc(permissions)
+        return MongoJSONResponse(permissions)
 
     @classmethod
     async def get_by_id(cls, id: str):
@@ -37,7 +37,7 @@ class PermissionService:
         obj = await collection.find_one({"_id": ObjectId(id)})
         if not obj:
             raise cls.error.get(404, "Permission not found")
-        return serialize_mongo_doc(obj)
+        return MongoJSONResponse(obj)
 
     # ✅ Delete Permission
     @classmethod
@@ -101,7 +101,7 @@ class PermissionGroupService:
                     )
 
             g["permissions"] = resolved_permissions
-        return serialize_mongo_doc(groups)
+        return MongoJSONResponse(groups)
 
     @classmethod
     async def get_by_id(cls, group_id: str):
@@ -132,7 +132,7 @@ class PermissionGroupService:
         group["_id"] = str(group["_id"])
         group["permissions"] = resolved_permissions
 
-        return serialize_mongo_doc(group)
+        return MongoJSONResponse(group)
 
 
     @classmethod
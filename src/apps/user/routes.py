@@ -24,11 +24,9 @@ user_router = build_router(path="users", tags=["Users"])
 )
 async def get_all_users(request: Request):
     """
-    Fetch all users (permission controlled)
+    Fetch all users (permission controlled); admins get every organization's.
     """
-    
-    account = getattr(request.state, "account", None)
-    return await UserService.get_all()
+    return await UserService.get_all(all_tenants=getattr(request.state, "user_type", None) == "admin")
 
 
 
@@ -36,11 +34,11 @@ async def get_all_users(request: Request):
 
 @user_router.get("/whoami", status_code=200)
 async def get_user_profile(request: Request):
-    account = getattr(request.state, "account", None)
-    if not account:
+    user_id = getattr(request.state, "user_id", None)
+    if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    return await UserService.get_by_id(user_id=str(account["_id"]))
+    return await UserService.get_by_id(user_id=user_id)
 
 
 
@@ -66,11 +64,11 @@ async def create_user(
     response: Response,
     request: Request,
 ):
-    account = getattr(request.state, "account", None)
-    if not account:
+    user_id = getattr(request.state, "user_id", None)
+    if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    org_id = str(account["_id"]) if request.state.account_type == "organization" else None
+    org_id = user_id if request.state.user_type == "organization" else None
     return await UserService.create(dto=dto, response=response, org_id=org_id)
 
 
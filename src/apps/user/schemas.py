@@ -1,25 +1,9 @@
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
-from bson import ObjectId
+from src.utilities.base_schema import PyObjectId, DocumentModel
 from src.enums.base import OrganizationRole
 
-class PyObjectId(ObjectId):
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
-
-    @classmethod
-    def validate(cls, v, info=None):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return ObjectId(v)
-
-    @classmethod
-    def __get_pydantic_json_schema__(cls, core_schema, handler):
-        return {"type": "string"}
-
-
 
 class UserCreateSchema(BaseModel):
     first_name: str = Field(..., max_length=55)
@@ -41,7 +25,7 @@ class UserUpdateSchema(BaseModel):
     updated_at: Optional[datetime] = None   
 
 
-class UserObjectSchema(BaseModel):
+class UserObjectSchema(DocumentModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     first_name: str = Field(..., max_length=55)
     last_name: str = Field(..., max_length=55)
@@ -50,11 +34,10 @@ class UserObjectSchema(BaseModel):
     role: OrganizationRole
     password: str = Field(..., max_length=128)
     created_at: datetime
-    updated_at: Optional[datetime]
+    updated_at: Optional[datetime] = None
 
     model_config = {
-        "populate_by_name": True,  
-        "json_encoders": {ObjectId: str}
+        "populate_by_name": True,
     }
 
 
@@ -7,7 +7,10 @@ from src.apps.user.schemas import (
 from bson import ObjectId
 from bson.errors import InvalidId
 from fastapi import Response
-from src.core.database import get_collection
+from src.utilities.serializers import JSONBytesResponse
+from src.core.database import get_collection, get_tenant_collections, tenant_router, causal_session
+from src.core.tenancy import USER_DIRECTORY_COLLECTION
+from src.core.write_behind import last_login_buffer
 from src.utilities.crypto.hash import set_password, verify_password
 from src.utilities.crypto.jwt import JWTService
 from datetime import datetime
@@ -47,25 +50,31 @@ class UserService:
         )
 
     @classmethod
-    async def get_collection(cls):
-        return await get_collection("Users")
+    async def get_collection(cls, tenant_id: str | None = None, secondary: bool = False):
+        return await get_collection("Users", tenant_id=tenant_id, secondary=secondary)
     
 
     @classmethod
     async def login_org(cls, dto: UserLoginSchema, response: Response):
         collection = await cls.get_collection()
         org = await collection.find_one({"email": dto.email})
+        if not org:
+            # Users of organizations placed in a dedicated database are not in the shared
+            # collection; the directory names their tenant, so this is one lookup at most.
+            directory = await get_collection(USER_DIRECTORY_COLLECTION)
+            entry = await directory.find_one({"email": dto.email})
+            if entry and tenant_router.placement(entry["tenant_id"]):
+                collection = await get_collection("Users", tenant_id=entry["tenant_id"])
+                org = await collection.find_one({"email": dto.email})
         if not org:
             raise cls.error.get(400)
 
         if not verify_password(plain_password=dto.password, hashed_password=org["password"]):
             raise cls.error.get(400)
         lagos_tz = pytz.timezone("Africa/Lagos")
-        await collection.update_one(
-            {"_id": org["_id"]},
-            {"$set": {"last_login": datetime.now(lagos_tz)}}
-        )
-        data = {"id": str(org["_id"]), "user_type": "user"}
+        tenant_id = str(org["organization_id"]) if org.get("organization_id") else None
+        last_login_buffer.set("Users", org["_id"], {"last_login": datetime.now(lagos_tz)}, tenant_id=tenant_id)
+        data = {"id": str(org["_id"]), "user_type": "user", "tenant_id": tenant_id}
         tokens = cls.token.generate_token(data)   
         return cls._set_auth_cookies(response, tokens)
 
@@ -73,7 +82,7 @@ class UserService:
     # ---------------- CREATE ----------------
     @classmethod
     async def create(cls, dto, response: Response, org_id: str | None = None):
-        users_col = await cls.get_collection()
+        users_col = await cls.get_collection(tenant_id=org_id)
         perm_group_col = await get_collection("PermissionGroups")
 
         if org_id:
@@ -109,8 +118,14 @@ class UserService:
 
         if org_id:
             user_data["organization_id"] = org_object_id
-        result = await users_col.insert_one(user_data)
-        data = {"id": str(result.inserted_id), "user_type": "user"}
+        result = await users_col.insert_one(user_data, session=causal_session(users_col))
+        if org_id:
+            directory = await get_collection(USER_DIRECTORY_COLLECTION)
+            await directory.insert_one(
+                {"email": dto.email, "user_id": result.inserted_id, "tenant_id": org_id},
+                session=causal_session(directory),
+            )
+        data = {"id": str(result.inserted_id), "user_type": "user", "tenant_id": org_id}
         tokens = cls.token.generate_token(data)
 
         print(f"✅ New user created with NotePermission: {dto.email}")
@@ -127,14 +142,20 @@ class UserService:
         collection = await cls.get_collection()
         org = await collection.find({"_id": _id}).to_list(length=1)
         if org:
-            return UserObjectSchema(**org[0])
+            return UserObjectSchema.from_db(org[0])
         return None
     
     @classmethod
-    async def get_all(cls):
-        collection = await cls.get_collection()
-        docs = await collection.find({}).to_list(length=None)
-        return [UserObjectSchema(**doc) for doc in docs]
+    async def get_all(cls, all_tenants: bool = False):
+        """Users of the caller's tenant, or of every tenant with `all_tenants` (admins)."""
+        if all_tenants:
+            collections = await get_tenant_collections("Users", secondary=True)
+        else:
+            collections = [await cls.get_collection(secondary=True)]
+        docs = []
+        for collection in collections:
+            docs += await collection.find({}, session=causal_session(collection)).to_list(length=None)
+        return JSONBytesResponse(UserObjectSchema.dump_list(docs))
 
 
     # ---------------- UPDATE ----------------
@@ -152,12 +173,18 @@ class UserService:
 
         result = await collection.update_one(
             {"_id": _id},
-            {"$set": update_data}
+            {"$set": update_data},
+            session=causal_session(collection),
         )
 
         if result.modified_count:
-            org = await collection.find({"_id": _id}).to_list(length=1)
-            return UserObjectSchema(**org[0])
+            if "email" in update_data:
+                directory = await get_collection(USER_DIRECTORY_COLLECTION)
+                await directory.update_one(
+                    {"user_id": _id}, {"$set": {"email": update_data["email"]}}, session=causal_session(directory),
+                )
+            org = await collection.find({"_id": _id}, session=causal_session(collection)).to_list(length=1)
+            return UserObjectSchema.from_db(org[0])
         return None
 
     # ---------------- DELETE ----------------
@@ -168,6 +195,9 @@ class UserService:
         except InvalidId:
             return 0
         collection = await cls.get_collection()
-        result = await collection.delete_one({"_id": _id})
+        result = await collection.delete_one({"_id": _id}, session=causal_session(collection))
+        if result.deleted_count:
+            directory = await get_collection(USER_DIRECTORY_COLLECTION)
+            await directory.delete_one({"user_id": _id}, session=causal_session(directory))
         return result.deleted_count
 
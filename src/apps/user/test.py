@@ -0,0 +1,134 @@
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+from src.apps.user.schemas import UserCreateSchema, UserLoginSchema, UserUpdateSchema
+from src.apps.user.services import UserService
+from src.configs.env import DB_NAME
+from src.conftest import PASSWORD
+from src.core.database import tenant_router
+from src.core.tenancy import USER_DIRECTORY_COLLECTION, current_tenant
+
+
+def login(client, email: str, password: str = PASSWORD):
+    return client.post("/v1/users/login", json={"email": email, "password": password})
+
+
+def service_login(email: str, password: str = PASSWORD):
+    return UserService.login_org(UserLoginSchema(email=email, password=password), Response())
+
+
+def update(email: str, phone_number: str = "08000000001", **fields) -> dict:
+    return {"email": email, "phone_number": phone_number, **fields}
+
+
+def test_create_requires_an_account(client):
+    response = client.post("/v1/users", json={
+        "first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com",
+        "phone_number": "08000000001", "password": PASSWORD,
+    })
+    assert response.status_code == 401
+
+
+def test_create_rejects_duplicate_email(client, signup, create_user):
+    organization = signup()
+    create_user(organization)
+    response = client.post("/v1/users", headers=organization.headers, json={
+        "first_name": "Ada", "last_name": "Byron", "email": "ada@example.com",
+        "phone_number": "08000000002", "password": PASSWORD,
+    })
+    assert response.status_code == 415
+
+
+def test_login(client, signup, create_user):
+    user = create_user(signup())
+    assert login(client, user.email).status_code == 200
+    assert login(client, user.email, "wrong").status_code == 400
+    assert login(client, "nobody@example.com").status_code == 400
+
+
+def test_whoami(client, signup, create_user):
+    user = create_user(signup())
+    response = client.get("/v1/users/whoami", headers=user.headers)
+    assert response.status_code == 200
+    assert response.json()["_id"] == user.id
+    assert client.get("/v1/users/whoami").status_code == 401
+
+
+def test_organization_manages_its_users(client, signup, create_user):
+    organization = signup()
+    user = create_user(organization)
+
+    response = client.get("/v1/users", headers=organization.headers)
+    assert response.status_code == 200
+    assert [u["email"] for u in response.json()] == [user.email]
+
+    response = client.get(f"/v1/users/{user.id}", headers=organization.headers)
+    assert response.json()["email"] == user.email
+
+    response = client.patch(
+        f"/v1/users/{user.id}", headers=organization.headers, json=update(user.email, first_name="Augusta"),
+    )
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Augusta"
+
+    assert client.delete(f"/v1/users/{user.id}", headers=organization.headers).status_code == 204
+    assert login(client, user.email).status_code == 400
+
+
+def test_users_cannot_manage_users(client, signup, create_user):
+    user = create_user(signup())
+    assert client.get("/v1/users", headers=user.headers).status_code == 403
+    assert client.get(f"/v1/users/{user.id}", headers=user.headers).status_code == 403
+    assert client.patch(
+        f"/v1/users/{user.id}", headers=user.headers, json=update(user.email, first_name="Eve"),
+    ).status_code == 403
+    assert client.delete(f"/v1/users/{user.id}", headers=user.headers).status_code == 403
+
+
+def test_organizations_only_see_their_own_users_in_a_dedicated_database(client, signup, create_user, place_tenant):
+    acme, globex = signup("Acme"), signup("Globex")
+    place_tenant(acme)
+    create_user(acme, "ada@example.com", "08000000001")
+    create_user(globex, "grace@example.com", "08000000002")
+
+    assert [u["email"] for u in client.get("/v1/users", headers=acme.headers).json()] == ["ada@example.com"]
+
+
+def test_admins_list_the_users_of_every_tenant(client, admin, signup, create_user, place_tenant):
+    acme, globex = signup("Acme"), signup("Globex")
+    place_tenant(acme)
+    create_user(acme, "ada@example.com", "08000000001")
+    create_user(globex, "grace@example.com", "08000000002")
+
+    response = client.get("/v1/users", headers=admin.headers)
+    assert response.status_code == 200
+    assert sorted(u["email"] for u in response.json()) == ["ada@example.com", "grace@example.com"]
+
+
+@pytest.mark.anyio
+async def test_users_of_a_dedicated_tenant_log_in_through_the_directory(mongo):
+    tenant_id = str(ObjectId())
+    tenant_router.place({"tenant_id": tenant_id, "database": "tenant_db", "uri": None, "read_only": False})
+    await UserService.create(UserCreateSchema(
+        first_name="Ada", last_name="Lovelace", email="ada@example.com", phone_number="08000000001", password=PASSWORD,
+    ), Response(), org_id=tenant_id)
+
+    user = await mongo["tenant_db"]["Users"].find_one({"email": "ada@example.com"})
+    assert await mongo[DB_NAME]["Users"].count_documents({}) == 0
+    directory = mongo[DB_NAME][USER_DIRECTORY_COLLECTION]
+    assert (await directory.find_one({"email": "ada@example.com"}))["tenant_id"] == tenant_id
+
+    await service_login("ada@example.com")
+    with pytest.raises(HTTPException) as exc:
+        await service_login("ada@example.com", "wrong")
+    assert exc.value.status_code == 400
+
+    # The directory follows email changes and deletions.
+    token = current_tenant.set(tenant_id)
+    try:
+        await UserService.update(str(user["_id"]), UserUpdateSchema(email="ada.l@example.com", phone_number="08000000001"))
+        await service_login("ada.l@example.com")
+        assert await UserService.delete(str(user["_id"])) == 1
+    finally:
+        current_tenant.reset(token)
+    assert await directory.count_documents({}) == 0
@@ -1,21 +1,70 @@
-import os
-from dotenv import load_dotenv
+from src.configs.settings import get_settings
 
 
+# Module-level names kept for existing imports; values come from the
+# validated Settings object.
+settings = get_settings()
 
-load_dotenv()
+APP_ENV = settings.APP_ENV
+DB_BACKEND = settings.DB_BACKEND
+DB_URI = settings.DB_URI
+DB_NAME = settings.DB_NAME
+DB_MIN_POOL_SIZE = settings.DB_MIN_POOL_SIZE
+DB_MAX_POOL_SIZE = settings.DB_MAX_POOL_SIZE
+TENANT_PLACEMENT_REFRESH_SECONDS = settings.TENANT_PLACEMENT_REFRESH_SECONDS
+LAST_LOGIN_FLUSH_SECONDS = settings.LAST_LOGIN_FLUSH_SECONDS
+WRITE_BEHIND_MAX_RETRIES = settings.WRITE_BEHIND_MAX_RETRIES
+WRITE_BEHIND_MAX_PENDING = settings.WRITE_BEHIND_MAX_PENDING
+READ_MAX_STALENESS_SECONDS = settings.READ_MAX_STALENESS_SECONDS
+TRUSTED_DB_READS = settings.TRUSTED_DB_READS
+DB_FAULTS = settings.DB_FAULTS
+HEALTH_CHECK_INTERVAL_SECONDS = settings.HEALTH_CHECK_INTERVAL_SECONDS
+HEALTH_CHECK_TIMEOUT_SECONDS = settings.HEALTH_CHECK_TIMEOUT_SECONDS
+REQUEST_DEADLINE_SECONDS = settings.REQUEST_DEADLINE_SECONDS
+COMPRESSION_MIN_SIZE = settings.COMPRESSION_MIN_SIZE
+COMPRESSION_THREAD_SIZE = settings.COMPRESSION_THREAD_SIZE
+GZIP_LEVEL = settings.GZIP_LEVEL
+BROTLI_QUALITY = settings.BROTLI_QUALITY
+ZSTD_LEVEL = settings.ZSTD_LEVEL
+LAZY_ROUTERS = settings.LAZY_ROUTERS
+PROFILING_ENABLED = settings.PROFILING_ENABLED
+PROFILE_SAMPLE_INTERVAL_MS = settings.PROFILE_SAMPLE_INTERVAL_MS
+PROFILE_STORE_SIZE = settings.PROFILE_STORE_SIZE
+LOOP_MONITOR_ENABLED = settings.LOOP_MONITOR_ENABLED
+LOOP_MONITOR_INTERVAL_MS = settings.LOOP_MONITOR_INTERVAL_MS
+LOOP_LAG_THRESHOLD_MS = settings.LOOP_LAG_THRESHOLD_MS
+RATE_LIMIT_ENABLED = settings.RATE_LIMIT_ENABLED
+RATE_LIMIT_BACKEND = settings.RATE_LIMIT_BACKEND
+RATE_LIMIT_REDIS_URL = settings.RATE_LIMIT_REDIS_URL
+RATE_LIMIT_READ = settings.RATE_LIMIT_READ
+RATE_LIMIT_WRITE = settings.RATE_LIMIT_WRITE
+RATE_LIMIT_LOGIN = settings.RATE_LIMIT_LOGIN
+TRUSTED_PROXIES = settings.TRUSTED_PROXIES
+ADMISSION_ENABLED = settings.ADMISSION_ENABLED
+ADMISSION_INITIAL_LIMIT = settings.ADMISSION_INITIAL_LIMIT
+ADMISSION_MIN_LIMIT = settings.ADMISSION_MIN_LIMIT
+ADMISSION_MAX_LIMIT = settings.ADMISSION_MAX_LIMIT
+ADMISSION_MAX_IN_FLIGHT = settings.ADMISSION_MAX_IN_FLIGHT
+ADMISSION_QUEUE_SIZE = settings.ADMISSION_QUEUE_SIZE
+ADMISSION_QUEUE_TIMEOUT_MS = settings.ADMISSION_QUEUE_TIMEOUT_MS
+ADMISSION_LATENCY_TOLERANCE = settings.ADMISSION_LATENCY_TOLERANCE
 
+SERVER_HOST = settings.SERVER_HOST
+SERVER_PORT = settings.SERVER_PORT
+WEB_CONCURRENCY = settings.WEB_CONCURRENCY
+SERVER_KEEPALIVE_SECONDS = settings.SERVER_KEEPALIVE_SECONDS
+SERVER_BACKLOG = settings.SERVER_BACKLOG
+SERVER_MAX_REQUESTS = settings.SERVER_MAX_REQUESTS
+SERVER_GRACEFUL_SHUTDOWN_SECONDS = settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS
 
-DB_URI = str(os.getenv("DB_URI"))
+JWT_ACCESS_EXPIRY = settings.JWT_ACCESS_EXPIRY
+JWT_REFRESH_EXPIRY = settings.JWT_REFRESH_EXPIRY
+JWT_ACCESS_SECRET = settings.JWT_ACCESS_SECRET
+JWT_ALGORITHM = settings.JWT_ALGORITHM
+ENCRYPTION_KEY = settings.ENCRYPTION_KEY
 
-JWT_ACCESS_EXPIRY = int(os.getenv('JWT_ACCESS_EXPIRY'))
-JWT_REFRESH_EXPIRY = int(os.getenv('JWT_REFRESH_EXPIRY'))
-JWT_ACCESS_SECRET = str(os.getenv('JWT_ACCESS_SECRET'))
-JWT_ALGORITHM = str(os.getenv('JWT_ALGORITHM'))
-ENCRYPTION_KEY = str(os.getenv('ENCRYPTION_KEY'))
-
-ADMIN_EMAIL = str(os.getenv("ADMIN_EMAIL"))
-ADMIN_FIRSTNAME = str(os.getenv("ADMIN_FIRSTNAME"))
-ADMIN_LASTNAME = str(os.getenv("ADMIN_LASTNAME"))
-ADMIN_PASSWORD = str(os.getenv("ADMIN_PASSWORD"))
-ADMIN_PHONENUMBER = str(os.getenv("ADMIN_PHONENUMBER"))
\ No newline at end of file
+ADMIN_EMAIL = settings.ADMIN_EMAIL
+ADMIN_FIRSTNAME = settings.ADMIN_FIRSTNAME
+ADMIN_LASTNAME = settings.ADMIN_LASTNAME
+ADMIN_PASSWORD = settings.ADMIN_PASSWORD
+ADMIN_PHONENUMBER = settings.ADMIN_PHONENUMBER
@@ -0,0 +1,119 @@
+import ipaddress
+import os
+from functools import lru_cache
+from typing import Literal, Optional
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+
+# "<tokens per second>/<burst>"
+RATE_PATTERN = r"^\d+(\.\d+)?(/\d+(\.\d+)?)?$"
+
+
+class Settings(BaseModel):
+    """
+    Application settings, read from the environment (and `.env`) once and
+    validated, so a missing or malformed variable fails at startup with the
+    variable's name instead of an `int(None)` traceback.
+    """
+    model_config = {"frozen": True, "extra": "ignore"}
+
+    APP_ENV: Literal["development", "production"] = "development"
+    DB_BACKEND: Literal["mongo", "memory"] = "mongo"
+    DB_URI: str = "mongodb://localhost:27017"
+    DB_NAME: str = "notesas"
+    DB_MIN_POOL_SIZE: int = 5
+    DB_MAX_POOL_SIZE: int = 50
+    TENANT_PLACEMENT_REFRESH_SECONDS: float = 30
+    LAST_LOGIN_FLUSH_SECONDS: float = 5
+    WRITE_BEHIND_MAX_RETRIES: int = Field(5, ge=0)
+    WRITE_BEHIND_MAX_PENDING: int = Field(100000, ge=1)
+    # MongoDB rejects maxStalenessSeconds below 90.
+    READ_MAX_STALENESS_SECONDS: int = Field(90, ge=90)
+    TRUSTED_DB_READS: bool = True
+    # JSON fault-injection rules for get_collection (see src/core/faults.py); never in production.
+    DB_FAULTS: Optional[str] = None
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2
+    REQUEST_DEADLINE_SECONDS: float = Field(10, gt=0)
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_THREAD_SIZE: int = 262144
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    ZSTD_LEVEL: int = 3
+    LAZY_ROUTERS: bool = True
+    PROFILING_ENABLED: bool = True
+    PROFILE_SAMPLE_INTERVAL_MS: float = 2
+    PROFILE_STORE_SIZE: int = 50
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_MS: float = 100
+    LOOP_LAG_THRESHOLD_MS: float = 100
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: Literal["memory", "redis"] = "memory"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_READ: str = Field("50/100", pattern=RATE_PATTERN)
+    RATE_LIMIT_WRITE: str = Field("10/20", pattern=RATE_PATTERN)
+    RATE_LIMIT_LOGIN: str = Field("0.2/5", pattern=RATE_PATTERN)
+    # Comma-separated IPs or networks of the proxies allowed to set X-Forwarded-For.
+    TRUSTED_PROXIES: str = ""
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_INITIAL_LIMIT: int = Field(50, ge=1)
+    ADMISSION_MIN_LIMIT: int = Field(4, ge=1)
+    ADMISSION_MAX_LIMIT: int = Field(500, ge=1)
+    ADMISSION_MAX_IN_FLIGHT: int = Field(1000, ge=1)
+    ADMISSION_QUEUE_SIZE: int = Field(100, ge=0)
+    ADMISSION_QUEUE_TIMEOUT_MS: float = Field(50, ge=0)
+    ADMISSION_LATENCY_TOLERANCE: float = Field(2.0, gt=1)
+
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8080
+    WEB_CONCURRENCY: int = 0
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_BACKLOG: int = 2048
+    SERVER_MAX_REQUESTS: int = 0
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+
+    JWT_ACCESS_EXPIRY: int = 15
+    JWT_REFRESH_EXPIRY: int = 7
+    JWT_ACCESS_SECRET: str
+    JWT_ALGORITHM: str = "HS256"
+    ENCRYPTION_KEY: Optional[str] = None
+
+    ADMIN_EMAIL: Optional[str] = None
+    ADMIN_FIRSTNAME: Optional[str] = None
+    ADMIN_LASTNAME: Optional[str] = None
+    ADMIN_PASSWORD: Optional[str] = None
+    ADMIN_PHONENUMBER: Optional[str] = None
+
+    @field_validator("RATE_LIMIT_READ", "RATE_LIMIT_WRITE", "RATE_LIMIT_LOGIN")
+    @classmethod
+    def positive_rate(cls, value: str) -> str:
+        rate, _, burst = value.partition("/")
+        if float(rate) <= 0 or float(burst or rate) < 1:
+            raise ValueError("rate must be greater than 0 and burst at least 1")
+        return value
+
+    @field_validator("TRUSTED_PROXIES")
+    @classmethod
+    def proxy_networks(cls, value: str) -> str:
+        for network in filter(None, map(str.strip, value.split(","))):
+            ipaddress.ip_network(network, strict=False)
+        return value
+
+    @model_validator(mode="after")
+    def no_faults_in_production(self):
+        if self.DB_FAULTS and self.APP_ENV == "production":
+            raise ValueError("DB_FAULTS must not be set when APP_ENV=production")
+        return self
+
+
+@lru_cache
+def get_settings() -> Settings:
+    load_dotenv()
+    values = {name: os.environ[name] for name in Settings.model_fields if os.environ.get(name)}
+    try:
+        return Settings(**values)
+    except ValidationError as exc:
+        problems = "; ".join(
+            f"{'.'.join(map(str, e['loc']))}: {e['msg']}" if e["loc"] else e["msg"] for e in exc.errors()
+        )
+        raise RuntimeError(f"Invalid environment configuration: {problems}") from None
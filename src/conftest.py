@@ -0,0 +1,141 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+# Tests run on the in-memory database. The rate limiter is tested on its own
+# in src/core/test.py; here it would refuse the repeated logins from one IP.
+os.environ["DB_BACKEND"] = "memory"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+from src.configs.env import DB_NAME
+from src.core import database
+from src.core.database import get_collection
+from src.core.memory import MemoryClient
+from src.core.tenancy import PLACEMENT_COLLECTION
+from src.scripts.seed import seed_permission_groups, seed_permissions
+
+PASSWORD = "Secret#2024"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def mongo():
+    """A fresh in-memory database behind `get_collection`, with permissions and groups seeded."""
+    async def seed():
+        await database.tenant_router.load(database.client[DB_NAME][PLACEMENT_COLLECTION])
+        await seed_permission_groups(await seed_permissions())
+
+    database.client = MemoryClient()
+    asyncio.run(seed())
+    yield database.client
+    database.client = None
+
+
+@pytest.fixture
+def client(mongo):
+    from src.scripts.server import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+def auth(response) -> dict:
+    """Headers carrying the access token of a signup or login response (the cookie is `Secure`)."""
+    assert response.status_code in (200, 201), response.text
+    return {"cookie": f"access_token={response.cookies['access_token']}"}
+
+
+@pytest.fixture
+def signup(client, mongo):
+    """Signs an organization up; returns its id and auth headers."""
+    def signup(name: str = "Acme"):
+        email = f"{name.lower()}@example.com"
+        response = client.post("/v1/organizations", json={
+            "name": name, "email": email, "phone_number": f"0800{len(name):07d}", "password": PASSWORD,
+        })
+        headers = auth(response)
+        org = client.portal.call(mongo[DB_NAME]["Organizations"].find_one, {"email": email})
+        return SimpleNamespace(id=str(org["_id"]), email=email, headers=headers)
+    return signup
+
+
+@pytest.fixture
+def admin(client, mongo):
+    """Signs an admin up and gives them the admin role (signups are moderators); returns their auth headers."""
+    response = client.post("/v1/admin/signup", json={
+        "first_name": "Root", "last_name": "Admin", "email": "root@example.com",
+        "phone_number": "08099999999", "password": PASSWORD,
+    })
+    headers = auth(response)
+    client.portal.call(mongo[DB_NAME]["Admins"].update_one, {"email": "root@example.com"}, {"$set": {"role": "admin"}})
+    return SimpleNamespace(headers=headers)
+
+
+@pytest.fixture
+def create_user(client):
+    """Creates a user in `organization` and logs them in; returns their id and auth headers."""
+    async def find_user(tenant_id: str, email: str):
+        users = await get_collection("Users", tenant_id=tenant_id)
+        return await users.find_one({"email": email})
+
+    def create_user(organization, email: str = "ada@example.com", phone_number: str = "08000000001"):
+        response = client.post("/v1/users", headers=organization.headers, json={
+            "first_name": "Ada", "last_name": "Lovelace", "email": email,
+            "phone_number": phone_number, "password": PASSWORD,
+        })
+        assert response.status_code == 201, response.text
+        user = client.portal.call(find_user, organization.id, email)
+        response = client.post("/v1/users/login", json={"email": email, "password": PASSWORD})
+        return SimpleNamespace(id=str(user["_id"]), email=email, headers=auth(response))
+    return create_user
+
+
+@pytest.fixture
+def place_tenant(client, mongo):
+    """Places an organization in a dedicated database; returns that database."""
+    def place_tenant(organization, name: str = "tenant_db", read_only: bool = False):
+        placement = {"tenant_id": organization.id, "database": name, "uri": None, "read_only": read_only}
+        client.portal.call(mongo[DB_NAME][PLACEMENT_COLLECTION].insert_one, dict(placement))
+        database.tenant_router.place(placement)
+        return mongo[name]
+    return place_tenant
+
+
+async def call(app, path: str = "/", method: str = "GET", headers: dict | None = None,
+               body: bytes = b"", client: tuple = ("127.0.0.1", 1234), query_string: bytes = b""):
+    """Runs one HTTP request through an ASGI app; returns its status, headers, body and body messages."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "http",
+        "method": method, "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query_string, "client": client, "server": ("testserver", 80),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    messages = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            return {"type": "http.disconnect"}
+        requested = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = messages[0]
+    chunks = [m for m in messages[1:] if m["type"] == "http.response.body"]
+    return SimpleNamespace(
+        status_code=start["status"],
+        headers=Headers(raw=start["headers"]),
+        body=b"".join(m.get("body", b"") for m in chunks),
+        chunks=chunks,
+    )
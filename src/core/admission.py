@@ -0,0 +1,226 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict
+from fastapi.responses import JSONResponse
+from src.configs.env import (
+    ADMISSION_ENABLED,
+    ADMISSION_INITIAL_LIMIT,
+    ADMISSION_MIN_LIMIT,
+    ADMISSION_MAX_LIMIT,
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_QUEUE_SIZE,
+    ADMISSION_QUEUE_TIMEOUT_MS,
+    ADMISSION_LATENCY_TOLERANCE,
+)
+from src.core.metrics import metrics
+from src.core.rate_limit import route_group
+
+admission_limit = metrics.gauge(
+    "admission_concurrency_limit", "Current adaptive in-flight limit, by route group.", ("group",),
+)
+admission_in_flight = metrics.gauge(
+    "admission_in_flight", "Requests admitted and not yet finished, by route group.", ("group",),
+)
+admission_queued = metrics.gauge(
+    "admission_queued", "Requests waiting for admission, by route group.", ("group",),
+)
+admission_shed = metrics.counter(
+    "admission_shed_total", "Requests rejected with 503 by the admission controller, by route group and reason.",
+    ("group", "reason"),
+)
+admission_wait = metrics.histogram(
+    "admission_queue_wait_seconds", "Time admitted requests spent queued, by route group.", ("group",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit for one route group, driven by latency. Each
+    route template in the group keeps a `baseline`: the lowest moving
+    average of its latency, creeping up by 1% a second so it can follow a
+    lasting change, which stands for the latency of that route when
+    requests are not contending in the worker. Every sample is divided by
+    its route's baseline and `slowdown` is the moving average of those
+    ratios over the group's last few dozen requests, so a group mixing
+    fast and slow endpoints is judged by how much slower each endpoint has
+    become, not by which endpoints happened to be called.
+    When `slowdown` exceeds `tolerance` the worker is saturated and the
+    limit is cut by 10%, at most once per round trip; while the limit is in
+    use and latency is normal it grows by about one per round trip.
+    """
+
+    def __init__(self, group: str, initial: float, minimum: float, maximum: float, tolerance: float):
+        self.group = group
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self.in_flight = 0
+        self.recent = None
+        self.slowdown = 1.0
+        self.routes: Dict[str, RouteBaseline] = {}
+        self.waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        admission_limit.set(group, value=int(self.limit))
+
+    def observe(self, latency: float, saturated: bool, route: str = "unmatched"):
+        now = time.monotonic()
+        baseline = self.routes.get(route)
+        if baseline is None:
+            baseline = self.routes[route] = RouteBaseline(latency, now)
+        baseline.observe(latency, now)
+        self.recent = latency if self.recent is None else self.recent + (latency - self.recent) * 0.05
+        self.slowdown += (latency / max(baseline.baseline, 1e-6) - self.slowdown) * 0.05
+        if self.slowdown > self.tolerance:
+            if now - self._last_decrease > self.recent:
+                self._last_decrease = now
+                self.limit = max(self.minimum, self.limit * 0.9)
+        elif saturated:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        admission_limit.set(self.group, value=int(self.limit))
+
+
+class RouteBaseline:
+    """Uncontended latency of one route template, see AdaptiveLimit."""
+
+    def __init__(self, latency: float, now: float):
+        self.recent = self.baseline = latency
+        self._last_observed = now
+
+    def observe(self, latency: float, now: float):
+        self.recent += (latency - self.recent) * 0.05
+        self.baseline = min(self.recent, self.baseline * (1 + 0.01 * (now - self._last_observed)))
+        self._last_observed = now
+
+
+class AdmissionController:
+    """
+    Caps concurrent requests per worker: each route group has its own
+    adaptive limit and all groups share the fixed `max_in_flight` ceiling.
+    A request over the limit waits in its group's queue for up to
+    `queue_timeout`; if the queue is full or the wait runs out, it is shed.
+    Freed slots go to the queued requests first, oldest first, taking the
+    groups in turn.
+    """
+
+    def __init__(self, groups, initial: int, minimum: int, maximum: int, max_in_flight: int,
+                 queue_size: int, queue_timeout: float, tolerance: float):
+        self.limits: Dict[str, AdaptiveLimit] = {
+            group: AdaptiveLimit(group, initial, minimum, maximum, tolerance) for group in groups
+        }
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+
+    def _has_room(self, limit: AdaptiveLimit) -> bool:
+        return limit.in_flight < int(limit.limit) and self.in_flight < self.max_in_flight
+
+    def _admit(self, limit: AdaptiveLimit):
+        limit.in_flight += 1
+        self.in_flight += 1
+        admission_in_flight.set(limit.group, value=limit.in_flight)
+
+    async def acquire(self, group: str) -> bool:
+        """Waits for a slot in `group`; False means the request should be shed."""
+        limit = self.limits[group]
+        if not limit.waiters and self._has_room(limit):
+            self._admit(limit)
+            return True
+        if len(limit.waiters) >= self.queue_size:
+            admission_shed.inc(group, "queue_full")
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        limit.waiters.append(waiter)
+        admission_queued.set(group, value=len(limit.waiters))
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done() or waiter.cancelled():
+                admission_shed.inc(group, "queue_timeout")
+                return False
+            # A slot was handed over just as the wait ran out.
+        except BaseException:
+            # The client went away; give back a slot handed over in the meantime.
+            if waiter.done() and not waiter.cancelled():
+                self.release(group, None)
+            raise
+        finally:
+            if waiter in limit.waiters:
+                limit.waiters.remove(waiter)
+            admission_queued.set(group, value=len(limit.waiters))
+        admission_wait.observe(group, value=time.perf_counter() - started)
+        return True
+
+    def release(self, group: str, latency, route: str = "unmatched"):
+        limit = self.limits[group]
+        saturated = limit.in_flight >= int(limit.limit)
+        limit.in_flight -= 1
+        self.in_flight -= 1
+        admission_in_flight.set(group, value=limit.in_flight)
+        if latency is not None:
+            limit.observe(latency, saturated, route)
+        self._wake()
+
+    def _wake(self):
+        woken = True
+        while woken:
+            woken = False
+            for limit in self.limits.values():
+                while limit.waiters and limit.waiters[0].done():
+                    limit.waiters.popleft()
+                if limit.waiters and self._has_room(limit):
+                    waiter = limit.waiters.popleft()
+                    self._admit(limit)
+                    waiter.set_result(None)
+                    woken = True
+
+
+admission = AdmissionController(
+    groups=("read", "write", "login"),
+    initial=ADMISSION_INITIAL_LIMIT,
+    minimum=ADMISSION_MIN_LIMIT,
+    maximum=ADMISSION_MAX_LIMIT,
+    max_in_flight=ADMISSION_MAX_IN_FLIGHT,
+    queue_size=ADMISSION_QUEUE_SIZE,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+    tolerance=ADMISSION_LATENCY_TOLERANCE,
+)
+
+
+class AdmissionMiddleware:
+    """
+    Admits requests through the worker's AdmissionController and answers
+    503 with `Retry-After` when one is shed, before any work is done for it.
+    Health and metrics endpoints bypass it so probes and scrapes still work
+    when the worker is overloaded.
+    """
+    exempt_paths = ("/healthz", "/readyz", "/metrics")
+
+    def __init__(self, app, controller: AdmissionController = None):
+        self.app = app
+        self.controller = controller or admission
+
+    async def __call__(self, scope, receive, send):
+        if not ADMISSION_ENABLED or scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            return await self.app(scope, receive, send)
+
+        group = route_group(scope["method"], scope["path"])
+        if not await self.controller.acquire(group):
+            response = JSONResponse(
+                {"detail": "server overloaded, retry shortly"}, status_code=503, headers={"Retry-After": "1"},
+            )
+            return await response(scope, receive, send)
+
+        started = time.perf_counter()
+        latency = None
+        try:
+            await self.app(scope, receive, send)
+            latency = time.perf_counter() - started
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.controller.release(group, latency, f"{scope['method']} {route}")
@@ -1,19 +1,185 @@
-from src.configs.env import DB_URI
-from pymongo import AsyncMongoClient
-
-
-client = AsyncMongoClient(
+import asyncio
+from contextvars import ContextVar
+from typing import Optional
+from src.configs.env import (
+    DB_BACKEND,
     DB_URI,
-    minPoolSize=5,
-    maxPoolSize=50,
-    maxIdleTimeMS=600_000,
-    serverSelectionTimeoutMS=5000,
-    socketTimeoutMS=10000,
-    connectTimeoutMS=5000,
-    retryWrites=True,
+    DB_NAME,
+    DB_MIN_POOL_SIZE,
+    DB_MAX_POOL_SIZE,
+    TENANT_PLACEMENT_REFRESH_SECONDS,
+    READ_MAX_STALENESS_SECONDS,
 )
+from pymongo import AsyncMongoClient, ASCENDING
+from pymongo.asynchronous.client_session import AsyncClientSession
+from pymongo.read_preferences import SecondaryPreferred
+from src.core.deadlines import check_deadline
+from src.core.faults import fault_injector
+from src.core.memory import MemoryClient
+from src.core.tenancy import (
+    ReadOnlyCollection,
+    TenantRouter,
+    current_tenant,
+    TENANT_SCOPED_COLLECTIONS,
+    PLACEMENT_COLLECTION,
+    USER_DIRECTORY_COLLECTION,
+)
+
+
+client: Optional[AsyncMongoClient] = None
+
+# Heavy list reads may be served by a secondary at most this far behind the primary.
+SECONDARY_READS = SecondaryPreferred(max_staleness=READ_MAX_STALENESS_SECONDS)
+
+# Causally consistent session of a request that must read its own writes.
+current_session: ContextVar[Optional[AsyncClientSession]] = ContextVar("current_session", default=None)
+
+
+# Indexes backing the lookups the services run on every request
+# (login by email, duplicate checks, per-user note listing, group lookups).
+INDEXES = {
+    "Admins": [[("email", ASCENDING)], [("phone_number", ASCENDING)]],
+    "Organizations": [[("email", ASCENDING)], [("name", ASCENDING)], [("phone_number", ASCENDING)]],
+    "Users": [[("email", ASCENDING)], [("phone_number", ASCENDING)], [("organization_id", ASCENDING)]],
+    "Notes": [[("user_id", ASCENDING)]],
+    "PermissionGroups": [[("name", ASCENDING)]],
+    PLACEMENT_COLLECTION: [[("tenant_id", ASCENDING)]],
+    USER_DIRECTORY_COLLECTION: [[("email", ASCENDING)], [("user_id", ASCENDING)]],
+}
+
+
+def create_client(uri: str = DB_URI, **options) -> AsyncMongoClient:
+    """With DB_BACKEND=memory every client is an in-process MemoryClient."""
+    if DB_BACKEND == "memory":
+        return MemoryClient()
+    return AsyncMongoClient(
+        uri,
+        minPoolSize=DB_MIN_POOL_SIZE,
+        maxPoolSize=DB_MAX_POOL_SIZE,
+        maxIdleTimeMS=600_000,
+        serverSelectionTimeoutMS=5000,
+        socketTimeoutMS=10000,
+        connectTimeoutMS=5000,
+        retryWrites=True,
+        **options,
+    )
+
+
+def get_client() -> AsyncMongoClient:
+    """
+    Returns the process-wide client, creating it on first use so scripts
+    (seed, benchmarks) work without going through the app lifespan. Tests
+    can assign a MemoryClient to `client` to run without Mongo.
+    """
+    global client
+    if client is None:
+        client = create_client()
+    return client
+
+
+tenant_router = TenantRouter(client_factory=create_client)
+
+
+def get_database(tenant_id: Optional[str] = None):
+    """Returns the shared database, or the tenant's dedicated one if it has been placed."""
+    placement = tenant_router.placement(tenant_id)
+    if placement:
+        return tenant_router.database(placement, get_client())
+    return get_client()[DB_NAME]
+
+
+async def ensure_indexes(db=None):
+    db = db if db is not None else get_client()[DB_NAME]
+    for collection_name, indexes in INDEXES.items():
+        for keys in indexes:
+            await db[collection_name].create_index(keys)
+
+
+async def connect():
+    """
+    Opens the client and pays connection setup before the first request:
+    server selection, `DB_MIN_POOL_SIZE` pooled sockets and index builds.
+    """
+    mongo = get_client()
+    await mongo.aconnect()
+    # Concurrent pings each check out their own socket, filling the pool.
+    await asyncio.gather(
+        *(mongo.admin.command("ping") for _ in range(max(DB_MIN_POOL_SIZE, 1)))
+    )
+    await ensure_indexes()
+    placements = mongo[DB_NAME][PLACEMENT_COLLECTION]
+    await tenant_router.load(placements)
+    tenant_router.start_refresh(placements, TENANT_PLACEMENT_REFRESH_SECONDS)
+    return mongo
+
+
+async def disconnect():
+    """Closes the client; in-flight operations finish before sockets are released."""
+    global client
+    await tenant_router.close()
+    if client is not None:
+        await client.close()
+        client = None
+
+
+def start_causal_session() -> AsyncClientSession:
+    return get_client().start_session(causal_consistency=True)
+
+
+def causal_session(collection) -> Optional[AsyncClientSession]:
+    """
+    The request's causal session, if it can be used with `collection`.
+    Writes and the reads after them pass it, so those reads see the writes.
+    Sessions are bound to the client that started them, so tenants placed
+    on another cluster read without one.
+    """
+    session = current_session.get()
+    if session is not None and session.client is collection.database.client:
+        return session
+    return None
+
+
+async def get_collection(collection_name: str, tenant_id: Optional[str] = None, secondary: bool = False):
+    """
+    Tenant-scoped collections are routed to the tenant's placement; the
+    tenant defaults to the one of the account making the request. While
+    the tenant is being migrated its collections refuse writes with 503.
+
+    `secondary=True` marks a read that tolerates bounded staleness. It is
+    ignored inside a causally consistent session, which stays on the primary.
+
+    Inside a request whose deadline has passed this raises 504 instead of
+    starting more database work. With DB_FAULTS set the collection injects
+    the configured latency and errors (see FaultInjector).
+    """
+    check_deadline()
+    read_only = False
+    if collection_name in TENANT_SCOPED_COLLECTIONS:
+        tenant_id = tenant_id or current_tenant.get()
+        collection = get_database(tenant_id)[collection_name]
+        read_only = tenant_router.read_only(tenant_id)
+    else:
+        collection = get_client()[DB_NAME][collection_name]
+    if secondary and current_session.get() is None:
+        collection = collection.with_options(read_preference=SECONDARY_READS)
+    if read_only:
+        collection = ReadOnlyCollection(collection)
+    if fault_injector.enabled:
+        collection = fault_injector.wrap(collection)
+    return collection
 
 
-async def get_collection(collection_name: str):
-    db = client["notesas"] 
-    return db[collection_name]  
+async def get_tenant_collections(collection_name: str, secondary: bool = False) -> list:
+    """
+    A tenant-scoped collection in the shared database and in every database
+    a tenant has been placed in, each once, for admins who list across
+    tenants. Until a migration has deleted a tenant's documents from its old
+    placement, they are listed from both.
+    """
+    collections, seen = [], set()
+    for tenant_id in [None, *(placement["tenant_id"] for placement in tenant_router.placements())]:
+        db = get_database(tenant_id)
+        if (id(db.client), db.name) not in seen:
+            seen.add((id(db.client), db.name))
+            collections.append(await get_collection(collection_name, tenant_id=tenant_id, secondary=secondary))
+    return collections
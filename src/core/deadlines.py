@@ -0,0 +1,96 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+import pymongo
+from fastapi import Request
+from pymongo.errors import PyMongoError
+from src.configs.env import REQUEST_DEADLINE_SECONDS
+from src.core.metrics import metrics
+from src.errors.base import ErrorHandler, prerendered_exception_handler
+
+# time.monotonic() by which the current request has to be answered.
+current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+# The request's ASGI scope, to label deadline misses with the matched route.
+_scope: ContextVar[dict] = ContextVar("deadline_scope", default={})
+
+deadline_exceeded = metrics.counter(
+    "request_deadline_exceeded_total",
+    "Requests answered 504 because their deadline ran out, by route and where it was noticed.",
+    ("route", "stage"),
+)
+
+error = ErrorHandler("request")
+
+
+def _route(scope: dict) -> str:
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, None outside a request."""
+    deadline = current_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline():
+    """Raises 504 when the current request's deadline has already passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        deadline_exceeded.inc(_route(_scope.get()), "before_query")
+        raise error.get(504, "request deadline exceeded")
+
+
+async def deadline_exceeded_handler(request: Request, exc: PyMongoError):
+    """Turns a Mongo operation cut short by the request's deadline into 504."""
+    if not exc.timeout or current_deadline.get() is None:
+        raise exc
+    deadline_exceeded.inc(_route(request.scope), "database")
+    return await prerendered_exception_handler(request, error.get(504, "request deadline exceeded"))
+
+
+class DeadlineMiddleware:
+    """
+    Gives every request a deadline: the longest `deadlines` prefix matching
+    the path, or REQUEST_DEADLINE_SECONDS, shortened by the client's
+    `X-Request-Timeout` header (seconds) when that is smaller.
+
+    The deadline is applied with `pymongo.timeout`, so every Mongo operation
+    of the request, including waiting for a pooled connection, is sent with
+    the remaining budget as `maxTimeMS` and the server stops working on it
+    when the client could no longer use the answer. `get_collection` also
+    refuses to start new work once the deadline has passed.
+    """
+
+    def __init__(self, app, deadlines: Dict[str, float] = None):
+        self.app = app
+        self.deadlines = sorted((deadlines or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def budget(self, scope) -> float:
+        budget = next(
+            (seconds for prefix, seconds in self.deadlines if scope["path"].startswith(prefix)),
+            REQUEST_DEADLINE_SECONDS,
+        )
+        for name, value in scope["headers"]:
+            if name == b"x-request-timeout":
+                try:
+                    requested = float(value)
+                except ValueError:
+                    break
+                if requested > 0:
+                    budget = min(budget, requested)
+                break
+        return budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        budget = self.budget(scope)
+        token = current_deadline.set(time.monotonic() + budget)
+        scope_token = _scope.set(scope)
+        try:
+            with pymongo.timeout(budget):
+                await self.app(scope, receive, send)
+        finally:
+            _scope.reset(scope_token)
+            current_deadline.reset(token)
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import math
+import random
+from typing import Dict, Optional
+from pymongo.errors import AutoReconnect, NetworkTimeout
+from src.configs.env import DB_FAULTS
+from src.core.deadlines import remaining
+from src.core.metrics import metrics
+
+faults_injected = metrics.counter(
+    "db_faults_injected_total", "Latency, timeouts and errors injected into database calls.",
+    ("collection", "command", "fault"),
+)
+
+# Collection methods that round-trip to the server. `find` is applied when
+# its cursor fetches (to_list or iteration).
+COMMANDS = {
+    "find", "find_one", "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "count_documents", "distinct", "bulk_write", "aggregate",
+    "aggregate_raw_batches",
+}
+
+
+class FaultRule:
+    """
+    What to inject into one collection/command:
+
+    latency_ms     fixed `5`, uniform `[2, 20]`, or log-normal
+                   `{"median": 5, "p99": 200}` for a realistic long tail
+    timeout_rate   share of calls that hang until the request's deadline
+                   (or `timeout_ms`) and then fail with NetworkTimeout
+    error_rate     share of calls that fail at once with AutoReconnect
+    """
+
+    def __init__(self, latency_ms=0, timeout_rate: float = 0, error_rate: float = 0, timeout_ms: float = 10000):
+        self.latency_ms = latency_ms
+        self.timeout_rate = timeout_rate
+        self.error_rate = error_rate
+        self.timeout_ms = timeout_ms
+        if isinstance(latency_ms, dict):
+            self._mu = math.log(latency_ms["median"])
+            # z of the 99th percentile of the standard normal
+            self._sigma = max(math.log(latency_ms["p99"]) - self._mu, 0) / 2.326
+
+    def latency(self) -> float:
+        if isinstance(self.latency_ms, dict):
+            return random.lognormvariate(self._mu, self._sigma) / 1000
+        if isinstance(self.latency_ms, (list, tuple)):
+            return random.uniform(*self.latency_ms) / 1000
+        return self.latency_ms / 1000
+
+    async def apply(self, collection: str, command: str):
+        roll = random.random()
+        if roll < self.error_rate:
+            faults_injected.inc(collection, command, "error")
+            raise AutoReconnect(f"injected transient error on {collection}.{command}")
+        if roll < self.error_rate + self.timeout_rate:
+            faults_injected.inc(collection, command, "timeout")
+            left = remaining()
+            await asyncio.sleep(max(0.0, min(left, self.timeout_ms / 1000) if left is not None else self.timeout_ms / 1000))
+            raise NetworkTimeout(f"injected timeout on {collection}.{command}")
+        delay = self.latency()
+        if delay > 0:
+            faults_injected.inc(collection, command, "latency")
+            await asyncio.sleep(delay)
+
+
+class FaultInjector:
+    """
+    Rules keyed `"<collection>.<command>"`, where either part may be `*`;
+    the most specific match wins (`Notes.find`, then `Notes.*`, `*.find`,
+    `*`). Configured with DB_FAULTS as a JSON object, for example
+
+        {"*": {"latency_ms": {"median": 2, "p99": 40}},
+         "Notes.find": {"latency_ms": [20, 80], "timeout_rate": 0.01},
+         "Users.*": {"error_rate": 0.05}}
+
+    Faults are injected in front of the driver: injected latency does not
+    hold a pooled connection and injected errors are not retried by it.
+    """
+
+    def __init__(self, rules: Dict[str, FaultRule]):
+        self.rules = rules
+
+    @classmethod
+    def from_config(cls, config: Optional[str]) -> "FaultInjector":
+        if not config:
+            return cls({})
+        try:
+            rules = {key: FaultRule(**options) for key, options in json.loads(config).items()}
+        except (ValueError, TypeError, KeyError) as e:
+            raise RuntimeError(f"Invalid DB_FAULTS configuration: {e}") from None
+        return cls(rules)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rules)
+
+    def rule(self, collection: str, command: str) -> Optional[FaultRule]:
+        for key in (f"{collection}.{command}", f"{collection}.*", f"*.{command}", "*"):
+            rule = self.rules.get(key)
+            if rule is not None:
+                return rule
+        return None
+
+    def wrap(self, collection):
+        return FaultyCollection(collection, self)
+
+
+class FaultyCursor:
+    def __init__(self, cursor, collection: str, injector: FaultInjector):
+        self._cursor = cursor
+        self._collection = collection
+        self._injector = injector
+
+    def __getattr__(self, name):
+        attribute = getattr(self._cursor, name)
+        if name in ("sort", "skip", "limit", "batch_size", "max_time_ms"):
+            def chained(*args, **kwargs):
+                attribute(*args, **kwargs)
+                return self
+            return chained
+        return attribute
+
+    async def _inject(self):
+        rule = self._injector.rule(self._collection, "find")
+        if rule is not None:
+            await rule.apply(self._collection, "find")
+
+    async def to_list(self, *args, **kwargs):
+        await self._inject()
+        return await self._cursor.to_list(*args, **kwargs)
+
+    async def __aiter__(self):
+        await self._inject()
+        async for doc in self._cursor:
+            yield doc
+
+
+class FaultyCollection:
+    """Proxy for a collection that runs the matching FaultRule before each command."""
+
+    def __init__(self, collection, injector: FaultInjector):
+        self._collection = collection
+        self._injector = injector
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in COMMANDS:
+            return attribute
+        collection_name = self._collection.name
+        rule = self._injector.rule(collection_name, name)
+        if name == "find":
+            return lambda *args, **kwargs: FaultyCursor(attribute(*args, **kwargs), collection_name, self._injector)
+        if rule is None:
+            return attribute
+
+        async def command(*args, **kwargs):
+            await rule.apply(collection_name, name)
+            return await attribute(*args, **kwargs)
+        return command
+
+    def __getitem__(self, name):
+        return self._collection[name]
+
+    def with_options(self, *args, **kwargs):
+        return FaultyCollection(self._collection.with_options(*args, **kwargs), self._injector)
+
+
+fault_injector = FaultInjector.from_config(DB_FAULTS)
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from typing import Optional
+import pymongo
+from fastapi import APIRouter, responses
+from src.configs.env import HEALTH_CHECK_INTERVAL_SECONDS, HEALTH_CHECK_TIMEOUT_SECONDS
+from src.core.database import get_client
+
+
+class DatabaseHealth:
+    """
+    Pings Mongo in the background and keeps the last result, so readiness
+    probes read a cached value instead of adding load or waiting on
+    server selection.
+    """
+
+    def __init__(self, interval: float, timeout: float):
+        self.interval = interval
+        self.timeout = timeout
+        self.ok = False
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def fresh(self) -> bool:
+        # A stuck checker must not keep reporting an old success.
+        return self.checked_at is not None and time.monotonic() - self.checked_at < self.interval * 3
+
+    async def check(self):
+        try:
+            with pymongo.timeout(self.timeout):
+                await get_client().admin.command("ping")
+            self.ok, self.error = True, None
+        except Exception as e:
+            self.ok, self.error = False, str(e)
+        self.checked_at = time.monotonic()
+
+    def start(self):
+        async def run():
+            while True:
+                await self.check()
+                await asyncio.sleep(self.interval)
+
+        self._task = asyncio.create_task(run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+database_health = DatabaseHealth(
+    interval=HEALTH_CHECK_INTERVAL_SECONDS,
+    timeout=HEALTH_CHECK_TIMEOUT_SECONDS,
+)
+
+health_router = APIRouter(tags=["Health"])
+
+
+@health_router.get("/healthz", status_code=200)
+async def liveness():
+    """Process is up and the event loop is serving requests."""
+    return {"status": "ok"}
+
+
+@health_router.get("/readyz", status_code=200)
+async def readiness():
+    """Ready when the last background ping succeeded recently."""
+    if database_health.ok and database_health.fresh:
+        return {"status": "ok", "database": "ok"}
+    return responses.ORJSONResponse(
+        {"status": "unavailable", "database": database_health.error or "not checked"},
+        status_code=503,
+    )
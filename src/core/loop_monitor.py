@@ -0,0 +1,167 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from src.configs.env import LOOP_MONITOR_INTERVAL_MS, LOOP_LAG_THRESHOLD_MS
+from src.core.metrics import Metric, metrics, current_request, request_tasks
+
+
+class LagSummary(Metric):
+    """Event-loop lag quantiles over the most recent samples."""
+    kind = "summary"
+    quantiles = (0.5, 0.9, 0.99, 1.0)
+
+    def __init__(self, name: str, documentation: str, window: int):
+        super().__init__(name, documentation)
+        self._window: Deque[float] = deque(maxlen=window)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float):
+        with self._lock:
+            self._window.append(value)
+            self._sum += value
+            self._count += 1
+
+    def percentiles(self) -> Dict[float, float]:
+        with self._lock:
+            window = sorted(self._window)
+        if not window:
+            return {}
+        return {q: window[min(int(q * len(window)), len(window) - 1)] for q in self.quantiles}
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for q, value in self.percentiles().items():
+            lines.append(f'{self.name}{{quantile="{q}"}} {value!r}')
+        lines.append(f"{self.name}_sum {self._sum!r}")
+        lines.append(f"{self.name}_count {self._count}")
+        return lines
+
+
+event_loop_lag = metrics.register(LagSummary(
+    "event_loop_lag_seconds", "Delay between when the loop monitor was due to wake and when it ran.", window=600,
+))
+event_loop_stalls = metrics.counter(
+    "event_loop_stalls_total", "Times the event loop was blocked past the lag threshold, by route.", ("route",),
+)
+
+
+def _route(scope: dict) -> str:
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop scheduling delay with a coroutine that sleeps for
+    `interval` and records how late it wakes up.
+
+    A watchdog thread watches that coroutine's heartbeat. When the loop has
+    not come back for `threshold` past the expected wake-up, the loop is
+    blocked right now: the watchdog captures the loop thread's stack, looks
+    up the request of the task running on the loop in `request_tasks`, and
+    records the stall with the route. To cover the tasks a request spawns,
+    the monitor installs a task factory that registers every task created
+    inside a request.
+    """
+
+    def __init__(self, interval: float, threshold: float, history: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: Deque[dict] = deque(maxlen=history)
+        self._heartbeat = time.monotonic()
+        self._captured: Optional[dict] = None
+        self._loop_thread: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._previous_task_factory = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    async def _measure(self):
+        while True:
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - self._heartbeat - self.interval, 0.0)
+            event_loop_lag.observe(lag)
+            stall, self._captured = self._captured, None
+            if stall is not None:
+                stall["lag_ms"] = round(lag * 1000, 3)
+
+    def _watch(self):
+        while not self._stopping.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self.interval
+            if overdue < self.threshold or (self._captured and self._captured["heartbeat"] == heartbeat):
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                task = asyncio.current_task(self._loop)
+                scope = request_tasks.get(task) if task is not None else None
+                self._captured = self._capture(frame, scope, heartbeat, overdue)
+
+    def _task_factory(self, loop, coro, **kwargs):
+        if self._previous_task_factory is not None:
+            task = self._previous_task_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        scope = current_request.get()
+        if scope is not None:
+            request_tasks[task] = scope
+        return task
+
+    def _capture(self, frame, scope: Optional[dict], heartbeat: float, overdue: float) -> dict:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_filename}:{frame.f_lineno} in {code.co_name}")
+            frame = frame.f_back
+        stack.reverse()
+
+        route = _route(scope) if scope is not None else "background"
+        event_loop_stalls.inc(route)
+        stall = {
+            "route": route,
+            "method": scope.get("method") if scope is not None else None,
+            "path": scope.get("path") if scope is not None else None,
+            "detected_at": time.time(),
+            "blocked_ms_at_capture": round(overdue * 1000, 3),
+            "lag_ms": None,
+            "stack": stack[-50:],
+            "heartbeat": heartbeat,
+        }
+        self.stalls.append(stall)
+        return stall
+
+    def recent_stalls(self) -> List[dict]:
+        return [{k: v for k, v in stall.items() if k != "heartbeat"} for stall in reversed(self.stalls)]
+
+    def start(self):
+        self._loop_thread = threading.get_ident()
+        self._loop = asyncio.get_running_loop()
+        self._previous_task_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._task_factory)
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+        if self._loop is not None:
+            self._loop.set_task_factory(self._previous_task_factory)
+            self._loop = None
+
+
+loop_monitor = LoopLagMonitor(
+    interval=LOOP_MONITOR_INTERVAL_MS / 1000,
+    threshold=LOOP_LAG_THRESHOLD_MS / 1000,
+)
@@ -0,0 +1,458 @@
+import re
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+from bson import ObjectId, encode
+from bson.raw_bson import RawBSONDocument
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.results import (
+    BulkWriteResult,
+    DeleteResult,
+    InsertManyResult,
+    InsertOneResult,
+    UpdateResult,
+)
+
+_MISSING = object()
+
+
+def _copy(value):
+    # Documents hold dicts, lists and immutable scalars (ObjectId, datetime, str...).
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _get(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return value
+    return value
+
+
+def _candidates(value) -> list:
+    # An array field matches a condition when the array or one of its elements does.
+    return [value, *value] if isinstance(value, list) else [value]
+
+
+def _compare(value, bound, op) -> bool:
+    try:
+        return op(value, bound)
+    except TypeError:
+        return False
+
+
+_OPERATORS = {
+    "$eq": lambda value, arg: any(v == arg for v in _candidates(value)),
+    "$ne": lambda value, arg: not any(v == arg for v in _candidates(value)),
+    "$in": lambda value, arg: any(v in arg for v in _candidates(value)),
+    "$nin": lambda value, arg: not any(v in arg for v in _candidates(value)),
+    "$gt": lambda value, arg: any(_compare(v, arg, lambda a, b: a > b) for v in _candidates(value)),
+    "$gte": lambda value, arg: any(_compare(v, arg, lambda a, b: a >= b) for v in _candidates(value)),
+    "$lt": lambda value, arg: any(_compare(v, arg, lambda a, b: a < b) for v in _candidates(value)),
+    "$lte": lambda value, arg: any(_compare(v, arg, lambda a, b: a <= b) for v in _candidates(value)),
+}
+
+
+def _matches_condition(value, condition) -> bool:
+    if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+        for op, arg in condition.items():
+            if op == "$exists":
+                if (value is not _MISSING) != bool(arg):
+                    return False
+            elif op == "$regex":
+                pattern = re.compile(arg, re.IGNORECASE if "i" in condition.get("$options", "") else 0)
+                if not any(isinstance(v, str) and pattern.search(v) for v in _candidates(value)):
+                    return False
+            elif op == "$options":
+                continue
+            elif op in _OPERATORS:
+                if not _OPERATORS[op](None if value is _MISSING else value, arg):
+                    return False
+            else:
+                raise NotImplementedError(f"query operator {op} is not supported in memory")
+        return True
+    if isinstance(condition, re.Pattern):
+        return any(isinstance(v, str) and condition.search(v) for v in _candidates(value))
+    return _OPERATORS["$eq"](None if value is _MISSING else value, condition)
+
+
+def matches(doc: dict, query: Optional[dict]) -> bool:
+    """Whether `doc` matches a Mongo filter (equality, comparison, `$in`, `$or`, `$and`, `$regex`...)."""
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, sub) for sub in condition):
+                return False
+        elif not _matches_condition(_get(doc, key), condition):
+            return False
+    return True
+
+
+def _project(doc: dict, projection) -> dict:
+    if not projection:
+        return doc
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    id_spec = projection.get("_id", 1)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if any(v and not isinstance(v, dict) for v in fields.values()):
+        shaped = {}
+        for key, expression in fields.items():
+            if isinstance(expression, dict):
+                shaped[key] = _evaluate(doc, expression)
+            elif key in doc:
+                shaped[key] = doc[key]
+    else:
+        shaped = {k: v for k, v in doc.items() if k not in fields and k != "_id"}
+        shaped.update((k, _evaluate(doc, v)) for k, v in fields.items() if isinstance(v, dict))
+    if isinstance(id_spec, dict):
+        shaped = {"_id": _evaluate(doc, id_spec), **shaped}
+    elif id_spec and "_id" in doc:
+        shaped = {"_id": doc["_id"], **shaped}
+    return shaped
+
+
+def _evaluate(doc: dict, expression):
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _get(doc, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, dict) and "$toString" in expression:
+        value = _evaluate(doc, expression["$toString"])
+        return None if value is None else str(value)
+    return expression
+
+
+def _sort_key(doc: dict, field: str):
+    value = _get(doc, field)
+    # Missing and null sort first, then values of one type compare among themselves.
+    return (0, "") if value in (_MISSING, None) else (1, type(value).__name__, value)
+
+
+def _sorted(docs: List[dict], sort) -> List[dict]:
+    for field, direction in reversed(list(sort.items() if isinstance(sort, dict) else sort)):
+        docs = sorted(docs, key=lambda doc: _sort_key(doc, field), reverse=direction < 0)
+    return docs
+
+
+def _apply_update(doc: dict, update: dict, inserting: bool = False) -> bool:
+    """Applies update operators in place; True when the document changed."""
+    before = _copy(doc)
+    for op, fields in update.items():
+        for key, value in fields.items():
+            if op == "$set" or (op == "$setOnInsert" and inserting):
+                doc[key] = _copy(value)
+            elif op == "$unset":
+                doc.pop(key, None)
+            elif op == "$inc":
+                doc[key] = doc.get(key, 0) + value
+            elif op == "$push":
+                doc.setdefault(key, []).append(_copy(value))
+            elif op == "$addToSet":
+                values = doc.setdefault(key, [])
+                if value not in values:
+                    values.append(_copy(value))
+            elif op == "$pull":
+                doc[key] = [v for v in doc.get(key, []) if v != value]
+            elif op != "$setOnInsert":
+                raise NotImplementedError(f"update operator {op} is not supported in memory")
+    return doc != before
+
+
+class MemoryCursor:
+    """Cursor over a snapshot of the matching documents."""
+
+    def __init__(self, docs: Iterable[dict], projection=None, document_class=dict):
+        self._docs = list(docs)
+        self._projection = projection
+        self._document_class = document_class
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction: int = 1):
+        self._sort = [(key, direction)] if isinstance(key, str) else key
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def _results(self) -> Iterable:
+        docs = _sorted(self._docs, self._sort) if self._sort else self._docs
+        stop = self._skip + self._limit if self._limit else None
+        for doc in islice(docs, self._skip, stop):
+            shaped = _copy(_project(doc, self._projection))
+            yield RawBSONDocument(encode(shaped)) if self._document_class is RawBSONDocument else shaped
+
+    async def to_list(self, length: Optional[int] = None) -> list:
+        return list(islice(self._results(), length or None))
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self._results():
+                yield doc
+        return iterate()
+
+    async def close(self):
+        pass
+
+
+class MemoryRawBatchCursor:
+    """Cursor of `aggregate_raw_batches`: each batch is the concatenated BSON of up to `batch_size` documents."""
+
+    def __init__(self, docs: List[dict], batch_size: int):
+        self._docs = docs
+        self._batch_size = max(batch_size, 1)
+
+    def __aiter__(self):
+        async def iterate():
+            for start in range(0, len(self._docs), self._batch_size):
+                yield b"".join(encode(doc) for doc in self._docs[start:start + self._batch_size])
+        return iterate()
+
+    async def close(self):
+        pass
+
+
+class MemoryCollection:
+    """
+    The subset of the AsyncCollection API this project uses, over a list of
+    documents in memory: find/find_one, insert, update, delete, count,
+    distinct, bulk_write with UpdateOne/ReplaceOne, and aggregate (also in
+    raw batches) with `$match`, `$project`, `$sort`, `$skip` and `$limit`.
+    Documents are copied in and out, as they would be over the wire. `session`, read preferences
+    and other options are accepted and ignored.
+    """
+
+    def __init__(self, database: "MemoryDatabase", name: str, documents: List[dict] = None, document_class=dict):
+        self.database = database
+        self.name = name
+        self._documents: List[dict] = documents if documents is not None else []
+        self._document_class = document_class
+
+    def with_options(self, codec_options=None, **kwargs) -> "MemoryCollection":
+        document_class = codec_options.document_class if codec_options is not None else self._document_class
+        return MemoryCollection(self.database, self.name, self._documents, document_class)
+
+    def _matching(self, query: Optional[dict]) -> List[dict]:
+        return [doc for doc in self._documents if matches(doc, query)]
+
+    def find(self, filter: Optional[dict] = None, projection=None, *, sort=None, skip: int = 0, limit: int = 0, **kwargs) -> MemoryCursor:
+        cursor = MemoryCursor(self._matching(filter), projection, self._document_class)
+        if sort:
+            cursor.sort(sort)
+        return cursor.skip(skip).limit(limit)
+
+    async def find_one(self, filter: Optional[dict] = None, projection=None, **kwargs):
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        docs = await self.find(filter, projection, limit=1, **kwargs).to_list()
+        return docs[0] if docs else None
+
+    async def insert_one(self, document: dict, **kwargs) -> InsertOneResult:
+        document.setdefault("_id", ObjectId())
+        self._documents.append(_copy(document))
+        return InsertOneResult(document["_id"], True)
+
+    async def insert_many(self, documents: Iterable[dict], **kwargs) -> InsertManyResult:
+        ids = [(await self.insert_one(document)).inserted_id for document in documents]
+        return InsertManyResult(ids, True)
+
+    def _update(self, filter: dict, update: dict, upsert: bool, many: bool) -> dict:
+        targets = self._matching(filter)
+        if not many:
+            targets = targets[:1]
+        modified = sum(_apply_update(doc, update) for doc in targets)
+        upserted = None
+        if not targets and upsert:
+            doc = {k: _copy(v) for k, v in filter.items() if not k.startswith("$") and not isinstance(v, dict)}
+            _apply_update(doc, update, inserting=True)
+            doc.setdefault("_id", ObjectId())
+            self._documents.append(doc)
+            upserted = doc["_id"]
+        return {"n": len(targets) or (1 if upserted else 0), "nModified": modified, "upserted": upserted}
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        return UpdateResult(self._update(filter, update, upsert, many=False), True)
+
+    async def update_many(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        return UpdateResult(self._update(filter, update, upsert, many=True), True)
+
+    async def replace_one(self, filter: dict, replacement: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        targets = self._matching(filter)[:1]
+        if targets:
+            _id = targets[0]["_id"]
+            changed = targets[0] != {**replacement, "_id": _id}
+            targets[0].clear()
+            targets[0].update(_copy(replacement), _id=_id)
+            return UpdateResult({"n": 1, "nModified": int(changed), "upserted": None}, True)
+        if upsert:
+            return UpdateResult({"n": 0, "nModified": 0, "upserted": (await self.insert_one(replacement)).inserted_id}, True)
+        return UpdateResult({"n": 0, "nModified": 0, "upserted": None}, True)
+
+    async def delete_one(self, filter: dict, **kwargs) -> DeleteResult:
+        for index, doc in enumerate(self._documents):
+            if matches(doc, filter):
+                del self._documents[index]
+                return DeleteResult({"n": 1}, True)
+        return DeleteResult({"n": 0}, True)
+
+    async def delete_many(self, filter: dict, **kwargs) -> DeleteResult:
+        kept = [doc for doc in self._documents if not matches(doc, filter)]
+        deleted = len(self._documents) - len(kept)
+        self._documents[:] = kept
+        return DeleteResult({"n": deleted}, True)
+
+    async def count_documents(self, filter: dict, **kwargs) -> int:
+        return len(self._matching(filter))
+
+    async def estimated_document_count(self, **kwargs) -> int:
+        return len(self._documents)
+
+    async def distinct(self, key: str, filter: Optional[dict] = None, **kwargs) -> list:
+        values = []
+        for doc in self._matching(filter):
+            value = _get(doc, key)
+            for v in (value if isinstance(value, list) else [value]):
+                if v is not _MISSING and v not in values:
+                    values.append(v)
+        return values
+
+    async def bulk_write(self, requests: List[Any], ordered: bool = True, **kwargs) -> BulkWriteResult:
+        result = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nUpserted": 0, "nRemoved": 0, "upserted": []}
+        for index, request in enumerate(requests):
+            if isinstance(request, UpdateOne):
+                raw = self._update(request._filter, request._doc, request._upsert, many=False)
+            elif isinstance(request, ReplaceOne):
+                raw = (await self.replace_one(request._filter, request._doc, upsert=request._upsert)).raw_result
+            else:
+                raise NotImplementedError(f"{type(request).__name__} is not supported in memory")
+            if raw["upserted"] is not None:
+                result["nUpserted"] += 1
+                result["upserted"].append({"index": index, "_id": raw["upserted"]})
+            else:
+                result["nMatched"] += raw["n"]
+            result["nModified"] += raw["nModified"]
+        return BulkWriteResult(result, True)
+
+    async def aggregate(self, pipeline: List[dict], **kwargs) -> MemoryCursor:
+        docs = self._documents
+        for stage in pipeline:
+            (op, arg), = stage.items()
+            if op == "$match":
+                docs = [doc for doc in docs if matches(doc, arg)]
+            elif op == "$project":
+                docs = [_project(doc, arg) for doc in docs]
+            elif op == "$sort":
+                docs = _sorted(docs, arg)
+            elif op == "$skip":
+                docs = docs[arg:]
+            elif op == "$limit":
+                docs = docs[:arg]
+            else:
+                raise NotImplementedError(f"aggregation stage {op} is not supported in memory")
+        return MemoryCursor(docs, document_class=self._document_class)
+
+    async def aggregate_raw_batches(self, pipeline: List[dict], batchSize: int = 101, **kwargs) -> MemoryRawBatchCursor:
+        docs = await (await self.aggregate(pipeline)).to_list()
+        return MemoryRawBatchCursor(docs, batchSize)
+
+    async def create_index(self, keys, **kwargs) -> str:
+        keys = [(keys, 1)] if isinstance(keys, str) else keys
+        return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+    async def drop(self, **kwargs):
+        self._documents.clear()
+
+
+class MemoryDatabase:
+    def __init__(self, client: "MemoryClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = MemoryCollection(self, name)
+        return collection
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command, **kwargs) -> dict:
+        return {"ok": 1.0}
+
+    async def list_collection_names(self, **kwargs) -> List[str]:
+        return [name for name, collection in self._collections.items() if collection._documents]
+
+
+class MemorySession:
+    def __init__(self, client: "MemoryClient"):
+        self.client = client
+
+    async def end_session(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.end_session()
+
+
+class MemoryClient:
+    """
+    Stand-in for AsyncMongoClient holding every database in this process.
+    Selected with DB_BACKEND=memory, or by assigning an instance to
+    `src.core.database.client`, for tests and CPU-only benchmarks.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        database = self._databases.get(name)
+        if database is None:
+            database = self._databases[name] = MemoryDatabase(self, name)
+        return database
+
+    def __getattr__(self, name: str) -> MemoryDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_database(self, name: str, **kwargs) -> MemoryDatabase:
+        return self[name]
+
+    def start_session(self, **kwargs) -> MemorySession:
+        return MemorySession(self)
+
+    async def aconnect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def drop_database(self, name: str):
+        self._databases.pop(name, None)
@@ -0,0 +1,174 @@
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+from src.configs.env import PROFILING_ENABLED, PROFILE_SAMPLE_INTERVAL_MS, PROFILE_STORE_SIZE
+from src.dependencies.dependencies import PermissionControl
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.started_at = time.time()
+        self.wall_ms = 0.0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope."""
+        root = f"{self.method} {self.route or self.path}"
+        return "".join(f"{root};{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "wall_ms": round(self.wall_ms, 3),
+            "samples": self.samples,
+            "sampled_ms": round(self.samples * PROFILE_SAMPLE_INTERVAL_MS, 3),
+        }
+
+
+class _Session:
+    def __init__(self, profile: RequestProfile, anchor, thread_id: int):
+        self.profile = profile
+        self.anchor = anchor
+        self.thread_id = thread_id
+
+
+class SamplingProfiler:
+    """
+    Samples the event-loop thread's stack from a background thread while at
+    least one profiled request is in flight. A sample is attributed to a
+    request only when that request's middleware frame is on the stack, that
+    is when the loop is running that request's code. Other requests are
+    never sampled, and awaiting I/O produces no samples, so a profile shows
+    the request's on-loop CPU time.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._sessions: List[_Session] = []
+        self._labels: Dict[object, str] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, session: _Session):
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, session: _Session):
+        with self._lock:
+            self._sessions.remove(session)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            marker = filename.rfind("/src/")
+            filename = filename[marker + 1:] if marker >= 0 else filename.rsplit("/", 1)[-1]
+            label = self._labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self, session: _Session, frame):
+        stack = []
+        while frame is not None and frame is not session.anchor:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        if frame is None:
+            return  # another task is running
+        stack.reverse()
+        session.profile.stacks[tuple(stack)] += 1
+        session.profile.samples += 1
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                for session in self._sessions:
+                    frame = frames.get(session.thread_id)
+                    if frame is not None:
+                        self._sample(session, frame)
+
+
+class ProfileStore:
+    """The most recent request profiles of this worker, oldest evicted first."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+
+    def add(self, profile: RequestProfile):
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.size:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return self._profiles.get(profile_id)
+
+    def all(self) -> List[RequestProfile]:
+        return list(reversed(self._profiles.values()))
+
+
+profiler = SamplingProfiler(interval=PROFILE_SAMPLE_INTERVAL_MS / 1000)
+profile_store = ProfileStore(size=PROFILE_STORE_SIZE)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request when an admin with the admin role, the check behind
+    `admin_required`, sends `X-Profile: 1`. The profile id is returned in the `X-Profile-Id` response header and the
+    profile is served by the admin diagnostics endpoints. It has to be the
+    innermost middleware so `request.state.user_type` from
+    AuthObjectMiddleware is set and its frame sits right above the route.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not PROFILING_ENABLED
+            or scope["type"] != "http"
+            or not any(name == b"x-profile" and value not in (b"", b"0") for name, value in scope["headers"])
+        ):
+            return await self.app(scope, receive, send)
+        state = scope.get("state", {})
+        if not await PermissionControl.is_admin(state.get("user_type"), state.get("user_id")):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"])
+
+        async def profiled_send(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        session = _Session(profile, sys._getframe(), threading.get_ident())
+        profiler.add(session)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            profiler.remove(session)
+            profile.wall_ms = (time.perf_counter() - started) * 1000
+            profile.route = getattr(scope.get("route"), "path", None)
+            profile_store.add(profile)
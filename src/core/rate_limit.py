@@ -0,0 +1,219 @@
+import ipaddress
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+from fastapi.responses import JSONResponse
+from src.configs.env import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_REDIS_URL,
+    RATE_LIMIT_READ,
+    RATE_LIMIT_WRITE,
+    RATE_LIMIT_LOGIN,
+    TRUSTED_PROXIES,
+)
+from src.core.metrics import metrics
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional, only needed for RATE_LIMIT_BACKEND=redis
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+rate_limited = metrics.counter(
+    "rate_limited_requests_total", "Requests rejected by the rate limiter, by route group.", ("group",),
+)
+
+
+LOGIN_PATHS = ("/v1/organizations", "/v1/admin/signup")
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def parse_networks(value: str) -> list:
+    return [ipaddress.ip_network(item, strict=False) for item in filter(None, map(str.strip, value.split(",")))]
+
+
+def _trusted(address: str, networks: list) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(scope, trusted_proxies: list) -> str:
+    """
+    The address of the client: the peer, or, when the peer is a trusted
+    proxy, the right-most `X-Forwarded-For` entry that is not a trusted
+    proxy itself. Entries further left were written by the client and
+    could be anything.
+    """
+    peer = (scope.get("client") or ("unknown", 0))[0]
+    if not trusted_proxies or not _trusted(peer, trusted_proxies):
+        return peer
+    forwarded = [
+        entry.strip()
+        for name, value in scope["headers"] if name == b"x-forwarded-for"
+        for entry in value.decode("latin-1").split(",")
+    ]
+    for address in reversed(forwarded):
+        if address and not _trusted(address, trusted_proxies):
+            return address
+    return peer
+
+
+def route_group(method: str, path: str) -> str:
+    """`login` for login and signup (password hashing), else `write` or `read` by method."""
+    if path.endswith("/login") or (method == "POST" and path.rstrip("/") in LOGIN_PATHS):
+        return "login"
+    return "write" if method in UNSAFE_METHODS else "read"
+
+
+class Limit:
+    """Token bucket refilled at `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+
+    @classmethod
+    def parse(cls, value: str) -> "Limit":
+        """`"<rate>/<burst>"`, e.g. `"50/100"`; `"0.2/5"` is a burst of 5, then one every 5 seconds."""
+        rate, _, burst = value.partition("/")
+        limit = cls(float(rate), float(burst or rate))
+        if limit.rate <= 0 or limit.burst < 1:
+            raise ValueError(f"invalid rate limit {value!r}: rate must be greater than 0 and burst at least 1")
+        return limit
+
+
+class MemoryBackend:
+    """Buckets in this worker's memory. Limits apply per worker process."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def take(self, key: str, limit: Limit, cost: float = 1) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            bucket = self._buckets[key] = [limit.burst, now]
+        tokens = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+        bucket[1] = now
+        if tokens >= cost:
+            bucket[0] = tokens - cost
+            return True, 0.0
+        bucket[0] = tokens
+        return False, (cost - tokens) / limit.rate
+
+    def _prune(self, now: float):
+        # A bucket idle long enough to refill completely holds no state worth keeping.
+        idle = [key for key, (tokens, updated) in self._buckets.items() if now - updated > 60]
+        for key in idle or list(self._buckets)[: self.max_keys // 10]:
+            del self._buckets[key]
+
+
+class RedisBackend:
+    """
+    Buckets shared by every worker and instance through Redis (or any server
+    speaking its protocol with Lua scripting). One atomic script per check;
+    if Redis is unreachable the request is let through.
+    """
+    script = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(now - updated, 0) * rate)
+    local allowed = 0
+    local retry = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    else
+        retry = (cost - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+    return {allowed, tostring(retry)}
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        if aioredis is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs the redis package")
+        self.prefix = prefix
+        self._redis = aioredis.from_url(url)
+        self._script = self._redis.register_script(self.script)
+
+    async def take(self, key: str, limit: Limit, cost: float = 1) -> Tuple[bool, float]:
+        try:
+            allowed, retry = await self._script(keys=[self.prefix + key], args=[limit.rate, limit.burst, cost])
+        except Exception as e:
+            logger.warning("Rate limiter backend unavailable, letting the request through: %s", e)
+            return True, 0.0
+        return bool(allowed), float(retry)
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket rate limiting per route group. Requests are keyed by the
+    tenant (organization) when there is one, otherwise the account, otherwise
+    the client IP. Login and signup routes, which hash passwords, form their
+    own stricter group keyed by client IP, so credential guessing is capped
+    per source whichever account it targets. Rejected requests get 429 with
+    `Retry-After`.
+
+    Behind a load balancer every peer address is the balancer's; list it in
+    TRUSTED_PROXIES so the client IP is read from `X-Forwarded-For`.
+
+    Runs inside AuthObjectMiddleware so `request.state` identifies the caller.
+    """
+    exempt_paths = ("/healthz", "/readyz", "/metrics")
+
+    def __init__(self, app, backend=None, limits: Optional[Dict[str, Limit]] = None,
+                 trusted_proxies: Optional[str] = None):
+        self.app = app
+        self.trusted_proxies = parse_networks(TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies)
+        self.backend = backend or (
+            RedisBackend(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_BACKEND == "redis" else MemoryBackend()
+        )
+        self.limits = limits or {
+            "read": Limit.parse(RATE_LIMIT_READ),
+            "write": Limit.parse(RATE_LIMIT_WRITE),
+            "login": Limit.parse(RATE_LIMIT_LOGIN),
+        }
+
+    async def __call__(self, scope, receive, send):
+        if not RATE_LIMIT_ENABLED or scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            return await self.app(scope, receive, send)
+
+        group = route_group(scope["method"], scope["path"])
+        state = scope.get("state", {})
+        if group == "login":
+            identity = f"ip:{client_ip(scope, self.trusted_proxies)}"
+        elif state.get("tenant_id"):
+            identity = f"tenant:{state['tenant_id']}"
+        elif state.get("user_id"):
+            identity = f"account:{state['user_id']}"
+        else:
+            identity = f"ip:{client_ip(scope, self.trusted_proxies)}"
+
+        allowed, retry_after = await self.backend.take(f"{group}:{identity}", self.limits[group])
+        if allowed:
+            return await self.app(scope, receive, send)
+
+        rate_limited.inc(group)
+        response = JSONResponse(
+            {"detail": "too many requests"},
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
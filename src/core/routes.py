@@ -1,13 +1,34 @@
+from importlib import import_module
+from fastapi import APIRouter
 from src.apps.organization.routes import organization_router
 from src.apps.user.routes import user_router
 from src.apps.note.routes import note_router
-from src.apps.admin.routes import admin_router
-from src.apps.permission.routes import permission_router
 
 routes = [
    organization_router,
    user_router,
    note_router,
-   admin_router,
-   permission_router
-]
\ No newline at end of file
+]
+
+# Rarely used routers, imported on the first request under their prefix
+# when LAZY_ROUTERS is on (see LazyRouterMiddleware).
+lazy_routes = {
+   "/v1/admin": "src.apps.admin.routes:admin_router",
+   "/v1/permissions": "src.apps.permission.routes:permission_router",
+   "/v1/diagnostics": "src.apps.diagnostics.routes:diagnostics_router",
+}
+
+
+def load_router(target: str) -> APIRouter:
+    module, _, name = target.partition(":")
+    return getattr(import_module(module), name)
+
+
+# Request deadlines in seconds by path prefix, longest prefix first;
+# everything else gets REQUEST_DEADLINE_SECONDS (see DeadlineMiddleware).
+route_deadlines = {
+   "/v1/organizations/login": 5,
+   "/v1/users/login": 5,
+   "/v1/admin/login": 5,
+   "/v1/diagnostics": 60,
+}
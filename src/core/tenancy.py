@@ -0,0 +1,125 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+from pymongo import AsyncMongoClient
+from src.errors.base import ErrorHandler
+
+
+# Tenant (organization id) of the account making the current request.
+# Set by AuthObjectMiddleware from the token's `tenant_id` claim.
+current_tenant: ContextVar[Optional[str]] = ContextVar("current_tenant", default=None)
+
+# Collections whose documents belong to a single organization and can be
+# moved to a dedicated database. Everything else stays in the shared one.
+TENANT_SCOPED_COLLECTIONS = {"Users", "Notes"}
+
+PLACEMENT_COLLECTION = "TenantPlacements"
+
+# Shared `{"email", "user_id", "tenant_id"}` entry per organization user, so
+# login finds users of tenants placed in a dedicated database with one
+# lookup instead of one per placement.
+USER_DIRECTORY_COLLECTION = "UserDirectory"
+
+# Collection methods that modify documents; refused while a tenant is read-only.
+WRITE_COMMANDS = {
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "bulk_write",
+    "find_one_and_update", "find_one_and_replace", "find_one_and_delete",
+}
+
+# Seconds a client is told to wait before retrying a write refused during a migration.
+READ_ONLY_RETRY_AFTER = 5
+
+error = ErrorHandler("tenant")
+
+
+class TenantRouter:
+    """
+    Maps a tenant to the database holding its tenant-scoped collections.
+
+    Placements live in the shared `TenantPlacements` collection as
+    `{"tenant_id", "database", "uri", "read_only"}`; `uri` is optional and
+    puts the tenant on a separate cluster, `read_only` is set while the
+    tenant is being migrated. Tenants without a placement use the shared
+    database. The table is cached in memory and reloaded in the background
+    so every worker picks up migrations.
+    """
+
+    def __init__(self, client_factory: Callable[[str], AsyncMongoClient]):
+        self._client_factory = client_factory
+        self._placements: Dict[str, dict] = {}
+        self._clients: Dict[str, AsyncMongoClient] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def placement(self, tenant_id: Optional[str]) -> Optional[dict]:
+        if not tenant_id:
+            return None
+        return self._placements.get(tenant_id)
+
+    def placements(self):
+        return list(self._placements.values())
+
+    def read_only(self, tenant_id: Optional[str]) -> bool:
+        placement = self.placement(tenant_id)
+        return bool(placement and placement.get("read_only"))
+
+    def place(self, placement: dict):
+        self._placements[placement["tenant_id"]] = placement
+
+    def _client(self, uri: str) -> AsyncMongoClient:
+        if uri not in self._clients:
+            self._clients[uri] = self._client_factory(uri)
+        return self._clients[uri]
+
+    def database(self, placement: dict, default_client: AsyncMongoClient):
+        uri = placement.get("uri")
+        mongo = self._client(uri) if uri else default_client
+        return mongo[placement["database"]]
+
+    async def load(self, collection):
+        docs = await collection.find({}, {"_id": 0}).to_list(length=None)
+        self._placements = {doc["tenant_id"]: doc for doc in docs}
+
+    def start_refresh(self, collection, interval: float):
+        async def refresh():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.load(collection)
+                except Exception:
+                    # Keep serving from the last known table if the read fails.
+                    pass
+
+        self._refresh_task = asyncio.create_task(refresh())
+
+    async def close(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        for mongo in self._clients.values():
+            await mongo.close()
+        self._clients.clear()
+
+
+class ReadOnlyCollection:
+    """Collection of a tenant being migrated: reads pass through, writes are refused with 503."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in WRITE_COMMANDS:
+            return attribute
+
+        async def refused(*args, **kwargs):
+            exc = error.get(503, "organization is being migrated, retry shortly")
+            exc.headers = {"Retry-After": str(READ_ONLY_RETRY_AFTER)}
+            raise exc
+        return refused
+
+    def __getitem__(self, name):
+        return self._collection[name]
+
+    def with_options(self, *args, **kwargs):
+        return ReadOnlyCollection(self._collection.with_options(*args, **kwargs))
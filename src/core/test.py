@@ -0,0 +1,440 @@
+import asyncio
+import time
+import pytest
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import AutoReconnect, ExecutionTimeout, NetworkTimeout, PyMongoError
+from src.configs.env import DB_NAME
+from src.conftest import call
+from src.core import admission as admission_module, database as database_module, rate_limit as rate_limit_module
+from src.core.admission import AdaptiveLimit, AdmissionController, AdmissionMiddleware, admission_shed
+from src.core.database import get_collection
+from src.core.deadlines import DeadlineMiddleware, current_deadline, deadline_exceeded, deadline_exceeded_handler
+from src.core.faults import FaultInjector, FaultRule, fault_injector, faults_injected
+from src.core.rate_limit import Limit, MemoryBackend, RateLimitMiddleware, client_ip, parse_networks, rate_limited
+from src.core.tenancy import READ_ONLY_RETRY_AFTER
+from src.core.write_behind import WriteBehindBuffer, write_behind_dropped
+from src.errors.base import PrerenderedHTTPException, prerendered_exception_handler
+from src.utilities.serializers import RAW_BSON_OPTIONS
+
+
+def count(metric, *labels) -> float:
+    return metric._values.get(labels, 0)
+
+
+async def ok_app(scope, receive, send):
+    await JSONResponse({"ok": True})(scope, receive, send)
+
+
+def stub_app() -> FastAPI:
+    app = FastAPI()
+    app.add_exception_handler(PrerenderedHTTPException, prerendered_exception_handler)
+    app.add_exception_handler(PyMongoError, deadline_exceeded_handler)
+
+    @app.get("/items/{id}")
+    async def item(id: str, sleep: float = 0):
+        await asyncio.sleep(sleep)
+        await get_collection("Notes")
+        return {"id": id}
+
+    @app.get("/slow")
+    async def slow():
+        raise ExecutionTimeout("operation exceeded time limit", 50)
+
+    return app
+
+
+# -------------------- RATE LIMIT --------------------
+
+def test_limit_parse():
+    limit = Limit.parse("0.2/5")
+    assert (limit.rate, limit.burst) == (0.2, 5)
+    assert Limit.parse("10").burst == 10
+    for value in ("0/5", "1/0"):
+        with pytest.raises(ValueError):
+            Limit.parse(value)
+
+
+@pytest.mark.anyio
+async def test_token_bucket_refuses_past_the_burst_and_refills():
+    backend = MemoryBackend()
+    limit = Limit(rate=100, burst=2)
+    assert [(await backend.take("k", limit))[0] for _ in range(3)] == [True, True, False]
+    allowed, retry_after = await backend.take("other", Limit(rate=0.5, burst=1))
+    assert allowed
+    allowed, retry_after = await backend.take("other", Limit(rate=0.5, burst=1))
+    assert not allowed and 0 < retry_after <= 2
+    await asyncio.sleep(0.02)
+    assert (await backend.take("k", limit))[0]
+
+
+def test_client_ip_trusts_forwarded_for_only_from_proxies():
+    proxies = parse_networks("10.0.0.0/8, 192.168.1.1")
+
+    def scope(peer, forwarded=None):
+        headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+        return {"client": (peer, 1234), "headers": headers}
+
+    assert client_ip(scope("10.1.2.3", "6.6.6.6, 1.2.3.4, 10.0.0.9"), proxies) == "1.2.3.4"
+    assert client_ip(scope("10.1.2.3"), proxies) == "10.1.2.3"
+    assert client_ip(scope("5.5.5.5", "1.2.3.4"), proxies) == "5.5.5.5"
+    assert client_ip(scope("10.1.2.3", "1.2.3.4"), []) == "10.1.2.3"
+
+
+@pytest.mark.anyio
+async def test_login_is_limited_per_client_ip(monkeypatch):
+    monkeypatch.setattr(rate_limit_module, "RATE_LIMIT_ENABLED", True)
+    app = RateLimitMiddleware(
+        ok_app, limits={"read": Limit(100, 100), "write": Limit(100, 100), "login": Limit(0.01, 2)},
+    )
+    limited = count(rate_limited, "login")
+
+    async def login(ip):
+        return await call(app, "/v1/users/login", "POST", client=(ip, 1234))
+
+    assert [(await login("1.1.1.1")).status_code for _ in range(3)] == [200, 200, 429]
+    assert int((await login("1.1.1.1")).headers["retry-after"]) >= 1
+    assert (await login("2.2.2.2")).status_code == 200
+    assert count(rate_limited, "login") == limited + 2
+    assert (await call(app, "/v1/notes", client=("1.1.1.1", 1234))).status_code == 200  # other groups are unaffected
+
+
+@pytest.mark.anyio
+async def test_login_is_limited_per_client_behind_a_proxy(monkeypatch):
+    monkeypatch.setattr(rate_limit_module, "RATE_LIMIT_ENABLED", True)
+    app = RateLimitMiddleware(
+        ok_app, limits={"read": Limit(100, 100), "write": Limit(100, 100), "login": Limit(0.01, 2)},
+        trusted_proxies="10.0.0.0/8",
+    )
+
+    async def login(ip):
+        return await call(app, "/v1/users/login", "POST", {"x-forwarded-for": ip}, client=("10.0.0.1", 1234))
+
+    assert [(await login("1.1.1.1")).status_code for _ in range(3)] == [200, 200, 429]
+    assert (await login("2.2.2.2")).status_code == 200
+
+
+# -------------------- ADMISSION --------------------
+
+def controller(**options) -> AdmissionController:
+    settings = dict(
+        groups=("read",), initial=1, minimum=1, maximum=10, max_in_flight=10,
+        queue_size=1, queue_timeout=0.05, tolerance=2.0,
+    )
+    return AdmissionController(**{**settings, **options})
+
+
+@pytest.mark.anyio
+async def test_admission_queues_then_sheds():
+    admission = controller()
+    timeouts = count(admission_shed, "read", "queue_timeout")
+    full = count(admission_shed, "read", "queue_full")
+
+    assert await admission.acquire("read")
+    assert not await admission.acquire("read")  # waits in the queue, then times out
+    assert count(admission_shed, "read", "queue_timeout") == timeouts + 1
+
+    waiting = asyncio.create_task(admission.acquire("read"))
+    await asyncio.sleep(0)
+    assert not await admission.acquire("read")  # the queue holds one
+    assert count(admission_shed, "read", "queue_full") == full + 1
+
+    admission.release("read", 0.001)
+    assert await waiting
+    assert admission.in_flight == 1
+
+
+@pytest.mark.anyio
+async def test_admission_middleware_answers_503(monkeypatch):
+    monkeypatch.setattr(admission_module, "ADMISSION_ENABLED", True)
+    admission = controller(groups=("read", "write", "login"), queue_size=0)
+    app = AdmissionMiddleware(ok_app, controller=admission)
+
+    assert await admission.acquire("read")
+    response = await call(app, "/items/1")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert (await call(app, "/v1/users/login", "POST")).status_code == 200  # other groups are unaffected
+    assert (await call(app, "/healthz")).status_code == 200
+
+    admission.release("read", None)
+    assert (await call(app, "/items/1")).status_code == 200
+
+
+def test_adaptive_limit_judges_each_route_by_its_own_baseline(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(admission_module.time, "monotonic", lambda: clock[0])
+
+    def run(slowdown_after=None):
+        limit = AdaptiveLimit("read", initial=50, minimum=5, maximum=500, tolerance=2.0)
+        for i in range(2000):
+            clock[0] += 0.01
+            slow = i % 2 == 0
+            latency = 0.1 if slow else 0.001
+            if slowdown_after is not None and i > slowdown_after:
+                latency *= 3
+            limit.observe(latency, saturated=True, route="GET /slow" if slow else "GET /fast")
+        return limit.limit
+
+    assert run() > 50  # a mix of fast and slow routes is not contention
+    assert run(slowdown_after=1000) == 5  # every route three times slower is
+
+
+# -------------------- DEADLINES --------------------
+
+def test_deadline_budget():
+    middleware = DeadlineMiddleware(None, deadlines={"/v1/users/login": 5, "/v1": 30})
+
+    def budget(path, timeout=None):
+        headers = [(b"x-request-timeout", timeout.encode())] if timeout else []
+        return middleware.budget({"path": path, "headers": headers})
+
+    assert budget("/v1/users/login") == 5
+    assert budget("/v1/notes") == 30
+    assert budget("/v1/notes", "2.5") == 2.5
+    assert budget("/v1/notes", "60") == 30
+    assert budget("/v1/notes", "soon") == 30
+
+
+@pytest.mark.anyio
+async def test_no_database_work_after_the_deadline(mongo):
+    app = DeadlineMiddleware(stub_app())
+    before_query = count(deadline_exceeded, "/items/{id}", "before_query")
+    database = count(deadline_exceeded, "/slow", "database")
+
+    assert (await call(app, "/items/1", headers={"x-request-timeout": "5"})).status_code == 200
+    response = await call(app, "/items/1", headers={"x-request-timeout": "0.01"}, query_string=b"sleep=0.05")
+    assert response.status_code == 504
+    assert count(deadline_exceeded, "/items/{id}", "before_query") == before_query + 1
+
+    assert (await call(app, "/slow")).status_code == 504  # a Mongo timeout inside the deadline
+    assert count(deadline_exceeded, "/slow", "database") == database + 1
+
+
+# -------------------- IN-MEMORY DATABASE --------------------
+
+@pytest.mark.anyio
+async def test_memory_filters_sorts_and_projects(mongo):
+    notes = mongo[DB_NAME]["Notes"]
+    ada, grace = ObjectId(), ObjectId()
+    await notes.insert_many([
+        {"title": "a", "user_id": ada, "tags": ["x", "y"], "size": 1},
+        {"title": "b", "user_id": ada, "tags": ["y"], "size": 2},
+        {"title": "c", "user_id": grace, "size": 3},
+    ])
+    assert await notes.count_documents({"user_id": ada}) == 2
+    assert await notes.count_documents({"tags": "x"}) == 1
+    assert await notes.count_documents({"size": {"$gte": 2}, "tags": {"$exists": False}}) == 1
+    assert await notes.count_documents({"$or": [{"title": "a"}, {"size": {"$in": [3]}}]}) == 2
+    assert await notes.count_documents({"title": {"$regex": "^B", "$options": "i"}}) == 1
+    assert await notes.distinct("tags") == ["x", "y"]
+
+    docs = await notes.find({}, {"title": 1, "_id": 0}, sort=[("size", -1)], limit=2).to_list()
+    assert docs == [{"title": "c"}, {"title": "b"}]
+
+
+@pytest.mark.anyio
+async def test_memory_updates_upserts_and_bulk_writes(mongo):
+    users = mongo[DB_NAME]["Users"]
+    _id = (await users.insert_one({"email": "a", "logins": 0})).inserted_id
+    result = await users.update_one({"_id": _id}, {"$set": {"email": "b"}, "$inc": {"logins": 1}})
+    assert (result.matched_count, result.modified_count) == (1, 1)
+
+    result = await users.update_one({"email": "c"}, {"$set": {"logins": 5}}, upsert=True)
+    assert result.upserted_id is not None
+    assert await users.find_one({"email": "c"}, {"_id": 0}) == {"email": "c", "logins": 5}
+
+    result = await users.bulk_write([
+        UpdateOne({"_id": _id}, {"$set": {"logins": 2}}),
+        ReplaceOne({"email": "c"}, {"email": "d"}),
+    ])
+    assert result.modified_count == 2
+    assert await users.distinct("email") == ["b", "d"]
+    assert (await users.delete_many({})).deleted_count == 2
+
+
+@pytest.mark.anyio
+async def test_memory_copies_documents_in_and_out(mongo):
+    notes = mongo[DB_NAME]["Notes"]
+    doc = {"tags": ["a"]}
+    await notes.insert_one(doc)
+    doc["tags"].append("b")
+    (await notes.find_one({}))["tags"].append("c")
+    assert (await notes.find_one({}))["tags"] == ["a"]
+
+
+@pytest.mark.anyio
+async def test_memory_aggregates_to_raw_bson(mongo):
+    notes = (await get_collection("Notes")).with_options(codec_options=RAW_BSON_OPTIONS)
+    await notes.insert_many([{"title": "b"}, {"title": "a"}])
+    cursor = await notes.aggregate([
+        {"$match": {}}, {"$sort": {"title": 1}}, {"$project": {"_id": 0, "id": {"$toString": "$_id"}, "title": 1}},
+    ])
+    docs = await cursor.to_list()
+    assert all(isinstance(doc, RawBSONDocument) for doc in docs)
+    assert [doc["title"] for doc in docs] == ["a", "b"]
+    assert await mongo[DB_NAME]["Notes"].count_documents({}) == 2
+
+
+# -------------------- FAULT INJECTION --------------------
+
+def test_fault_rules_most_specific_first():
+    injector = FaultInjector.from_config(
+        '{"*": {"latency_ms": 1}, "Notes.*": {"error_rate": 1}, "Notes.find": {"timeout_rate": 1}}'
+    )
+    assert injector.rule("Notes", "find").timeout_rate == 1
+    assert injector.rule("Notes", "insert_one").error_rate == 1
+    assert injector.rule("Users", "find").latency_ms == 1
+    assert not FaultInjector.from_config(None).enabled
+    with pytest.raises(RuntimeError):
+        FaultInjector.from_config('{"*": {"latency": 1}}')
+
+
+@pytest.mark.anyio
+async def test_injected_errors_and_latency(monkeypatch, mongo):
+    monkeypatch.setattr(fault_injector, "rules", {
+        "Notes.*": FaultRule(error_rate=1),
+        "Users.find_one": FaultRule(latency_ms=20),
+    })
+    errors = count(faults_injected, "Notes", "find", "error")
+    notes = await get_collection("Notes")
+    with pytest.raises(AutoReconnect):
+        await notes.insert_one({"title": "x"})
+    with pytest.raises(AutoReconnect):
+        await notes.find({}).to_list(None)
+    assert count(faults_injected, "Notes", "find", "error") == errors + 1
+
+    users = await get_collection("Users")
+    started = time.perf_counter()
+    assert await users.find_one({}) is None
+    assert time.perf_counter() - started >= 0.02
+    assert await users.count_documents({}) == 0  # no rule for this command
+
+
+@pytest.mark.anyio
+async def test_injected_timeouts_end_at_the_request_deadline(monkeypatch, mongo):
+    monkeypatch.setattr(fault_injector, "rules", {"*": FaultRule(timeout_rate=1, timeout_ms=10000)})
+    token = current_deadline.set(time.monotonic() + 0.05)
+    try:
+        notes = await get_collection("Notes")
+        started = time.perf_counter()
+        with pytest.raises(NetworkTimeout):
+            await notes.find_one({})
+        assert time.perf_counter() - started < 1
+    finally:
+        current_deadline.reset(token)
+
+
+# -------------------- TENANCY --------------------
+
+def place(tenant_id: str, read_only: bool = False):
+    database_module.tenant_router.place(
+        {"tenant_id": tenant_id, "database": "tenant_db", "uri": None, "read_only": read_only}
+    )
+
+
+@pytest.mark.anyio
+async def test_tenant_collections_follow_their_placement(mongo):
+    tenant_id = str(ObjectId())
+    place(tenant_id)
+    await (await get_collection("Notes", tenant_id=tenant_id)).insert_one({"title": "x"})
+    await (await get_collection("Notes", tenant_id=str(ObjectId()))).insert_one({"title": "y"})
+    assert await mongo["tenant_db"]["Notes"].distinct("title") == ["x"]
+    assert await mongo[DB_NAME]["Notes"].distinct("title") == ["y"]
+
+
+@pytest.mark.anyio
+async def test_read_only_tenants_refuse_writes(mongo):
+    tenant_id = str(ObjectId())
+    place(tenant_id)
+    await (await get_collection("Notes", tenant_id=tenant_id)).insert_one({"title": "x"})
+    place(tenant_id, read_only=True)
+
+    notes = await get_collection("Notes", tenant_id=tenant_id)
+    with pytest.raises(PrerenderedHTTPException) as exc:
+        await notes.update_one({}, {"$set": {"title": "y"}})
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == str(READ_ONLY_RETRY_AFTER)
+    assert (await notes.find_one({}))["title"] == "x"
+
+
+# -------------------- WRITE-BEHIND --------------------
+
+@pytest.mark.anyio
+async def test_write_behind_merges_updates_per_document(mongo):
+    admins = mongo[DB_NAME]["Admins"]
+    first, second = (await admins.insert_many([{"email": "a"}, {"email": "b"}])).inserted_ids
+    buffer = WriteBehindBuffer(interval=60)
+    buffer.set("Admins", first, {"last_login": 1})
+    buffer.set("Admins", first, {"last_login": 2, "seen": True})
+    buffer.set("Admins", second, {"last_login": 3})
+    assert len(buffer) == 2
+
+    await buffer.flush()
+    assert len(buffer) == 0
+    assert await admins.find_one({"_id": first}, {"_id": 0}) == {"email": "a", "last_login": 2, "seen": True}
+    assert (await admins.find_one({"_id": second}))["last_login"] == 3
+
+
+@pytest.mark.anyio
+async def test_write_behind_stop_flushes_what_is_buffered(mongo):
+    admins = mongo[DB_NAME]["Admins"]
+    _id = (await admins.insert_one({"email": "a"})).inserted_id
+    buffer = WriteBehindBuffer(interval=60)
+    buffer.start()
+    buffer.set("Admins", _id, {"last_login": 1})
+    await buffer.stop()
+    assert (await admins.find_one({"_id": _id}))["last_login"] == 1
+
+
+@pytest.mark.anyio
+async def test_write_behind_backs_off_then_drops_failing_batches(monkeypatch, mongo):
+    monkeypatch.setattr(fault_injector, "rules", {"Admins.bulk_write": FaultRule(error_rate=1)})
+    dropped = count(write_behind_dropped, "Admins", "retries")
+    buffer = WriteBehindBuffer(interval=60, max_retries=1)
+    buffer.set("Admins", 1, {"last_login": 1})
+    buffer.set("Admins", 2, {"last_login": 1})
+
+    await buffer.flush()
+    assert len(buffer) == 2  # kept for a retry
+    await buffer.flush()
+    assert len(buffer) == 2  # still backing off, not attempted
+    assert count(write_behind_dropped, "Admins", "retries") == dropped
+
+    await buffer.flush(force=True)
+    assert len(buffer) == 0
+    assert count(write_behind_dropped, "Admins", "retries") == dropped + 2
+
+
+def test_write_behind_drops_updates_when_full():
+    dropped = count(write_behind_dropped, "Admins", "buffer_full")
+    buffer = WriteBehindBuffer(interval=60, max_pending=2)
+    for _id in (1, 2, 3, 1):
+        buffer.set("Admins", _id, {"last_login": _id})
+    assert len(buffer) == 2
+    assert count(write_behind_dropped, "Admins", "buffer_full") == dropped + 1
+
+
+# -------------------- SERVER --------------------
+
+@pytest.mark.parametrize("cpu_max, cpus", [("max 100000\n", None), ("150000 100000\n", 2), ("50000 100000\n", 1)])
+def test_cgroup_cpu_limit(tmp_path, cpu_max, cpus):
+    from src.scripts.server import cgroup_cpu_limit
+
+    path = tmp_path / "cpu.max"
+    path.write_text(cpu_max)
+    assert cgroup_cpu_limit(str(path)) == cpus
+    assert cgroup_cpu_limit(str(tmp_path / "missing")) is None
+
+
+def test_max_requests_needs_the_supervisor(monkeypatch):
+    from src.scripts import server
+
+    monkeypatch.setattr(server, "SERVER_MAX_REQUESTS", 1000)
+    monkeypatch.setattr(server, "WEB_CONCURRENCY", 1)
+    assert server.production_options()["limit_max_requests"] is None
+    monkeypatch.setattr(server, "WEB_CONCURRENCY", 4)
+    assert server.production_options()["limit_max_requests"] == 1000
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+from pymongo import UpdateOne
+from src.configs.env import LAST_LOGIN_FLUSH_SECONDS, WRITE_BEHIND_MAX_RETRIES, WRITE_BEHIND_MAX_PENDING
+from src.core.database import get_collection
+from src.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+write_behind_dropped = metrics.counter(
+    "write_behind_dropped_total",
+    "Buffered updates dropped because the buffer was full or their flush kept failing.",
+    ("collection", "reason"),
+)
+
+
+class WriteBehindBuffer:
+    """
+    Collects `$set` updates in memory and writes them as one unordered
+    `bulk_write` per collection every `interval` seconds.
+
+    Updates to the same document are merged, so a login storm on one
+    account costs a single write. Only use it for fields where losing the
+    last few seconds on a crash is acceptable.
+
+    A failed batch is retried with exponential backoff (twice the interval,
+    then four times...) and dropped after `max_retries` failures. At most
+    `max_pending` documents are buffered; updates to further documents are
+    dropped until a flush makes room. Drops are counted in
+    `write_behind_dropped_total`.
+    """
+
+    def __init__(self, interval: float, max_retries: int = WRITE_BEHIND_MAX_RETRIES,
+                 max_pending: int = WRITE_BEHIND_MAX_PENDING):
+        self.interval = interval
+        self.max_retries = max_retries
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[str, Optional[str]], Dict[Any, dict]] = {}
+        self._size = 0
+        # (collection, tenant) -> (consecutive failures, monotonic time of the next attempt)
+        self._failures: Dict[Tuple[str, Optional[str]], Tuple[int, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def set(self, collection_name: str, _id, fields: dict, tenant_id: Optional[str] = None):
+        documents = self._pending.setdefault((collection_name, tenant_id), {})
+        if _id not in documents:
+            if self._size >= self.max_pending:
+                write_behind_dropped.inc(collection_name, "buffer_full")
+                return
+            self._size += 1
+        documents.setdefault(_id, {}).update(fields)
+
+    def _requeue(self, key: Tuple[str, Optional[str]], documents: Dict[Any, dict]):
+        """Puts `documents` back without overwriting anything newer recorded meanwhile."""
+        requeue = self._pending.setdefault(key, {})
+        for _id, fields in documents.items():
+            if _id not in requeue:
+                self._size += 1
+            requeue[_id] = {**fields, **requeue.get(_id, {})}
+
+    async def flush(self, force: bool = False):
+        """
+        Writes everything buffered. Batches still backing off after a
+        failure wait for their next attempt unless `force` is set.
+        """
+        pending, self._pending, self._size = self._pending, {}, 0
+        now = time.monotonic()
+        for key, documents in pending.items():
+            collection_name, tenant_id = key
+            failures, retry_at = self._failures.get(key, (0, 0.0))
+            if retry_at > now and not force:
+                self._requeue(key, documents)
+                continue
+            operations = [UpdateOne({"_id": _id}, {"$set": fields}) for _id, fields in documents.items()]
+            try:
+                collection = await get_collection(collection_name, tenant_id=tenant_id)
+                await collection.bulk_write(operations, ordered=False)
+            except Exception as e:
+                failures += 1
+                if failures > self.max_retries:
+                    self._failures.pop(key, None)
+                    write_behind_dropped.inc(collection_name, "retries", amount=len(documents))
+                    logger.error(
+                        "Write-behind flush to %s failed %d times, dropped %d updates: %s",
+                        collection_name, failures, len(documents), e,
+                    )
+                    continue
+                self._failures[key] = (failures, now + self.interval * 2 ** failures)
+                logger.warning(
+                    "Write-behind flush to %s failed (attempt %d of %d), retrying: %s",
+                    collection_name, failures, self.max_retries + 1, e,
+                )
+                self._requeue(key, documents)
+            else:
+                self._failures.pop(key, None)
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            # Checked after the wait so a stop, even before the first pass, still gets a final flush.
+            stopping = self._stopping.is_set()
+            await self.flush(force=stopping)
+
+    def start(self):
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the flush loop; the loop's last pass writes whatever is still buffered."""
+        if self._task:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        else:
+            await self.flush(force=True)
+
+
+last_login_buffer = WriteBehindBuffer(interval=LAST_LOGIN_FLUSH_SECONDS)
@@ -19,7 +19,7 @@ class AdminPermissionDependency:
         Super admins automatically have all permissions.
         """
         try:
-            admin_collection = await get_collection("Admin")
+            admin_collection = await get_collection("Admins")
             admin = await admin_collection.find_one({"_id": ObjectId(user_id)})
 
             if not admin:
@@ -34,8 +34,8 @@ class AdminPermissionDependency:
             if not permission_group_ids:
                 return False
 
-            group_collection = await get_collection("PermissionGroup")
-            permission_collection = await get_collection("Permission")
+            group_collection = await get_collection("PermissionGroups")
+            permission_collection = await get_collection("Permissions")
 
             groups = await group_collection.find({
                 "_id": {"$in": [ObjectId(g) for g in permission_group_ids]}
@@ -45,7 +45,7 @@ class AdminPermissionDependency:
                 perms = await permission_collection.find({
                     "_id": {"$in": [ObjectId(p) for p in group.get("permissions", [])]},
                     "action": action,
-                    "module": resource
+                    "resource": resource
                 }).to_list(None)
                 if perms:
                     return True
@@ -66,7 +66,7 @@ class OrganizationPermissionDependency:
         If the organization is a moderator-level account, it checks group-based permissions.
         """
         try:
-            org_collection = await get_collection("Organization")
+            org_collection = await get_collection("Organizations")
             organization = await org_collection.find_one({"_id": ObjectId(user_id)})
 
             if not organization:
@@ -80,8 +80,8 @@ class OrganizationPermissionDependency:
             if not permission_group_ids:
                 return False
 
-            group_collection = await get_collection("PermissionGroup")
-            permission_collection = await get_collection("Permission")
+            group_collection = await get_collection("PermissionGroups")
+            permission_collection = await get_collection("Permissions")
 
             groups = await group_collection.find({
                 "_id": {"$in": [ObjectId(g) for g in permission_group_ids]}
@@ -91,7 +91,7 @@ class OrganizationPermissionDependency:
                 perms = await permission_collection.find({
                     "_id": {"$in": [ObjectId(p) for p in group.get("permissions", [])]},
                     "action": action,
-                    "module": resource
+                    "resource": resource
                 }).to_list(None)
                 if perms:
                     return True
@@ -112,7 +112,7 @@ class UserPermissionDependency:
         Only users with attached permission groups can have permissions.
         """
         try:
-            user_collection = await get_collection("User")
+            user_collection = await get_collection("Users")
             user = await user_collection.find_one({"_id": ObjectId(user_id)})
 
             if not user:
@@ -123,8 +123,8 @@ class UserPermissionDependency:
             if not permission_group_ids:
                 return False
 
-            group_collection = await get_collection("PermissionGroup")
-            permission_collection = await get_collection("Permission")
+            group_collection = await get_collection("PermissionGroups")
+            permission_collection = await get_collection("Permissions")
 
             groups = await group_collection.find({
                 "_id": {"$in": [ObjectId(g) for g in permission_group_ids]}
@@ -134,7 +134,7 @@ class UserPermissionDependency:
                 perms = await permission_collection.find({
                     "_id": {"$in": [ObjectId(p) for p in group.get("permissions", [])]},
                     "action": action,
-                    "module": resource
+                    "resource": resource
                 }).to_list(None)
                 if perms:
                     return True
@@ -192,6 +192,14 @@ class PermissionControl:
 
         return True
 
+    @classmethod
+    async def is_admin(cls, user_type: str | None, user_id: str | None) -> bool:
+        """Whether the account is an admin with the admin role, as `admin_required` demands."""
+        if user_type != "admin" or not user_id:
+            return False
+        admin = await AdminService.get_by_id(user_id)
+        return admin is not None and admin.role == AdminRole.ADMIN
+
     # ---------------- ROUTE DECORATOR ----------------
     @classmethod
     def permission_required(cls, action: Action, resource: Module):
@@ -206,3 +214,17 @@ class PermissionControl:
             await cls.validate_permission(request, action, resource)
 
         return dependency
+
+    @classmethod
+    def admin_required(cls):
+        """
+        Restricts a route to authenticated admins with the admin role.
+        Usage:
+            @router.get("/diagnostics", dependencies=[Depends(PermissionControl.admin_required())])
+        """
+        async def dependency(request: Request):
+            if getattr(request.state, "user_type", None) != "admin":
+                raise cls.error.get(403)
+            await cls.validate_permission(request, Action.READ, Module.ADMIN)
+
+        return dependency
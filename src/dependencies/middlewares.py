@@ -1,8 +1,19 @@
+from anyio import to_thread
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware
 from src.utilities.crypto.jwt import JWTService
 from src.errors.base import ErrorHandler
+from src.core.tenancy import current_tenant
+from src.core.database import current_session, start_causal_session
+from src.core.rate_limit import route_group
+import orjson
+from src.utilities.compression import negotiate
+from src.core.routes import load_router
+from src.utilities import serializers
+from src.utilities.serializers import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, response_format
+from src.configs.env import READ_MAX_STALENESS_SECONDS, COMPRESSION_MIN_SIZE, COMPRESSION_THREAD_SIZE
 
 class AuthObjectMiddleware(BaseHTTPMiddleware):
     jwt = JWTService()
@@ -23,4 +34,281 @@ class AuthObjectMiddleware(BaseHTTPMiddleware):
         if payload:
             request.state.user_id = payload.get("id")
             request.state.user_type = payload.get("user_type")
+            request.state.tenant_id = payload.get("tenant_id")
+            current_tenant.set(request.state.tenant_id)
         return await call_next(request)
+
+
+class ReadConsistencyMiddleware(BaseHTTPMiddleware):
+    """
+    Keeps read-your-writes requests on the primary.
+
+    Writes, requests sent with `X-Read-Your-Writes`, and reads from a client
+    that wrote within the staleness bound (tracked with the `read_primary`
+    cookie) run inside a causally consistent session. Services pass it to
+    their writes and to the reads that follow them; secondary-eligible
+    reads in that session go to the primary. Logins and signups neither
+    open a session nor set the cookie: what they write is not read back
+    from a secondary.
+    """
+    unsafe_methods = {"POST", "PUT", "PATCH", "DELETE"}
+
+    async def dispatch(self, request: Request, call_next):
+        if route_group(request.method, request.url.path) == "login":
+            return await call_next(request)
+
+        is_write = request.method in self.unsafe_methods
+        if not (
+            is_write
+            or request.headers.get("x-read-your-writes")
+            or request.cookies.get("read_primary")
+        ):
+            return await call_next(request)
+
+        session = start_causal_session()
+        token = current_session.set(session)
+        try:
+            response = await call_next(request)
+        finally:
+            current_session.reset(token)
+            await session.end_session()
+
+        if is_write and response.status_code < 400:
+            response.set_cookie(
+                key="read_primary",
+                value="1",
+                httponly=True,
+                samesite="lax",
+                max_age=READ_MAX_STALENESS_SECONDS,
+                path="/",
+            )
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best codec the client accepts (zstd, br,
+    gzip). Bodies under `minimum_size` are sent as-is; the first chunks are
+    held back until that much has been produced, since responses passing
+    through BaseHTTPMiddleware arrive in pieces whatever their size. Longer
+    bodies are compressed chunk by chunk as they are produced. Payloads of
+    `thread_size` bytes or more are compressed in a worker thread so the
+    event loop keeps serving other requests.
+
+    Plain ASGI rather than BaseHTTPMiddleware so streaming responses are
+    never buffered.
+    """
+    compressible_types = ("text/", "application/json", "application/javascript", "application/xml", MSGPACK_MEDIA_TYPE)
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, thread_size: int = COMPRESSION_THREAD_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        codec = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if codec is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        held = []
+        stream = None
+        passthrough = False
+
+        async def run(func, data: bytes) -> bytes:
+            if len(data) >= self.thread_size:
+                return await to_thread.run_sync(func, data)
+            return func(data)
+
+        async def compressed_send(message):
+            nonlocal start, held, stream, passthrough
+            if message["type"] == "http.response.start":
+                if not self.compressible(message["status"], MutableHeaders(raw=message["headers"])):
+                    passthrough = True
+                    return await send(message)
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                held.append(body)
+                if more_body and sum(map(len, held)) < self.minimum_size:
+                    return
+                body, held = b"".join(held), []
+                response_start, start = start, None
+                headers = MutableHeaders(raw=response_start["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(response_start)
+                    return await send({"type": "http.response.body", "body": body})
+
+                headers["Content-Encoding"] = codec.name
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body:
+                    body = await run(codec.compress, body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(response_start)
+                    return await send({"type": "http.response.body", "body": body})
+
+                del headers["Content-Length"]
+                stream = codec.stream()
+                await send(response_start)
+
+            chunk = await run(stream.compress, body) if body else b""
+            if not more_body:
+                chunk += stream.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, compressed_send)
+
+    def compressible(self, status: int, headers: MutableHeaders) -> bool:
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(self.compressible_types)
+
+
+class ContentNegotiationMiddleware:
+    """
+    MessagePack support for clients that send `Accept: application/msgpack`.
+
+    The negotiated format is published through `response_format`, so the
+    default response class and the pre-encoded list responses pack their
+    content directly. Any other JSON response is transcoded on the way out.
+    Request bodies sent as `Content-Type: application/msgpack` are converted
+    to JSON before they reach the routes, so every endpoint accepts them.
+    """
+    msgpack_types = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or serializers.msgpack is None:
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        if headers.get("content-type", "").split(";")[0].strip() in self.msgpack_types:
+            try:
+                scope, receive = await self.json_request(scope, receive)
+            except Exception:
+                response = JSONResponse({"detail": "Invalid MessagePack body"}, status_code=400)
+                return await response(scope, receive, send)
+
+        if not self.accepts_msgpack(headers.get("accept", "")):
+            return await self.app(scope, receive, send)
+
+        token = response_format.set(MSGPACK_MEDIA_TYPE)
+        try:
+            await self.app(scope, receive, self.transcoding_send(send))
+        finally:
+            response_format.reset(token)
+
+    def accepts_msgpack(self, accept: str) -> bool:
+        msgpack_q = json_q = 0.0
+        for part in accept.lower().split(","):
+            media_type, _, params = part.strip().partition(";")
+            q = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    q = float(params[2:])
+                except ValueError:
+                    q = 0.0
+            media_type = media_type.strip()
+            if media_type in self.msgpack_types:
+                msgpack_q = max(msgpack_q, q)
+            elif media_type == JSON_MEDIA_TYPE:
+                json_q = max(json_q, q)
+        return msgpack_q > 0 and msgpack_q >= json_q
+
+    async def json_request(self, scope, receive):
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = orjson.dumps(serializers.unpackb(b"".join(chunks)))
+
+        raw_headers = [
+            (name, value) for name, value in scope["headers"]
+            if name not in (b"content-type", b"content-length")
+        ]
+        raw_headers += [(b"content-type", JSON_MEDIA_TYPE.encode()), (b"content-length", str(len(body)).encode())]
+        scope["headers"] = raw_headers
+
+        sent = False
+
+        async def json_receive():
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return scope, json_receive
+
+    def transcoding_send(self, send):
+        start = None
+        chunks = []
+
+        async def wrapped(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                content_type = Headers(raw=message["headers"]).get("content-type", "")
+                if content_type.startswith(JSON_MEDIA_TYPE):
+                    start = message
+                    return
+                return await send(message)
+            if start is None or message["type"] != "http.response.body":
+                return await send(message)
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            if body:
+                body = serializers.packb(orjson.loads(body))
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Type"] = MSGPACK_MEDIA_TYPE
+            headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        return wrapped
+
+
+class LazyRouterMiddleware:
+    """
+    Includes rarely used routers on the first request under their prefix
+    instead of at startup. Docs and OpenAPI requests load all of them so
+    the schema stays complete.
+    """
+    docs_paths = ("/docs", "/redoc", "/openapi.json")
+
+    def __init__(self, app, routers: dict):
+        self.app = app
+        self.pending = dict(routers)
+
+    async def __call__(self, scope, receive, send):
+        if self.pending and scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            if path.startswith(self.docs_paths):
+                self.include(scope["app"], list(self.pending))
+            else:
+                prefixes = [p for p in self.pending if path == p or path.startswith(p + "/")]
+                if prefixes:
+                    self.include(scope["app"], prefixes)
+        await self.app(scope, receive, send)
+
+    def include(self, app, prefixes):
+        for prefix in prefixes:
+            target = self.pending.pop(prefix, None)
+            if target is not None:
+                app.include_router(load_router(target))
+        app.openapi_schema = None
@@ -0,0 +1,217 @@
+import gzip
+import orjson
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI, HTTPException
+from starlette.responses import Response, StreamingResponse
+from src.configs.env import DB_NAME
+from src.conftest import PASSWORD, call
+from src.dependencies.dependencies import (
+    AdminPermissionDependency,
+    OrganizationPermissionDependency,
+    UserPermissionDependency,
+)
+from src.dependencies.middlewares import CompressionMiddleware, ContentNegotiationMiddleware
+from src.enums.base import Action, Module
+from src.utilities import serializers
+from src.utilities.compression import CODECS, negotiate
+from src.utilities.serializers import MSGPACK_MEDIA_TYPE, NegotiatedResponse
+
+GZIP = {"accept-encoding": "gzip"}
+MSGPACK = {"accept": MSGPACK_MEDIA_TYPE}
+
+needs_msgpack = pytest.mark.skipif(serializers.msgpack is None, reason="msgpack is not installed")
+
+
+def compressed(response, minimum_size: int = 500) -> CompressionMiddleware:
+    return CompressionMiddleware(response, minimum_size=minimum_size, thread_size=10_000)
+
+
+def test_negotiate():
+    assert negotiate("") is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("gzip, deflate").name == "gzip"
+    assert negotiate("*").name == next(iter(CODECS))
+
+
+@pytest.mark.anyio
+async def test_large_bodies_are_compressed():
+    payload = b'{"content": "' + b"x" * 2000 + b'"}'
+    response = await call(compressed(Response(payload, media_type="application/json")), headers=GZIP)
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) == len(response.body)
+    assert gzip.decompress(response.body) == payload
+
+    response = await call(
+        compressed(Response(payload, media_type="application/json")), headers={"accept-encoding": "identity"},
+    )
+    assert "content-encoding" not in response.headers
+    assert response.body == payload
+
+
+@pytest.mark.anyio
+async def test_small_and_incompressible_bodies_are_sent_as_is():
+    response = await call(compressed(Response(b'{"ok": true}', media_type="application/json")), headers=GZIP)
+    assert "content-encoding" not in response.headers
+    assert response.body == b'{"ok": true}'
+
+    response = await call(compressed(Response(b"\x89PNG" * 1000, media_type="image/png")), headers=GZIP)
+    assert "content-encoding" not in response.headers
+    assert response.body == b"\x89PNG" * 1000
+
+
+@pytest.mark.anyio
+async def test_small_bodies_sent_in_pieces_are_sent_as_is():
+    async def pieces():
+        yield b'{"ok": '
+        yield b"true}"
+
+    response = await call(compressed(StreamingResponse(pieces(), media_type="application/json")), headers=GZIP)
+    assert "content-encoding" not in response.headers
+    assert response.body == b'{"ok": true}'
+
+
+@pytest.mark.anyio
+async def test_streamed_bodies_are_compressed_chunk_by_chunk():
+    async def lines():
+        for i in range(3):
+            yield f"line {i}\n" * 100
+
+    response = await call(compressed(StreamingResponse(lines(), media_type="text/plain")), headers=GZIP)
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert len(response.chunks) == 4  # one per line, then the end of the stream
+    assert gzip.decompress(response.body).decode() == "".join(f"line {i}\n" * 100 for i in range(3))
+
+
+def echo_app() -> ContentNegotiationMiddleware:
+    app = FastAPI(default_response_class=NegotiatedResponse)
+
+    @app.post("/echo")
+    async def echo(body: dict):
+        if not body:
+            raise HTTPException(status_code=400, detail="Empty body")
+        return body
+
+    return ContentNegotiationMiddleware(app)
+
+
+def test_accepts_msgpack():
+    accepts = ContentNegotiationMiddleware(None).accepts_msgpack
+    assert accepts(MSGPACK_MEDIA_TYPE)
+    assert accepts(f"application/json;q=0.5, {MSGPACK_MEDIA_TYPE}")
+    assert not accepts(f"application/json, {MSGPACK_MEDIA_TYPE};q=0.5")
+    assert not accepts(f"{MSGPACK_MEDIA_TYPE};q=0")
+    assert not accepts("*/*")
+
+
+@needs_msgpack
+@pytest.mark.anyio
+async def test_msgpack_responses():
+    body = {"title": "Packed", "tags": ["a", "b"]}
+    response = await call(echo_app(), "/echo", "POST", {**MSGPACK, "content-type": "application/json"},
+                          orjson.dumps(body))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert serializers.unpackb(response.body) == body
+
+    # Errors are JSON responses, transcoded on the way out.
+    response = await call(echo_app(), "/echo", "POST", {**MSGPACK, "content-type": "application/json"}, b"{}")
+    assert response.status_code == 400
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert serializers.unpackb(response.body) == {"detail": "Empty body"}
+    assert int(response.headers["content-length"]) == len(response.body)
+
+
+@needs_msgpack
+@pytest.mark.anyio
+async def test_json_is_kept_when_preferred():
+    accept = f"application/json, {MSGPACK_MEDIA_TYPE};q=0.5"
+    response = await call(echo_app(), "/echo", "POST", {"accept": accept, "content-type": "application/json"},
+                          b'{"title": "Plain"}')
+    assert response.headers["content-type"].startswith("application/json")
+    assert orjson.loads(response.body) == {"title": "Plain"}
+
+
+@needs_msgpack
+@pytest.mark.anyio
+async def test_msgpack_request_bodies():
+    packed = serializers.packb({"title": "Packed", "content": "body"})
+    response = await call(echo_app(), "/echo", "POST", {"content-type": MSGPACK_MEDIA_TYPE}, packed)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert orjson.loads(response.body) == {"title": "Packed", "content": "body"}
+
+    response = await call(echo_app(), "/echo", "POST", {"content-type": MSGPACK_MEDIA_TYPE}, b"\xc1")
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_permissions_come_from_the_seeded_groups(mongo):
+    db = mongo[DB_NAME]
+    groups = {group["name"]: group["_id"] for group in await db["PermissionGroups"].find({}).to_list(None)}
+    user = str((await db["Users"].insert_one({"permission_groups": [groups["NotePermission"]]})).inserted_id)
+    moderator = str((await db["Organizations"].insert_one(
+        {"role": "moderator", "permission_groups": [groups["UserPermission"]]},
+    )).inserted_id)
+    admin = str((await db["Admins"].insert_one({"role": "admin", "permission_groups": []})).inserted_id)
+
+    assert await UserPermissionDependency.has_permission(user, Action.UPDATE, Module.NOTE)
+    assert not await UserPermissionDependency.has_permission(user, Action.READ, Module.USER)
+    assert await OrganizationPermissionDependency.has_permission(moderator, Action.CREATE, Module.USER)
+    assert not await OrganizationPermissionDependency.has_permission(moderator, Action.READ, Module.ADMIN)
+    assert await AdminPermissionDependency.has_permission(admin, Action.DELETE, Module.ORGANIZATION)
+    with pytest.raises(HTTPException) as exc:
+        await UserPermissionDependency.has_permission(str(ObjectId()), Action.READ, Module.NOTE)
+    assert exc.value.status_code == 404
+
+
+# -------------------- THROUGH THE APP --------------------
+
+@pytest.fixture
+def user(signup, create_user):
+    return create_user(signup())
+
+
+def create_notes(client, user, count: int, size: int = 100):
+    for i in range(count):
+        response = client.post("/v1/notes", headers=user.headers, json={"title": f"Note {i}", "content": "x" * size})
+        assert response.status_code == 201
+
+
+def test_app_compresses_large_responses_only(client, user):
+    create_notes(client, user, 20)
+    response = client.get("/v1/notes/user", headers={**user.headers, "accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 20  # decoded by the client
+
+    note_id = response.json()[0]["_id"]
+    response = client.get(f"/v1/notes/{note_id}", headers={**user.headers, "accept-encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+@needs_msgpack
+def test_app_packs_lists_and_documents(client, user):
+    create_notes(client, user, 3)
+
+    response = client.get("/v1/notes/user", headers={**user.headers, **MSGPACK})
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    notes = serializers.unpackb(response.content)
+    assert [note["title"] for note in notes] == ["Note 0", "Note 1", "Note 2"]
+    assert all(note["_id"] for note in notes)
+
+    response = client.get(f"/v1/notes/{notes[0]['_id']}", headers={**user.headers, **MSGPACK})
+    assert serializers.unpackb(response.content)["title"] == "Note 0"
+
+
+def test_writes_pin_later_reads_to_the_primary_but_logins_do_not(client, signup, create_user):
+    organization = signup()
+    assert "read_primary" not in client.cookies
+    user = create_user(organization)
+    assert "read_primary" not in client.post("/v1/users/login", json={"email": user.email, "password": PASSWORD}).cookies
+
+    response = client.post("/v1/notes", headers=user.headers, json={"title": "x", "content": "y"})
+    assert response.cookies["read_primary"] == "1"
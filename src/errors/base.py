@@ -1,6 +1,27 @@
-from fastapi import HTTPException
-from typing import Dict, Type, Callable, Optional
+from fastapi import HTTPException, Request, Response
+from typing import Dict, Type, Callable, Optional, Tuple
 from threading import Lock
+from src.utilities.serializers import JSON_MEDIA_TYPE, encode, response_format, serialize_mongo_doc
+
+
+class PrerenderedHTTPException(HTTPException):
+    """
+    HTTPException raised by ErrorHandler. `bodies` maps a media type to the
+    already encoded `{"detail": ...}` payload and is shared by every raise of
+    the same error; the exception object itself is new each time.
+    """
+
+    def __init__(self, status_code: int, detail: str, bodies: Dict[str, bytes]):
+        super().__init__(status_code=status_code, detail=detail)
+        self.bodies = bodies
+
+
+async def prerendered_exception_handler(request: Request, exc: PrerenderedHTTPException) -> Response:
+    media_type = response_format.get()
+    body = exc.bodies.get(media_type)
+    if body is None:
+        body = exc.bodies.setdefault(media_type, encode({"detail": exc.detail}))
+    return Response(content=body, status_code=exc.status_code, media_type=media_type, headers=exc.headers)
 
 
 class ErrorHandler:
@@ -34,8 +55,12 @@ class ErrorHandler:
         503: "service unavailable",
         504: "gateway timeout",
     }
-    _cache: Dict[str, Dict[int, HTTPException]] = {}
+    # (status, detail) -> detail and its encoded bodies, per model name.
+    # Raising attaches a traceback to the exception, so only the bodies are
+    # cached and `get` builds a fresh exception for every raise.
+    _cache: Dict[str, Dict[Tuple[int, Optional[str]], Tuple[str, Dict[str, bytes]]]] = {}
     _lock = Lock()
+    _max_details = 256
 
     def __init__(self, name: str):
         self.modelname = name.lower()
@@ -44,14 +69,13 @@ class ErrorHandler:
                 self._cache[self.modelname] = {}
 
     def get(self, status_code: int, detail: str = None) -> HTTPException:
-        if detail:
-            return HTTPException(status_code=status_code, detail=detail)
         model_cache = self._cache[self.modelname]
-        if status_code not in model_cache:
-            base_msg = self._messages.get(status_code, "error")
-            message = f"{self.modelname} {base_msg}"
-            model_cache[status_code] = HTTPException(
-                status_code=status_code,
-                detail=message
-            )
-        return model_cache[status_code]
+        key = (status_code, detail or None)
+        entry = model_cache.get(key)
+        if entry is None:
+            message = detail or f"{self.modelname} {self._messages.get(status_code, 'error')}"
+            entry = (message, {JSON_MEDIA_TYPE: serialize_mongo_doc({"detail": message})})
+            if len(model_cache) < self._max_details:
+                entry = model_cache.setdefault(key, entry)
+        message, bodies = entry
+        return PrerenderedHTTPException(status_code, message, bodies)
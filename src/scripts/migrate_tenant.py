@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+from datetime import datetime
+from bson import ObjectId
+import pytz
+from pymongo import ReplaceOne, UpdateOne
+from src.configs.env import REQUEST_DEADLINE_SECONDS, TENANT_PLACEMENT_REFRESH_SECONDS
+from src.core.database import (
+    get_client,
+    get_database,
+    get_collection,
+    ensure_indexes,
+    tenant_router,
+    disconnect,
+)
+from src.core.tenancy import PLACEMENT_COLLECTION, USER_DIRECTORY_COLLECTION
+lagos_tz = pytz.timezone("Africa/Lagos")
+
+
+# -------------------- HELPERS --------------------
+
+async def tenant_documents(db, tenant_id: str):
+    """Yield (collection name, filter) for every tenant-scoped document set."""
+    org_id = ObjectId(tenant_id)
+    user_ids = await db["Users"].distinct("_id", {"organization_id": org_id})
+    yield "Users", {"organization_id": org_id}
+    yield "Notes", {"user_id": {"$in": user_ids}}
+
+
+async def copy_documents(source, target, tenant_id: str, batch_size: int):
+    """
+    Make the target's copy of the tenant match `source`: every document is
+    replaced by `_id`, then documents the source no longer has (deleted
+    since an earlier pass) are deleted from the target.
+    """
+    copied = pruned = 0
+    source_ids = {}
+    async for name, query in tenant_documents(source, tenant_id):
+        ids = source_ids.setdefault(name, set())
+        batch = []
+        async for doc in source[name].find(query):
+            ids.add(doc["_id"])
+            batch.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+            if len(batch) >= batch_size:
+                await target[name].bulk_write(batch, ordered=False)
+                copied += len(batch)
+                batch = []
+        if batch:
+            await target[name].bulk_write(batch, ordered=False)
+            copied += len(batch)
+
+    async for name, query in tenant_documents(target, tenant_id):
+        stale = [doc["_id"] async for doc in target[name].find(query, {"_id": 1}) if doc["_id"] not in source_ids[name]]
+        for start in range(0, len(stale), batch_size):
+            result = await target[name].delete_many({"_id": {"$in": stale[start:start + batch_size]}})
+            pruned += result.deleted_count
+    return copied, pruned
+
+
+async def delete_documents(db, tenant_id: str):
+    deleted = 0
+    # Notes first: the note filter is resolved from the tenant's users.
+    queries = [item async for item in tenant_documents(db, tenant_id)]
+    for name, query in reversed(queries):
+        result = await db[name].delete_many(query)
+        deleted += result.deleted_count
+    return deleted
+
+
+async def register_users(db, tenant_id: str, batch_size: int):
+    """Record the tenant's users in the shared user directory so login can find them."""
+    directory = await get_collection(USER_DIRECTORY_COLLECTION)
+    registered = 0
+    batch = []
+    async for user in db["Users"].find({"organization_id": ObjectId(tenant_id)}, {"email": 1}):
+        batch.append(UpdateOne(
+            {"user_id": user["_id"]},
+            {"$set": {"email": user["email"], "tenant_id": tenant_id}},
+            upsert=True,
+        ))
+        if len(batch) >= batch_size:
+            await directory.bulk_write(batch, ordered=False)
+            registered += len(batch)
+            batch = []
+    if batch:
+        await directory.bulk_write(batch, ordered=False)
+        registered += len(batch)
+    return registered
+
+
+async def set_placement(placements, placement: dict):
+    await placements.update_one(
+        {"tenant_id": placement["tenant_id"]},
+        {"$set": {**placement, "updated_at": datetime.now(lagos_tz)}},
+        upsert=True,
+    )
+    tenant_router.place(placement)
+
+
+# -------------------- MIGRATION --------------------
+
+async def migrate_tenant(tenant_id: str, database: str, uri: str | None = None, batch_size: int = 1000):
+    """
+    Move a tenant's Users and Notes to `database` (optionally on `uri`) while the app keeps serving.
+
+    1. bulk copy while the old placement still takes writes
+    2. mark the old placement read-only and wait until every worker has
+       reloaded it and in-flight writes have finished; from here the
+       tenant's writes are answered 503 and the old placement is final
+    3. final sync: replace every document and delete the ones removed since the copy
+    4. record the tenant's users in the user directory
+    5. flip the placement to the new database, writable again
+    6. after workers have reloaded the placement, delete the tenant's
+       documents from the old one; until then stale workers read it
+       intact and keep refusing writes
+
+    If anything fails before the flip, the old placement is made writable again.
+    """
+    placements = await get_collection(PLACEMENT_COLLECTION)
+    await tenant_router.load(placements)
+
+    source = get_database(tenant_id)
+    target_placement = {"tenant_id": tenant_id, "database": database, "uri": uri, "read_only": False}
+    target = tenant_router.database(target_placement, get_client())
+    if source.client is target.client and source.name == target.name:
+        print("ℹ️ Tenant is already on that placement.")
+        return
+
+    await ensure_indexes(target)
+
+    copied, _ = await copy_documents(source, target, tenant_id, batch_size)
+    print(f"✅ Copied {copied} documents.")
+
+    previous = tenant_router.placement(tenant_id)
+    source_placement = previous or {"tenant_id": tenant_id, "database": source.name, "uri": None}
+    await set_placement(placements, {**source_placement, "read_only": True})
+    freeze = TENANT_PLACEMENT_REFRESH_SECONDS + REQUEST_DEADLINE_SECONDS
+    print(f"⏸️ Writes paused. Waiting {freeze}s for workers to reload and in-flight writes to finish.")
+    try:
+        await asyncio.sleep(freeze)
+        copied, pruned = await copy_documents(source, target, tenant_id, batch_size)
+        print(f"✅ Re-synced {copied} documents, removed {pruned} deleted since the copy.")
+        registered = await register_users(source, tenant_id, batch_size)
+        print(f"✅ Registered {registered} users in the user directory.")
+    except BaseException:
+        if previous:
+            await set_placement(placements, {**previous, "read_only": False})
+        else:
+            await placements.delete_one({"tenant_id": tenant_id})
+        print("❌ Migration failed, writes resumed on the old placement.")
+        raise
+
+    await set_placement(placements, target_placement)
+    print(f"✅ Placement switched to {database}. Waiting {TENANT_PLACEMENT_REFRESH_SECONDS}s for workers to reload.")
+    await asyncio.sleep(TENANT_PLACEMENT_REFRESH_SECONDS)
+
+    deleted = await delete_documents(source, tenant_id)
+    print(f"🎉 Migration completed, removed {deleted} documents from the old placement.")
+
+
+# -------------------- RUNNER --------------------
+
+async def run_migration(args):
+    try:
+        await migrate_tenant(args.tenant_id, args.database, uri=args.uri, batch_size=args.batch_size)
+    finally:
+        await disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move an organization's users and notes to a dedicated database.")
+    parser.add_argument("tenant_id", help="Organization id")
+    parser.add_argument("database", help="Target database name")
+    parser.add_argument("--uri", default=None, help="Target cluster URI (defaults to the shared cluster)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(run_migration(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from bson import ObjectId
 import pytz
 from src.enums.base import Action, Module
 from src.core.database import get_collection
+from src.core.tenancy import USER_DIRECTORY_COLLECTION
 from src.utilities.crypto.hash import set_password
 from src.configs.env import (
     ADMIN_EMAIL,
@@ -12,7 +13,7 @@ from src.configs.env import (
     ADMIN_PHONENUMBER,
     ADMIN_PASSWORD,
 )
-from src.enums.base import AdminRole
+from src.enums.base import AdminRole, OrganizationRole
 lagos_tz = pytz.timezone("Africa/Lagos")
 
 
@@ -142,6 +143,92 @@ async def seed_admin():
     print("✅ Seeded super admin account.")
 
 
+LOAD_TEST_PREFIX = "loadtest-"
+
+
+def load_test_email(org: int, user: int = None) -> str:
+    """Email of a seeded load-test organization, or of one of its users."""
+    if user is None:
+        return f"{LOAD_TEST_PREFIX}org{org}@example.com"
+    return f"{LOAD_TEST_PREFIX}org{org}-user{user}@example.com"
+
+
+async def seed_tenants(organizations: int, users_per_org: int, notes_per_user: int, password: str):
+    """
+    Replace the load-test tenants with `organizations` organizations, each
+    with `users_per_org` users holding `notes_per_user` notes. Every account
+    gets `password`; it is hashed once, hashing per account would dominate
+    seeding time.
+    """
+    org_col = await get_collection("Organizations")
+    group_col = await get_collection("PermissionGroups")
+    note_group = await group_col.find_one({"name": "NotePermission"})
+    user_group = await group_col.find_one({"name": "UserPermission"})
+    if not note_group or not user_group:
+        raise Exception("❌ Permission groups not found. Please seed permissions first.")
+
+    # Drop the previous run's tenants.
+    old_orgs = await org_col.find({"email": {"$regex": f"^{LOAD_TEST_PREFIX}"}}, {"_id": 1}).to_list(length=None)
+    directory = await get_collection(USER_DIRECTORY_COLLECTION)
+    await directory.delete_many({"tenant_id": {"$in": [str(org["_id"]) for org in old_orgs]}})
+    for org in old_orgs:
+        user_col = await get_collection("Users", tenant_id=str(org["_id"]))
+        note_col = await get_collection("Notes", tenant_id=str(org["_id"]))
+        user_ids = [u["_id"] for u in await user_col.find({"organization_id": org["_id"]}, {"_id": 1}).to_list(length=None)]
+        await note_col.delete_many({"user_id": {"$in": user_ids}})
+        await user_col.delete_many({"organization_id": org["_id"]})
+    await org_col.delete_many({"email": {"$regex": f"^{LOAD_TEST_PREFIX}"}})
+
+    hashed = set_password(password)
+    now = datetime.now(lagos_tz)
+    for o in range(organizations):
+        result = await org_col.insert_one({
+            "name": f"Load Test Org {o}",
+            "email": load_test_email(o),
+            "phone_number": f"+1555{o:07d}",
+            "password": hashed,
+            "created_at": now,
+            "updated_at": None,
+            "permission_groups": [note_group["_id"], user_group["_id"]],
+        })
+        org_id = result.inserted_id
+        user_col = await get_collection("Users", tenant_id=str(org_id))
+        note_col = await get_collection("Notes", tenant_id=str(org_id))
+        if not users_per_org:
+            continue
+        users = await user_col.insert_many([
+            {
+                "first_name": "Load",
+                "last_name": f"User {u}",
+                "email": load_test_email(o, u),
+                "phone_number": f"+1556{o:04d}{u:04d}",
+                "password": hashed,
+                "created_at": now,
+                "updated_at": None,
+                "role": OrganizationRole.BASE_USER,
+                "permission_groups": [note_group["_id"]],
+                "organization_id": org_id,
+            }
+            for u in range(users_per_org)
+        ])
+        if notes_per_user:
+            await note_col.insert_many([
+                {
+                    "title": f"Note {n}",
+                    "content": f"Seeded note {n} of user {u} in organization {o}.",
+                    "user_id": user_id,
+                    "created_at": now,
+                    "updated_at": None,
+                }
+                for u, user_id in enumerate(users.inserted_ids)
+                for n in range(notes_per_user)
+            ])
+    print(
+        f"✅ {organizations} load-test organizations seeded with "
+        f"{users_per_org} users each and {notes_per_user} notes per user."
+    )
+
+
 # -------------------- RUNNER --------------------
 
 async def run_seed():
@@ -1,27 +1,157 @@
+import os
+import math
+import logging
 import uvicorn
+from importlib.util import find_spec
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, responses
-from src.core.routes import routes
-from src.dependencies.middlewares import AuthObjectMiddleware
+from src.utilities.serializers import NegotiatedResponse
+from src.errors.base import PrerenderedHTTPException, prerendered_exception_handler
+from src.configs.env import (
+    SERVER_HOST,
+    SERVER_PORT,
+    WEB_CONCURRENCY,
+    SERVER_KEEPALIVE_SECONDS,
+    SERVER_BACKLOG,
+    SERVER_MAX_REQUESTS,
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+    LAZY_ROUTERS,
+    LOOP_MONITOR_ENABLED,
+    DB_FAULTS,
+)
+from pymongo.errors import PyMongoError
+from src.core.routes import routes, lazy_routes, load_router, route_deadlines
+from src.core.database import connect, disconnect
+from src.core.write_behind import last_login_buffer
+from src.core.health import database_health, health_router
+from src.core.admission import AdmissionMiddleware
+from src.core.deadlines import DeadlineMiddleware, deadline_exceeded_handler
+from src.core.metrics import MetricsMiddleware, metrics_router
+from src.core.profiling import ProfilingMiddleware
+from src.core.loop_monitor import loop_monitor
+from src.core.rate_limit import RateLimitMiddleware
+from src.dependencies.middlewares import (
+    AuthObjectMiddleware,
+    ReadConsistencyMiddleware,
+    ContentNegotiationMiddleware,
+    CompressionMiddleware,
+    LazyRouterMiddleware,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect()
+    last_login_buffer.start()
+    database_health.start()
+    if LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    yield
+    await loop_monitor.stop()
+    await database_health.stop()
+    await last_login_buffer.stop()
+    await disconnect()
+
 
 app = FastAPI(
     title="Multi-Tenant Note app",
-    default_response_class=responses.ORJSONResponse
+    default_response_class=NegotiatedResponse,
+    lifespan=lifespan,
 )
 
+app.add_exception_handler(PrerenderedHTTPException, prerendered_exception_handler)
+app.add_exception_handler(PyMongoError, deadline_exceeded_handler)
+
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(ReadConsistencyMiddleware)
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(AuthObjectMiddleware)
+app.add_middleware(ContentNegotiationMiddleware)
+app.add_middleware(CompressionMiddleware)
 
 @app.get("/", status_code=200)
 async def index():
     return responses.RedirectResponse(url="/docs")
 
 
+app.include_router(health_router)
+app.include_router(metrics_router)
 list(map(lambda r: app.include_router(r), routes))
+if LAZY_ROUTERS:
+    app.add_middleware(LazyRouterMiddleware, routers=lazy_routes)
+else:
+    list(map(lambda target: app.include_router(load_router(target)), lazy_routes.values()))
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(DeadlineMiddleware, deadlines=route_deadlines)
+app.add_middleware(MetricsMiddleware)
 
 
 def run_server():
     uvicorn.run("src.scripts.server:app", host="0.0.0.0", port=8080, reload=True)
 
 
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+logger = logging.getLogger(__name__)
+
+
+def cgroup_cpu_limit(path: str = CGROUP_CPU_MAX) -> int | None:
+    """CPUs allowed by the cgroup v2 quota ("<quota> <period>", rounded up), or None without a quota."""
+    try:
+        with open(path) as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return max(1, math.ceil(int(quota) / int(period)))
+
+
+def worker_count() -> int:
+    """
+    WEB_CONCURRENCY when set, otherwise one worker per CPU this process may
+    run on: the CPUs in its affinity mask, capped by the container's cgroup
+    CPU quota, which the affinity mask does not reflect.
+    """
+    if WEB_CONCURRENCY > 0:
+        return WEB_CONCURRENCY
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return min(cpus, cgroup_cpu_limit() or cpus)
+
+
+def production_options() -> dict:
+    """
+    uvicorn settings for `run_prod`. uvloop and httptools are used when
+    installed (`pip install tenantapp[server]`). With SERVER_MAX_REQUESTS set,
+    a worker shuts down gracefully after that many requests and the
+    supervisor starts a fresh one, which caps per-process memory growth.
+    uvicorn only runs the supervisor for more than one worker; a single
+    worker runs in this process and would not be replaced, so the limit
+    is ignored then.
+    """
+    workers = worker_count()
+    max_requests = SERVER_MAX_REQUESTS or None
+    if max_requests and workers == 1:
+        logger.warning("SERVER_MAX_REQUESTS is ignored with a single worker, which nothing would restart")
+        max_requests = None
+    return {
+        "host": SERVER_HOST,
+        "port": SERVER_PORT,
+        "workers": workers,
+        "loop": "uvloop" if find_spec("uvloop") else "asyncio",
+        "http": "httptools" if find_spec("httptools") else "h11",
+        "timeout_keep_alive": SERVER_KEEPALIVE_SECONDS,
+        "backlog": SERVER_BACKLOG,
+        "limit_max_requests": max_requests,
+        "timeout_graceful_shutdown": SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+    }
+
+
 def run_prod():
-    uvicorn.run("src.scripts.server:app", host="0.0.0.0", port=8080, reload=False, workers=2)
+    if DB_FAULTS:
+        raise RuntimeError("DB_FAULTS injects database faults and must not be set in production")
+    uvicorn.run("src.scripts.server:app", reload=False, **production_options())
 
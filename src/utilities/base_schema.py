@@ -1,7 +1,89 @@
-from pydantic import BaseModel, EmailStr, Field
+from functools import lru_cache
+from typing import List
+from bson import ObjectId
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import core_schema
+from src.configs.env import TRUSTED_DB_READS
+from src.utilities.serializers import packb, wants_msgpack
+
+
+class PyObjectId(ObjectId):
+    """
+    ObjectId field type shared by every schema.
+
+    ObjectId instances coming from the database pass an isinstance check in
+    pydantic-core without calling back into Python; only strings are parsed.
+    JSON serialization stringifies in pydantic-core as well.
+    """
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        from_str = core_schema.no_info_after_validator_function(cls.validate, core_schema.str_schema())
+        return core_schema.json_or_python_schema(
+            json_schema=from_str,
+            python_schema=core_schema.union_schema([core_schema.is_instance_schema(ObjectId), from_str]),
+            serialization=core_schema.to_string_ser_schema(when_used="json-unless-none"),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema, handler) -> JsonSchemaValue:
+        return {"type": "string", "examples": ["6561f2c7cde75e9a3fd8b57b"]}
+
+    @classmethod
+    def validate(cls, v):
+        if not ObjectId.is_valid(v):
+            raise ValueError("Invalid ObjectId")
+        return ObjectId(v)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+@lru_cache(maxsize=None)
+def _rewrites_input(model: type) -> bool:
+    """Whether `model` has before, wrap or plain validators, which `model_construct` would skip."""
+    decorators = model.__pydantic_decorators__
+    return any(
+        decorator.info.mode != "after"
+        for decorator in (*decorators.field_validators.values(), *decorators.model_validators.values())
+    )
+
+
+class DocumentModel(BaseModel):
+    """
+    Base for *ObjectSchema models, which are built from our own documents.
+
+    Input is validated by the Create/Update schemas before it is stored, so
+    reads are trusted: `from_db` uses `model_construct` and skips
+    validation. Absent fields get their declared defaults either way. Models
+    whose validators reshape input before it is checked (`mode="before"`,
+    e.g. a scalar stored where a list is declared) are still validated, as
+    construction would keep the raw value. Set TRUSTED_DB_READS=false to
+    validate every read while debugging data problems. Enum fields hold
+    their values, so validated and constructed models serialize the same
+    way.
+    """
+    model_config = {"use_enum_values": True}
+
+    @classmethod
+    def from_db(cls, doc: dict):
+        if TRUSTED_DB_READS and not _rewrites_input(cls):
+            return cls.model_construct(**doc)
+        return cls(**doc)
+
+    @classmethod
+    def dump_list(cls, docs) -> bytes:
+        """Encodes documents as a JSON array in one pydantic-core call, or packs them for MessagePack clients."""
+        models = [cls.from_db(doc) for doc in docs]
+        if wants_msgpack():
+            return packb(_list_adapter(cls).dump_python(models, mode="json", by_alias=True))
+        return _list_adapter(cls).dump_json(models, by_alias=True)
 
 
 class AccountBaseModel(BaseModel):
     email: EmailStr
     phone_number: str = Field(..., max_length=18)
-    password: str = Field(...,  max_length=128)
\ No newline at end of file
+    password: str = Field(...,  max_length=128)
@@ -0,0 +1,93 @@
+import zlib
+from typing import Dict, Optional
+from src.configs.env import GZIP_LEVEL, BROTLI_QUALITY, ZSTD_LEVEL
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+
+class GzipStream:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # Sync flush so every chunk of a streamed response reaches the client.
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdStream:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def gzip_compress(data: bytes) -> bytes:
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+class Codec:
+    def __init__(self, name: str, compress, stream):
+        self.name = name
+        self.compress = compress
+        self.stream = stream
+
+
+# Server preference order; brotli and zstd only when their packages are installed.
+CODECS: Dict[str, Codec] = {}
+if zstandard is not None:
+    CODECS["zstd"] = Codec("zstd", lambda data: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), ZstdStream)
+if brotli is not None:
+    CODECS["br"] = Codec("br", lambda data: brotli.compress(data, quality=BROTLI_QUALITY), BrotliStream)
+CODECS["gzip"] = Codec("gzip", gzip_compress, GzipStream)
+
+
+def negotiate(accept_encoding: str) -> Optional[Codec]:
+    """
+    Picks the codec for an Accept-Encoding header: the highest q-value wins,
+    ties go to server preference. `identity` and unknown codings are ignored.
+    """
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip()] = q
+
+    best, best_q = None, 0.0
+    for name, codec in CODECS.items():
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = codec, q
+    return best
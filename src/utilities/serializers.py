@@ -1,22 +1,191 @@
-from bson import ObjectId
-
-def serialize_mongo_doc(doc):
-    """
-    Recursively converts ObjectId and nested structures into JSON-serializable values.
-    """
-    if isinstance(doc, list):
-        return [serialize_mongo_doc(d) for d in doc]
-    elif isinstance(doc, dict):
-        new_doc = {}
-        for k, v in doc.items():
-            if isinstance(v, ObjectId):
-                new_doc[k] = str(v)
-            elif isinstance(v, (dict, list)):
-                new_doc[k] = serialize_mongo_doc(v)
-            else:
-                new_doc[k] = v
-        return new_doc
-    elif isinstance(doc, ObjectId):
-        return str(doc)
-    else:
-        return doc
+import orjson
+from contextvars import ContextVar
+from datetime import date, datetime, time
+from enum import Enum
+from typing import AsyncIterator, Optional
+from uuid import UUID
+from bson import ObjectId, decode_all
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from fastapi import Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+try:
+    import msgpack
+except ImportError:  # optional, `pip install tenantapp[msgpack]`
+    msgpack = None
+
+
+# Cursor results stay as undecoded BSON bytes until they are transcoded.
+RAW_BSON_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+# Documents per cursor batch, and per chunk, of a streamed list response.
+RAW_LIST_BATCH_SIZE = 500
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Set per request by ContentNegotiationMiddleware from the Accept header.
+response_format: ContextVar[str] = ContextVar("response_format", default=JSON_MEDIA_TYPE)
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _msgpack_default(value):
+    # Same text forms orjson produces, so both formats carry identical values.
+    if isinstance(value, (ObjectId, UUID)):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Type is not MessagePack serializable: {type(value).__name__}")
+
+
+def packb(content) -> bytes:
+    return msgpack.packb(content, default=_msgpack_default)
+
+
+def unpackb(data: bytes):
+    return msgpack.unpackb(data)
+
+
+def wants_msgpack() -> bool:
+    return response_format.get() == MSGPACK_MEDIA_TYPE
+
+
+def serialize_mongo_doc(doc) -> bytes:
+    """
+    Encodes a Mongo document, or a list of them, straight to JSON bytes.
+    orjson walks the structure in C; ObjectIds are stringified through the
+    `default` hook and datetimes are encoded natively.
+    """
+    return orjson.dumps(doc, default=_default)
+
+
+def encode(content) -> bytes:
+    """Encodes in the format negotiated for the current request."""
+    if wants_msgpack():
+        return packb(content)
+    return serialize_mongo_doc(content)
+
+
+class NegotiatedResponse(ORJSONResponse):
+    """Default response class: orjson, or MessagePack when the client asked for it."""
+
+    def render(self, content) -> bytes:
+        if wants_msgpack():
+            self.media_type = MSGPACK_MEDIA_TYPE
+            return packb(content)
+        return super().render(content)
+
+
+class MongoJSONResponse(Response):
+    """Response for raw Mongo documents, skipping FastAPI's jsonable_encoder pass."""
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content) -> bytes:
+        self.media_type = response_format.get()
+        return encode(content)
+
+
+class JSONBytesResponse(Response):
+    """
+    Response for bodies that are already encoded, by `encode`,
+    `raw_list_response` or `DocumentModel.dump_list`, in the negotiated format.
+    """
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content) -> bytes:
+        self.media_type = response_format.get()
+        return content
+
+
+def json_projection(fields, object_id_fields=()) -> dict:
+    """
+    `$project` stage that shapes documents for the API on the server:
+    `_id` and the ObjectId fields become strings, so the fetched documents
+    hold nothing orjson cannot encode natively and keep the field names of
+    every other response.
+    """
+    stage = {"_id": {"$toString": "$_id"}}
+    for field in fields:
+        stage[field] = {"$toString": f"${field}"} if field in object_id_fields else 1
+    return {"$project": stage}
+
+
+async def _raw_batches(collections, pipeline: list, sessions: list, batch_size: int) -> AsyncIterator[bytes]:
+    """Raw BSON batches of `pipeline` run on each collection in turn, one cursor open at a time."""
+    for collection, session in zip(collections, sessions):
+        raw_collection = collection.with_options(codec_options=RAW_BSON_OPTIONS)
+        cursor = await raw_collection.aggregate_raw_batches(pipeline, session=session, batchSize=batch_size)
+        try:
+            async for batch in cursor:
+                yield batch
+        finally:
+            await cursor.close()
+
+
+async def _json_array(batches, first: Optional[bytes]) -> AsyncIterator[bytes]:
+    try:
+        yield b"["
+        separator, batch = b"", first
+        while batch is not None:
+            docs = decode_all(batch)
+            if docs:
+                yield separator + serialize_mongo_doc(docs)[1:-1]
+                separator = b","
+            batch = await anext(batches, None)
+        yield b"]"
+    finally:
+        await batches.aclose()
+
+
+class _BatchStreamingResponse(StreamingResponse):
+    """Streams `_json_array`, closing the open cursor even if the body never starts."""
+
+    def __init__(self, batches, first: Optional[bytes]):
+        super().__init__(_json_array(batches, first), media_type=JSON_MEDIA_TYPE)
+        self.batches = batches
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.batches.aclose()
+
+
+def _no_session(collection):
+    return None
+
+
+async def raw_list_response(collections, query: dict, projection: dict, session_for=_no_session,
+                            batch_size: int = RAW_LIST_BATCH_SIZE) -> Response:
+    """
+    Lists the documents matching `query` in `collections`, one after the
+    other, as a JSON array streamed one cursor batch at a time. Each batch
+    arrives as raw BSON bytes, is decoded in one C call and encoded once
+    with orjson, with no Pydantic models or per-document Python passes in
+    between, and only one batch is held in memory. `session_for(collection)`
+    gives the session to read each collection in.
+
+    The first batch is fetched before the response starts, so a failing
+    query still gets an error status; a failure later truncates the body.
+    MessagePack arrays carry their length up front and a causal session
+    ends when the handler returns, so those responses are built whole.
+    """
+    sessions = [session_for(collection) for collection in collections]
+    batches = _raw_batches(collections, [{"$match": query}, projection], sessions, batch_size)
+    if wants_msgpack() or any(session is not None for session in sessions):
+        docs = []
+        try:
+            async for batch in batches:
+                docs += decode_all(batch)
+        finally:
+            await batches.aclose()
+        return JSONBytesResponse(encode(docs))
+    first = await anext(batches, None)
+    return _BatchStreamingResponse(batches, first)
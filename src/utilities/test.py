@@ -0,0 +1,28 @@
+from datetime import datetime
+import orjson
+import pytest
+from bson import ObjectId
+from src.apps.admin.schemas import AdminObjectSchema
+from src.apps.note.schemas import NoteObjectSchema
+from src.utilities import base_schema
+
+
+@pytest.fixture(params=[True, False], ids=["trusted", "validated"])
+def reads(request, monkeypatch):
+    monkeypatch.setattr(base_schema, "TRUSTED_DB_READS", request.param)
+
+
+def test_from_db_fills_defaults_and_runs_normalising_validators(reads):
+    group = ObjectId()
+    admin = {
+        "_id": ObjectId(), "first_name": "Ada", "last_name": "Obi", "email": "ada@example.com",
+        "role": "admin", "permission_groups": group, "phone_number": "08000000001", "password": "x",
+        "created_at": datetime(2024, 1, 1),
+    }
+    [dumped] = orjson.loads(AdminObjectSchema.dump_list([admin]))
+    assert dumped["permission_groups"] == [str(group)]
+    assert dumped["updated_at"] is None
+
+    note = {"_id": ObjectId(), "title": "Title", "content": "x", "created_at": datetime(2024, 1, 1)}
+    assert NoteObjectSchema.from_db(note).updated_at is None
+    assert orjson.loads(NoteObjectSchema.dump_list([note]))[0]["updated_at"] is None